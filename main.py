@@ -2,17 +2,40 @@
 平台价格监控程序
 用于监控网易BUFF、悠悠有品、ECOSteam等平台指定商品的价格
 """
+import argparse
+import atexit
 import logging
+import multiprocessing
+import queue
+import threading
 import time
 import signal
-from typing import List, Dict, Any
-from logging.handlers import RotatingFileHandler
+import sys
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, List, Dict, Any, Optional, Sequence, Tuple
+from logging.handlers import QueueHandler, QueueListener
 import os
-from collections import deque
 
-from monitors import BuffMonitor, YoupinMonitor, EcosteamMonitor
-from utils import Config, Database, Notifier
-from utils.result_saver import save_monitoring_results
+# 进程启动时间（用于报告启动耗时）
+_PROCESS_START = time.perf_counter()
+
+# 平台监控器、数据库和通知器（requests / sqlite3 / smtplib 等）在首次用到时才导入
+from utils.config import Config
+from utils.listing_batch import ListingBatch, count_listings
+from utils.log_handlers import LineBudgetRotatingFileHandler, RateSampleFilter, JsonFormatter
+from utils.result_saver import RoundResultWriter, result_key
+from utils.platform_health import PlatformHealth
+from utils.price_stats import PriceStatsEngine, listing_identities
+from utils.circuit_breaker import OPEN, CircuitBreaker
+from utils.config_watcher import ConfigChange, ConfigWatcher
+from utils.round_planner import CrawlJob, item_band, plan_crawl_jobs
+from utils.load_shedder import PRIORITIES, PRIORITY_RANK, OverloadWatchdog, item_priority
+from utils.names import goods_name_key
+from utils.scheduler import SpreadScheduler
+from utils.sharding import partition_items
+
+if TYPE_CHECKING:
+    from utils.read_api import ReadApiServer
 
 
 # 全局标志：是否应该退出
@@ -33,32 +56,224 @@ def signal_handler(signum, frame):
 class PriceMonitor:
     """价格监控主类"""
     
-    def __init__(self, config_path: str = "config.json"):
+    def __init__(
+        self,
+        config_path: str = "config.json",
+        workers: Optional[int] = None,
+        platforms: Optional[Sequence[str]] = None,
+        item_names: Optional[Sequence[str]] = None,
+        profile: bool = False,
+    ):
         """
         初始化监控器
         
         Args:
             config_path: 配置文件路径
+            workers: 抓取进程数（默认读取配置 workers，为 1 时单进程运行；大于 1 时
+                本进程只负责调度与写入，抓取交给子进程）
+            platforms: 只监控这些平台（默认全部已启用平台）
+            item_names: 只监控名称包含这些关键字的商品（默认全部商品）
+            profile: 剖析每一轮（忽略 profiling 配置中的采样率）
         """
+        init_started = time.perf_counter()
         # 加载配置
+        self.config_path = config_path
         self.config = Config(config_path)
+        self.workers = max(1, int(workers if workers is not None else self.config.get('workers', 1)))
+        self.item_names = [goods_name_key(name) for name in item_names or []]
+        self.platform_filter = set(platforms) if platforms else None
+        if self.platform_filter is None and self.item_names:
+            # 只选了部分商品时，只为这些商品用到的平台创建会话
+            self.platform_filter = {p for item in self.get_items() for p in item.get('platforms', [])}
         
         # 设置日志
         self._setup_logging()
         
-        # 初始化数据库
-        db_config = self.config.get_database_config()
-        self.db = Database(db_config.get('path', 'data/price_history.db'))
-        
-        # 初始化通知器
-        notification_config = self.config.get_notification_config()
-        self.notifier = Notifier(notification_config)
+        # 初始化数据库、通知器、结果写入器
+        self._init_outputs()
         
-        # 初始化平台监控器
-        self.monitors = self._init_monitors()
+        # 平台健康状态（风控冷却），跨重启保留
+        self.health = PlatformHealth(self.config.get('health_file', 'data/platform_health.json'))
+
+        # 各平台熔断器（连续失败/错误率过高时快速跳过该平台）
+        self.breakers: Dict[str, CircuitBreaker] = {}
+
+        # 轮内调度：把抓取任务均匀分布在监控间隔内
+        self.scheduler = self._create_scheduler()
+
+        # 过载看门狗：一轮抓取耗时超过间隔时优先降级低优先级商品
+        self.watchdog = self._create_watchdog()
+
+        # 性能剖析：按采样率对部分轮次 / 选定商品做 cProfile 与 tracemalloc 剖析
+        self.force_profile = profile
+        self.profiler = self._create_profiler()
+        self._profile_rounds = 0
+
+        # 初始化平台监控器（多进程模式下由各抓取进程各自创建会话）
+        self.monitors = self._init_monitors() if self.workers == 1 else {}
+        self._shards: List[Optional['_ShardProcess']] = []
+
+        # 监视配置文件变化（热加载）
+        self.config_watcher = ConfigWatcher(self.config)
         
-        self.logger.info("价格监控程序初始化完成")
+        self.logger.info(
+            f"价格监控程序初始化完成（初始化 {time.perf_counter() - init_started:.2f} 秒，"
+            f"进程启动至今 {time.perf_counter() - _PROCESS_START:.2f} 秒）"
+        )
+
+    def get_items(self) -> List[Dict[str, Any]]:
+        """当前配置中需要监控的商品（按 item_names / platforms 过滤）"""
+        items = self.config.get_items()
+        if self.item_names:
+            items = [
+                item for item in items
+                if any(name in goods_name_key(item.get('name')) for name in self.item_names)
+            ]
+        if self.platform_filter is not None:
+            filtered = []
+            for item in items:
+                platforms = [p for p in item.get('platforms', []) if p in self.platform_filter]
+                if platforms:
+                    filtered.append(dict(item, platforms=platforms))
+            items = filtered
+        return items
+
+    def _platform_allowed(self, platform: str) -> bool:
+        return self.platform_filter is None or platform in self.platform_filter
+
+    @property
+    def db(self):
+        """数据库（首次写入时才打开并初始化表结构）"""
+        if self._db is None:
+            from utils.database import Database
+            db_config = self.config.get_database_config()
+            self._db = Database(db_config.get('path', 'data/price_history.db'))
+        return self._db
+
+    @property
+    def notifier(self):
+        """通知器（首次发送通知时才创建）"""
+        if self._notifier is None:
+            from utils.notification import Notifier
+            self._notifier = Notifier(self.config.get_notification_config())
+        return self._notifier
     
+    def _init_outputs(self) -> None:
+        """初始化结果写入器等输出（只在负责写入的进程中创建；数据库与通知器首次使用时创建）"""
+        self._db = None
+        self._notifier = None
+
+        # 初始化结果写入器
+        results_config = self.config.get('results', {}) or {}
+        self.result_writer = RoundResultWriter(
+            results_config.get('dir', 'data'),
+            keep_days=results_config.get('keep_days', 14),
+        )
+
+        # 流式价格统计（滚动中位数 / 分位数、最低价 EWMA 与波动率）
+        self.price_stats = self._create_price_stats()
+
+        # 价格历史的定时增量导出（后台线程）
+        self._export_thread: Optional[threading.Thread] = None
+        self._last_export = 0.0
+        self._export_warned = False
+
+        # 可选的只读 HTTP API
+        self.read_api: Optional['ReadApiServer'] = None
+        self._round_count = 0
+        # 只读 API 用最新结果索引填充，先剔除已从配置中移除的商品
+        self._prune_latest_results()
+        self._start_read_api()
+
+    def _create_price_stats(self) -> Optional[PriceStatsEngine]:
+        stats_config = self.config.get('stats', {}) or {}
+        if not stats_config.get('enabled', True):
+            return None
+        return PriceStatsEngine(
+            stats_config.get('file', 'data/price_stats.json'),
+            window_days=stats_config.get('window_days', 7),
+            relative_accuracy=stats_config.get('relative_accuracy', 0.01),
+            ewma_alpha=stats_config.get('ewma_alpha', 0.2),
+            checkpoint_interval=stats_config.get('checkpoint_interval', 300),
+            seen_ttl=stats_config.get('seen_ttl', 86400),
+        )
+
+    def _save_price_stats(self, force: bool = False) -> None:
+        if self.price_stats is None:
+            return
+        try:
+            self.price_stats.save(force=force)
+        except Exception as e:
+            self.logger.error(f"保存价格统计检查点失败: {e}")
+
+    def _maybe_export(self) -> None:
+        """按 export.interval 在后台线程增量导出价格历史（上一次导出未结束时跳过）"""
+        export_config = self.config.get('export', {}) or {}
+        if not export_config.get('enabled', False):
+            return
+        if self._export_thread is not None and self._export_thread.is_alive():
+            return
+        now = time.time()
+        if now - self._last_export < float(export_config.get('interval', 3600)):
+            return
+        from utils.exporter import PriceHistoryExporter, pyarrow_available
+        if not pyarrow_available():
+            if not self._export_warned:
+                self._export_warned = True
+                self.logger.warning("已启用价格历史导出，但未安装 pyarrow，跳过导出")
+            return
+        self._last_export = now
+        try:
+            exporter = PriceHistoryExporter(
+                self.config.get_database_config().get('path', 'data/price_history.db'),
+                export_config.get('dir', 'data/export'),
+                fmt=export_config.get('format', 'parquet'),
+                chunk_rows=export_config.get('chunk_rows', 50000),
+                compression=export_config.get('compression', 'zstd'),
+            )
+        except ValueError as e:
+            self.logger.error(f"价格历史导出配置无效: {e}")
+            return
+        self._export_thread = threading.Thread(
+            target=self._run_export, args=(exporter,), name='price-export', daemon=True
+        )
+        self._export_thread.start()
+
+    def _run_export(self, exporter) -> None:
+        try:
+            result = exporter.export()
+        except Exception as e:
+            self.logger.error(f"导出价格历史失败: {e}")
+            return
+        if result.rows:
+            self.logger.info(
+                f"价格历史已导出 {result.rows} 行（{result.files} 个文件，高水位线 id={result.high_water_mark}，"
+                f"耗时 {result.seconds:.1f} 秒）"
+            )
+
+    def _start_read_api(self) -> None:
+        """按 read_api 配置启动只读 API（未启用时不做任何事）"""
+        api_config = self.config.get('read_api', {}) or {}
+        if not api_config.get('enabled', False):
+            return
+        from utils.read_api import ReadApiServer, ReadApiState
+
+        state = ReadApiState(history_rounds=api_config.get('history_rounds', 100))
+        state.seed(self.result_writer.latest_records())
+        server = ReadApiServer(state, api_config.get('host', '127.0.0.1'), api_config.get('port', 8765))
+        try:
+            server.start()
+        except OSError as e:
+            self.logger.error(f"只读 API 启动失败: {e}")
+            return
+        self.read_api = server
+        self.logger.info(f"只读 API 已启动: http://{server.host}:{server.port}")
+
+    def _stop_read_api(self) -> None:
+        if self.read_api is not None:
+            self.read_api.stop()
+            self.read_api = None
+
     def _setup_logging(self):
         """设置日志"""
         log_config = self.config.get_logging_config()
@@ -67,10 +282,8 @@ class PriceMonitor:
         max_bytes = log_config.get('max_bytes', 10485760)  # 10MB
         backup_count = log_config.get('backup_count', 5)
 
-        # 行数裁剪配置：当日志超过 max_lines 行时，裁掉前 trim_head_lines 行。
-        # 说明：这是“剪头”策略，不依赖外部 logrotate。
-        self._log_trim_max_lines = int(log_config.get('max_lines', 30000))
-        self._log_trim_head_lines = int(log_config.get('trim_head_lines', 25000))
+        # 行数预算：monitor.log 超过 max_lines 行时整段轮转（增量计数，不再整文件扫描）
+        max_lines = int(log_config.get('max_lines', 30000))
         
         # 确保日志目录存在
         log_dir = os.path.dirname(log_file)
@@ -83,97 +296,65 @@ class PriceMonitor:
             datefmt='%Y-%m-%d %H:%M:%S'
         )
         
-        # 文件处理器
-        file_handler = RotatingFileHandler(
+        # 文件处理器（可选 JSON 结构化输出，控制台保持可读格式）
+        file_handler = LineBudgetRotatingFileHandler(
             log_file,
-            maxBytes=max_bytes,
-            backupCount=backup_count,
+            max_lines=max_lines,
+            max_bytes=max_bytes,
+            backup_count=backup_count,
             encoding='utf-8'
         )
-        file_handler.setFormatter(formatter)
+        if log_config.get('json', False):
+            file_handler.setFormatter(JsonFormatter(datefmt='%Y-%m-%d %H:%M:%S'))
+        else:
+            file_handler.setFormatter(formatter)
         self._file_handler = file_handler
         
         # 控制台处理器
         console_handler = logging.StreamHandler()
         console_handler.setFormatter(formatter)
+        self._console_handler = console_handler
+
+        # 热点日志采样（如每条命中商品的“找到匹配商品”），其余日志不受影响
+        sample_config = log_config.get('sample', {})
+        sampler = RateSampleFilter(
+            sample_config.get('patterns', ['找到匹配商品']),
+            max_per_second=sample_config.get('max_per_second', 5),
+        )
         
-        # 配置根日志器
+        # 配置根日志器：默认经队列交给后台线程写文件/控制台，抓取线程只做入队
         root_logger = logging.getLogger()
         root_logger.setLevel(getattr(logging, log_level))
-        root_logger.addHandler(file_handler)
-        root_logger.addHandler(console_handler)
+        self._log_listener = None
+        if log_config.get('async', True):
+            log_queue = queue.SimpleQueue()
+            queue_handler = QueueHandler(log_queue)
+            queue_handler.addFilter(sampler)
+            self._log_listener = QueueListener(
+                log_queue, file_handler, console_handler, respect_handler_level=True
+            )
+            self._log_listener.start()
+            atexit.register(self._stop_logging)
+            root_logger.addHandler(queue_handler)
+        else:
+            file_handler.addFilter(sampler)
+            console_handler.addFilter(sampler)
+            root_logger.addHandler(file_handler)
+            root_logger.addHandler(console_handler)
         
         self.logger = logging.getLogger(self.__class__.__name__)
 
-    def _trim_log_file_if_needed(self):
-        """当 monitor.log 行数过多时，安全裁掉文件头部的部分行。
-
-        关键点：需要协调 `RotatingFileHandler` 的文件描述符偏移。
-        - 先 acquire/flush/close handler 的 stream
-        - 原地重写 + truncate（避免 handler 写入旧 inode）
-        - 再 reopen，保证后续写入正常 append
-        """
-        handler = getattr(self, '_file_handler', None)
-        if handler is None:
-            return
-
-        log_file = getattr(handler, 'baseFilename', None)
-        if not log_file or not os.path.exists(log_file):
+    def _stop_logging(self):
+        """停止后台日志线程，并把队列中剩余的日志写完"""
+        listener = getattr(self, '_log_listener', None)
+        if listener is None:
             return
-
-        max_lines = int(getattr(self, '_log_trim_max_lines', 30000))
-        trim_head = int(getattr(self, '_log_trim_head_lines', 25000))
-        if max_lines <= 0 or trim_head <= 0:
-            return
-
-        # 快速统计行数（大文件仍是 O(n)，但 3w 级别通常可接受）
+        self._log_listener = None
         try:
-            with open(log_file, 'r', encoding='utf-8', errors='ignore') as f:
-                total_lines = sum(1 for _ in f)
+            listener.stop()
         except Exception:
-            return
-
-        if total_lines <= max_lines:
-            return
-
-        keep_lines = max(0, total_lines - trim_head)
-        # 防止极端情况把文件清空导致日志不可读
-        if keep_lines == 0:
-            keep_lines = min(total_lines, max_lines)
-
-        handler.acquire()
-        try:
-            try:
-                handler.flush()
-            except Exception:
-                pass
+            pass
 
-            # 关闭当前 stream，避免 trim 后偏移不一致造成“文件空洞”
-            try:
-                if getattr(handler, 'stream', None):
-                    handler.stream.close()
-            except Exception:
-                pass
-            handler.stream = None
-
-            # 读取末尾 keep_lines 行并原地重写
-            tail = deque(maxlen=keep_lines)
-            with open(log_file, 'r', encoding='utf-8', errors='ignore') as f:
-                for line in f:
-                    tail.append(line)
-
-            with open(log_file, 'w', encoding='utf-8') as f:
-                f.writelines(tail)
-
-            # 重新打开 stream
-            try:
-                handler.stream = handler._open()
-            except Exception:
-                # 失败也不影响主流程
-                handler.stream = None
-        finally:
-            handler.release()
-    
     def _init_monitors(self) -> Dict[str, Any]:
         """
         初始化平台监控器
@@ -185,20 +366,191 @@ class PriceMonitor:
         enabled_platforms = self.config.get_enabled_platforms()
         
         for platform in enabled_platforms:
-            platform_config = self.config.get_platform_config(platform)
-            
-            if platform == 'buff':
-                monitors['buff'] = BuffMonitor(platform_config)
-            elif platform == 'youpin':
-                monitors['youpin'] = YoupinMonitor(platform_config)
-            elif platform == 'ecosteam':
-                monitors['ecosteam'] = EcosteamMonitor(platform_config)
+            if not self._platform_allowed(platform):
+                continue
+            monitor = self._create_monitor(platform, self.config.get_platform_config(platform))
+            if monitor is not None:
+                monitors[platform] = monitor
             
             self.logger.info(f"已启用平台: {platform}")
         
         return monitors
+
+    def _create_monitor(self, platform: str, platform_config: Dict[str, Any]):
+        """按平台名创建监控器（未知平台返回 None；平台模块在此时才导入）"""
+        from monitors import get_monitor_class
+
+        monitor_class = get_monitor_class(platform)
+        if monitor_class is None:
+            return None
+        monitor = monitor_class(platform_config)
+        monitor.health = self.health
+        return monitor
+
+    def _breaker(self, platform: str) -> CircuitBreaker:
+        """获取平台熔断器（按 circuit_breaker 配置段懒创建）"""
+        breaker = self.breakers.get(platform)
+        if breaker is None:
+            cfg = self.config.get('circuit_breaker', {}) or {}
+            breaker = CircuitBreaker(
+                platform,
+                failure_threshold=cfg.get('failure_threshold', 3),
+                error_rate_threshold=cfg.get('error_rate_threshold', 0.5),
+                window=cfg.get('window', 20),
+                min_calls=cfg.get('min_calls', 6),
+                open_seconds=cfg.get('open_seconds', 300),
+                max_open_seconds=cfg.get('max_open_seconds', 3600),
+            )
+            self.breakers[platform] = breaker
+        return breaker
+
+    def _create_scheduler(self) -> SpreadScheduler:
+        schedule_config = self.config.get('schedule', {}) or {}
+        return SpreadScheduler(
+            jitter=schedule_config.get('jitter', 0.3),
+            fill=schedule_config.get('fill', 0.9),
+        )
+
+    def _create_watchdog(self) -> OverloadWatchdog:
+        overload_config = self.config.get('overload', {}) or {}
+        return OverloadWatchdog(
+            high_watermark=overload_config.get('high_watermark', 1.0),
+            low_watermark=overload_config.get('low_watermark', 0.7),
+        )
+
+    def _create_profiler(self):
+        profiling_config = self.config.get('profiling', {}) or {}
+        if not (self.force_profile or profiling_config.get('enabled', False)):
+            return None
+        from utils.profiler import RoundProfiler
+        try:
+            return RoundProfiler(
+                profiling_config.get('dir', 'data/profiles'),
+                sample_rate=1.0 if self.force_profile else profiling_config.get('sample_rate', 0.05),
+                every_rounds=0 if self.force_profile else profiling_config.get('every_rounds', 0),
+                items=profiling_config.get('items'),
+                top_n=profiling_config.get('top_n', 15),
+                sort=profiling_config.get('sort', 'cumulative'),
+                keep=profiling_config.get('keep', 50),
+                trace_memory=profiling_config.get('tracemalloc', True),
+                memory_frames=profiling_config.get('tracemalloc_frames', 1),
+            )
+        except ValueError as e:
+            self.logger.error(f"性能剖析配置无效: {e}")
+            return None
+
+    def _overload_enabled(self) -> bool:
+        return bool((self.config.get('overload', {}) or {}).get('enabled', True))
+
+    def _spread_enabled(self) -> bool:
+        """是否把每轮的抓取均匀分布在监控间隔内（关闭时沿用集中抓取、再空闲整个间隔）"""
+        return bool((self.config.get('schedule', {}) or {}).get('spread', True))
+
+    def _check_config_reload(self) -> None:
+        """配置文件变化时就地应用新配置（不重启进程、不丢弃已预热的会话）"""
+        try:
+            change = self.config_watcher.poll()
+        except Exception as e:
+            self.logger.error(f"检查配置文件变化失败: {e}")
+            return
+        if change is None:
+            return
+        self.logger.info(f"检测到配置文件变化: {change.summary()}")
+        self._apply_config_change(change)
+
+    def _apply_config_change(self, change: ConfigChange) -> None:
+        """
+        应用配置差异
+        
+        商品列表在每轮开始时重新读取，无需额外处理；平台配置就地合并到现有监控器，
+        只有连接级配置（base_url/headers/代理/Playwright 等）变化的平台才重建会话。
+        多进程模式下平台与熔断器配置由各抓取进程自行应用。
+        """
+        if self.workers == 1:
+            self._apply_crawl_config_change(change)
+
+        if 'notification' in change.sections_changed:
+            self._notifier = None
+            self.logger.info("通知配置已更新")
+
+        if 'results' in change.sections_changed:
+            self._flush_results()
+            results_config = self.config.get('results', {}) or {}
+            self.result_writer = RoundResultWriter(
+                results_config.get('dir', 'data'),
+                keep_days=results_config.get('keep_days', 14),
+            )
+            self._prune_latest_results()
+            self.logger.info("结果文件配置已更新")
+
+        if 'stats' in change.sections_changed:
+            self._save_price_stats(force=True)
+            self.price_stats = self._create_price_stats()
+            self.logger.info("价格统计配置已更新")
+
+        if 'read_api' in change.sections_changed:
+            self._stop_read_api()
+            self._start_read_api()
+            self.logger.info("只读 API 配置已更新")
+
+        if 'logging' in change.sections_changed:
+            self._apply_log_level()
+            self.logger.warning("日志配置已修改：日志级别已生效，文件/格式等其他选项需重启后生效")
+
+        if 'database' in change.sections_changed:
+            self.logger.warning("数据库配置已修改，需重启后生效")
+
+    def _apply_log_level(self) -> None:
+        log_level = self.config.get_logging_config().get('level', 'INFO')
+        level = getattr(logging, str(log_level).upper(), None)
+        if isinstance(level, int):
+            logging.getLogger().setLevel(level)
+
+    def _apply_crawl_config_change(self, change: ConfigChange) -> None:
+        """应用平台启停、平台配置与熔断器配置的变化"""
+        for platform in change.platforms_disabled:
+            monitor = self.monitors.pop(platform, None)
+            if monitor is not None:
+                monitor.close()
+                self.logger.info(f"已停用平台: {platform}")
+
+        for platform in change.platforms_enabled:
+            if not self._platform_allowed(platform):
+                continue
+            monitor = self._create_monitor(platform, self.config.get_platform_config(platform))
+            if monitor is not None:
+                self.monitors[platform] = monitor
+                self.logger.info(f"已启用平台: {platform}")
+
+        for platform in change.platforms_changed:
+            monitor = self.monitors.get(platform)
+            if monitor is None:
+                continue
+            platform_config = self.config.get_platform_config(platform)
+            if monitor.apply_config(platform_config):
+                self.logger.info(f"平台 {platform} 配置已就地更新")
+            else:
+                monitor.close()
+                self.monitors[platform] = self._create_monitor(platform, platform_config)
+                self.logger.info(f"平台 {platform} 连接配置变化，已重建会话")
+
+        if 'circuit_breaker' in change.sections_changed:
+            self.breakers.clear()
+            self.logger.info("熔断器配置已更新，各平台熔断状态已重置")
+
+        if 'schedule' in change.sections_changed:
+            self.scheduler = self._create_scheduler()
+            self.logger.info("调度配置已更新，下一轮生效")
+
+        if 'overload' in change.sections_changed:
+            self.watchdog = self._create_watchdog()
+            self.logger.info("过载保护配置已更新，过载等级已重置")
+
+        if 'profiling' in change.sections_changed:
+            self.profiler = self._create_profiler()
+            self.logger.info("性能剖析配置已更新，下一轮生效")
     
-    def monitor_item(self, item_config: Dict[str, Any]) -> List[Dict[str, Any]]:
+    def monitor_item(self, item_config: Dict[str, Any]) -> List[ListingBatch]:
         """
         监控单个商品
         
@@ -206,94 +558,677 @@ class PriceMonitor:
             item_config: 商品配置
             
         Returns:
-            价格信息列表
+            各平台的价格批次列表
         """
-        item_name = item_config.get('name')
-        wear_range = item_config.get('wear_range', {})
-        wear_min = wear_range.get('min', 0)
-        wear_max = wear_range.get('max', 1)
-        target_price = item_config.get('target_price', 0)
-        platforms = item_config.get('platforms', [])
+        return self.run_round([item_config])[0]
+
+    def run_round(
+        self,
+        items: List[Dict[str, Any]],
+        deadline: Optional[float] = None,
+        spread: bool = False,
+    ) -> List[List[ListingBatch]]:
+        """
+        执行一轮监控
         
-        self.logger.info(f"开始监控商品: {item_name}")
+        同一平台、同一商品标识（goods_id / templateId / 详情页 URL）的配置项只抓取一次
+        在售列表，各配置项的磨损区间和目标价都基于这份列表评估。
+        处于风控冷却期的平台不会发出请求：其任务推迟到冷却结束后执行，
+        若冷却结束时间晚于 deadline（或未给出 deadline）则本轮跳过。
+        熔断器打开的平台直接跳过其余任务；熔断时间结束后只放行一次半开探测。
+        高优先级商品的抓取排在最前；过载时按等级缩减或跳过低优先级商品的抓取。
         
-        all_prices = []
-        low_price_items = []
+        Args:
+            items: 商品配置列表
+            deadline: 本轮最晚结束时间戳（通常为下一轮开始时间）
+            spread: 是否把抓取任务均匀分布到 deadline 之前（需要给出 deadline）
+            
+        Returns:
+            与 items 一一对应的各平台价格批次列表
+        """
+        self._profile_rounds += 1
+        profiler = self.profiler
+        if profiler is not None and profiler.begin_round(self._profile_rounds) and not profiler.per_item:
+            with profiler.session(f"round{self._profile_rounds}"):
+                return self._run_round(items, deadline, spread)
+        return self._run_round(items, deadline, spread)
+
+    def _run_round(
+        self,
+        items: List[Dict[str, Any]],
+        deadline: Optional[float],
+        spread: bool,
+    ) -> List[List[ListingBatch]]:
+        round_started = time.time()
+        for item_config in items:
+            for platform in item_config.get('platforms', []):
+                if platform not in self.monitors:
+                    self.logger.warning(f"平台未启用: {platform}")
+
+        jobs = plan_crawl_jobs(items, self.monitors)
+        shared = sum(len(job.item_indices) for job in jobs)
+        if len(jobs) < shared:
+            self.logger.info(f"本轮 {shared} 个平台监控项合并为 {len(jobs)} 次抓取")
+        all_jobs = jobs
+        jobs, shed = self._prioritize_jobs(items, jobs)
+
+        slots: Optional[List[float]] = None
+        if spread and deadline is not None and jobs:
+            now = time.time()
+            slots = self.scheduler.plan(len(jobs), now, deadline - now)
+            self.logger.info(
+                f"本轮 {len(jobs)} 次抓取分布在 {max(0, int(deadline - now))} 秒内"
+                f"（平均间隔 {max(0.0, deadline - now) * self.scheduler.fill / len(jobs):.1f} 秒）"
+            )
+
+        results: List[List[ListingBatch]] = [[] for _ in items]
+        in_band: List[List[ListingBatch]] = [[] for _ in items]
+        pending = [0] * len(items)
+        for job in all_jobs:
+            for index in job.item_indices:
+                pending[index] += 1
+        started = [False] * len(items)
+        item_keys = [result_key(item.get('name'), *item_band(item)) for item in items]
+
+        def complete(
+            job: CrawlJob, crawled: Optional[Tuple[List[ListingBatch], List[ListingBatch]]]
+        ) -> None:
+            for index, band_index in zip(job.item_indices, job.band_indices):
+                if crawled is not None:
+                    batches, full = crawled
+                    # 每个配置项拿到自己的副本，商品名称以配置项为准
+                    prices = batches[band_index][:]
+                    prices.item_name = items[index].get('name')
+                    if prices:
+                        self.logger.info(f"在 {job.platform} 找到 {len(prices)} 个匹配商品")
+                        results[index].append(prices)
+                    else:
+                        self.logger.info(f"在 {job.platform} 未找到匹配商品")
+                    if full[band_index]:
+                        in_band[index].append(full[band_index])
+
+                pending[index] -= 1
+                if pending[index] == 0:
+                    self._finalize_item(items[index], results[index], in_band[index])
+
+        busy = [0.0]
+
+        def process(job: CrawlJob) -> None:
+            breaker = self._breaker(job.platform)
+            if not breaker.allow():
+                self.logger.warning(f"{job.platform} 已熔断（{breaker.describe()}），快速跳过: {job.item_name}")
+                complete(job, None)
+                return
+            started_at = time.time()
+            for index in job.item_indices:
+                if not started[index]:
+                    started[index] = True
+                    self.logger.info(f"开始监控商品: {items[index].get('name')}")
+                    period = self.scheduler.record_start(item_keys[index], time.time())
+                    if period is not None:
+                        self.logger.debug(f"{items[index].get('name')} 实际间隔 {period:.1f} 秒")
+            profiler = self.profiler
+            if profiler is not None and profiler.item_selected(job.item_name):
+                with profiler.session(f"{job.platform}-{job.item_name}"):
+                    crawled = self._run_crawl_job(job)
+            else:
+                crawled = self._run_crawl_job(job)
+            complete(job, crawled)
+            # 延迟，避免请求过快
+            time.sleep(2)
+            busy[0] += time.time() - started_at
+
+        deferred: List[CrawlJob] = []
+        try:
+            for job in shed:
+                self.logger.info(f"过载降级，本轮跳过低优先级抓取: {job.platform} {job.item_name}")
+                complete(job, None)
+
+            for position, job in enumerate(jobs):
+                if slots is not None:
+                    # 等到本任务的计划时间（已落后于计划时立即执行）
+                    self._sleep_until(slots[position])
+                if _should_exit:
+                    break
+                # 冷却中的平台直接推迟，不进入 get_item_price
+                if self.health.is_blocked(job.platform):
+                    deferred.append(job)
+                    continue
+                process(job)
+
+            # 冷却结束后再执行被推迟的任务（按冷却结束时间先后）
+            while deferred and not _should_exit:
+                deferred.sort(key=lambda j: self.health.blocked_until(j.platform))
+                job = deferred[0]
+                until = self.health.blocked_until(job.platform)
+                if deadline is None or until > deadline:
+                    break
+                self.logger.info(f"{job.platform} 冷却中，等待 {max(0, int(until - time.time()))} 秒后执行推迟的任务")
+                self._sleep_until(until)
+                if _should_exit:
+                    break
+                if self.health.is_blocked(job.platform):
+                    continue
+                deferred.pop(0)
+                process(job)
+
+            for job in deferred:
+                remaining = int(self.health.remaining(job.platform))
+                self.logger.warning(
+                    f"{job.platform} 处于风控冷却期（剩余 {remaining} 秒），本轮跳过: {job.item_name}"
+                )
+                complete(job, None)
+
+            if deadline is not None:
+                self._report_schedule(item_keys, deadline)
+                self._observe_load(busy[0], deadline - round_started)
+        finally:
+            self._report_breakers()
+            # 本轮结果批量写入压缩分段，并原子更新最新结果索引
+            self._publish_round(round_started, len(items), deadline, spread)
+            self._flush_results()
+
+        return results
+
+    def run_round_sharded(
+        self,
+        items: List[Dict[str, Any]],
+        deadline: Optional[float] = None,
+        spread: bool = False,
+    ) -> None:
+        """
+        多进程执行一轮监控
+        
+        商品按名称及各平台商品标识分组划分给各抓取进程（同名或同一商品标识的配置项
+        仍在进程内合并抓取）；每个商品抓完后
+        结果经队列送回本进程，由本进程统一入库、写结果文件和发送通知，SQLite 始终只有
+        一个写入者。
         
-        # 遍历配置的平台
-        for platform in platforms:
-            if platform not in self.monitors:
-                self.logger.warning(f"平台未启用: {platform}")
+        Args:
+            items: 商品配置列表
+            deadline: 本轮最晚结束时间戳（转交给各抓取进程）
+            spread: 各抓取进程是否把本分片的任务均匀分布到 deadline 之前
+        """
+        round_started = time.time()
+        self._ensure_shards()
+        partitions = partition_items(items, self.workers, self._goods_keys)
+        waiting = set()
+        for shard, indices in enumerate(partitions):
+            if indices:
+                self._shards[shard].tasks.put(([items[i] for i in indices], deadline, spread))
+                waiting.add(shard)
+        self.logger.info(
+            f"本轮 {len(items)} 个商品分配到 {len(waiting)} 个抓取进程: {'/'.join(str(len(p)) for p in partitions)}"
+        )
+
+        status: Dict[str, Dict[str, Any]] = {}
+        try:
+            while waiting:
+                if _should_exit and not self._shard_stop.is_set():
+                    # 让抓取进程尽快结束本轮
+                    self._shard_stop.set()
+                try:
+                    kind, shard, payload = self._shard_results.get(timeout=1.0)
+                except queue.Empty:
+                    for shard in list(waiting):
+                        if not self._shards[shard].process.is_alive():
+                            self.logger.error(f"抓取进程 {shard} 异常退出，本轮其余结果丢失")
+                            waiting.discard(shard)
+                    continue
+                if kind == 'item':
+                    self._finalize_item(*payload)
+                elif kind == 'done':
+                    waiting.discard(shard)
+                    for platform, snapshot in payload.items():
+                        status.setdefault(platform, {}).setdefault('shards', {})[str(shard)] = snapshot
+        finally:
+            if status:
+                for platform_status in status.values():
+                    # 平台整体状态取各进程中最差的熔断器
+                    worst = max(
+                        platform_status['shards'].values(),
+                        key=lambda s: _BREAKER_SEVERITY.get(s['breaker']['state'], 0),
+                    )
+                    platform_status['breaker'] = worst['breaker']
+                self.logger.info(
+                    "平台熔断状态: " + ', '.join(f"{p}={s['breaker']['state']}" for p, s in sorted(status.items()))
+                )
+                self._set_platform_status(status)
+            self._publish_round(round_started, len(items), deadline, spread)
+            self._flush_results()
+
+    def _goods_keys(self, item_config: Dict[str, Any]) -> List[str]:
+        """配置项在各平台上的商品标识（与 plan_crawl_jobs 的合并依据一致，不创建监控器）"""
+        from monitors import get_monitor_class
+
+        keys = []
+        for platform in item_config.get('platforms', []):
+            monitor_class = get_monitor_class(platform)
+            if monitor_class is not None:
+                goods_key = monitor_class.goods_key(
+                    item_config.get('name'), item_config, self.config.get_platform_config(platform)
+                )
+                keys.append(f"{platform}|{goods_key}")
+        return keys
+
+    def _ensure_shards(self) -> None:
+        """启动抓取进程（首次调用时），并重启异常退出的进程"""
+        if not self._shards:
+            # 统一使用 spawn：子进程不继承父进程的日志线程与连接
+            ctx = multiprocessing.get_context('spawn')
+            self._mp_context = ctx
+            self._shard_results = ctx.Queue()
+            self._shard_log_queue = ctx.Queue()
+            self._shard_stop = ctx.Event()
+            # 子进程日志经队列汇总到本进程的文件/控制台处理器
+            self._shard_log_listener = QueueListener(
+                self._shard_log_queue, self._file_handler, self._console_handler, respect_handler_level=True
+            )
+            self._shard_log_listener.start()
+            self._shards = [None] * self.workers
+
+        for shard in range(self.workers):
+            current = self._shards[shard]
+            if current is not None and current.process.is_alive():
                 continue
-            
-            try:
-                #  获取价格信息
-                monitor = self.monitors[platform]
-                
-                # 对于可能被信号中断的操作，进行重试（Windows后台运行时可能会收到误触发的信号）
-                max_retries = 10  # 增加重试次数
-                for retry in range(max_retries):
-                    try:
-                        prices = monitor.get_item_price(item_name, wear_min, wear_max, item_config=item_config)
-                        break  # 成功，跳出重试循环
-                    except KeyboardInterrupt:
-                        if retry < max_retries - 1:
-                            self.logger.warning(f"{platform} 监控被意外中断，重试中... ({retry+1}/{max_retries})")
-                            time.sleep(1)  # 缩短重试间隔
-                        else:
-                            self.logger.error(f"{platform} 监控多次被中断，跳过")
-                            prices = []
-                            break
-                
-                if prices:
-                    self.logger.info(f"在 {platform} 找到 {len(prices)} 个匹配商品")
-                    all_prices.extend(prices)
-                    
-                    # 检查是否有低于目标价格的商品
-                    for price_info in prices:
-                        if price_info['price'] <= target_price:
-                            low_price_items.append(price_info)
-                else:
-                    self.logger.info(f"在 {platform} 未找到匹配商品")
-                
-                # 延迟，避免请求过快
-                time.sleep(2)
-            
-            except Exception as e:
-                self.logger.error(f"监控平台 {platform} 时出错: {e}")
+            if current is not None:
+                self.logger.warning(f"抓取进程 {shard} 已退出（exitcode={current.process.exitcode}），重新启动")
+            tasks = self._mp_context.Queue()
+            process = self._mp_context.Process(
+                target=_shard_worker_main,
+                args=(
+                    self.config_path, shard, tasks, self._shard_results, self._shard_log_queue, self._shard_stop,
+                    sorted(self.platform_filter) if self.platform_filter is not None else None,
+                ),
+                name=f"shard-{shard}",
+                daemon=True,
+            )
+            process.start()
+            self._shards[shard] = _ShardProcess(process, tasks)
+            self.logger.info(f"已启动抓取进程 {shard} (pid={process.pid})")
+
+    def _stop_shards(self) -> None:
+        """通知抓取进程退出并等待结束"""
+        if not self._shards:
+            return
+        self._shard_stop.set()
+        for current in self._shards:
+            if current is not None and current.process.is_alive():
+                current.tasks.put(None)
+        for current in self._shards:
+            if current is None:
+                continue
+            current.process.join(timeout=30)
+            if current.process.is_alive():
+                self.logger.warning(f"抓取进程 {current.process.name} 未能按时退出，强制结束")
+                current.process.terminate()
+        self._shards = []
+        self._shard_log_listener.stop()
+
+    def _prioritize_jobs(self, items: List[Dict[str, Any]], jobs: List[CrawlJob]):
+        """
+        按优先级排序抓取任务，并按当前过载等级降级
+        
+        任务的优先级取共享它的配置项中最高的一个。
+        
+        Returns:
+            (本轮执行的任务, 本轮跳过的任务)
+        """
+        def job_rank(job: CrawlJob) -> int:
+            return min(PRIORITY_RANK[item_priority(items[i])] for i in job.item_indices)
+
+        ranked = sorted(jobs, key=job_rank)
+        if not self._overload_enabled() or self.watchdog.level == 0:
+            return ranked, []
+
+        kept: List[CrawlJob] = []
+        shed: List[CrawlJob] = []
+        scaled = 0
+        for job in ranked:
+            factor = self.watchdog.budget_factor(PRIORITIES[job_rank(job)])
+            if factor <= 0:
+                shed.append(job)
+                continue
+            if factor < 1:
+                budget = self.monitors[job.platform].scale_crawl_budget(job.crawl_config, factor)
+                if budget != job.crawl_config:
+                    job.crawl_config = budget
+                    scaled += 1
+            kept.append(job)
+        self.logger.warning(
+            f"过载等级 {self.watchdog.level}（{self.watchdog.describe()}）：跳过 {len(shed)} 次抓取，"
+            f"缩减 {scaled} 次抓取的翻页预算"
+        )
+        return kept, shed
+
+    def _observe_load(self, busy_seconds: float, window: float) -> None:
+        """用本轮实际抓取耗时更新过载等级"""
+        if not self._overload_enabled():
+            return
+        before = self.watchdog.level
+        level = self.watchdog.observe(busy_seconds, window)
+        if level == before:
+            return
+        message = (
+            f"过载等级 {before} -> {level}（本轮抓取耗时 {busy_seconds:.0f} 秒 / 间隔 {window:.0f} 秒，"
+            f"平滑负载 {self.watchdog.load:.2f}）：{self.watchdog.describe()}"
+        )
+        if level > before:
+            self.logger.warning(message)
+        else:
+            self.logger.info(message)
+
+    def _report_schedule(self, item_keys: List[str], deadline: float) -> None:
+        """对比各商品的计划间隔与实际间隔"""
+        self.scheduler.forget(item_keys)
+        planned = self.config.get_monitor_interval()
+        report = self.scheduler.period_report(item_keys)
+        if report is not None:
+            self.logger.info(
+                f"商品监控间隔: 计划 {planned} 秒，实际 平均 {report['mean']:.1f} 秒 "
+                f"(最短 {report['min']:.1f} / 最长 {report['max']:.1f}，{report['count']} 个商品)"
+            )
+        overrun = time.time() - deadline
+        if overrun > 0:
+            self.logger.warning(f"本轮抓取超出计划时间 {overrun:.0f} 秒，下一轮将顺延")
+
+    def _report_breakers(self) -> None:
+        """输出各平台熔断器状态，并写入最新结果索引"""
+        if not self.breakers:
+            return
+        breakers = [self.breakers[p] for p in sorted(self.breakers)]
+        self.logger.info(f"平台熔断状态: {', '.join(b.describe() for b in breakers)}")
+        self._set_platform_status({b.name: {'breaker': b.snapshot()} for b in breakers})
+
+    def _set_platform_status(self, status: Dict[str, Any]) -> None:
+        """登记各平台状态：写入最新结果索引，并提供给只读 API"""
+        self.result_writer.set_platform_status(status)
+        if self.read_api is not None:
+            self.read_api.state.set_platforms(status)
+
+    def _publish_round(self, started: float, item_count: int, deadline: Optional[float], spread: bool) -> None:
+        """本轮结束：更新只读 API 的轮次状态并重建汇总响应"""
+        if self.read_api is None:
+            return
+        self._round_count += 1
+        finished = time.time()
+        if deadline is None:
+            next_round = None
+        elif spread:
+            next_round = max(deadline, finished)
+        else:
+            next_round = finished + self.config.get_monitor_interval()
+        status = {
+            'round': self._round_count,
+            'started_at': time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(started)),
+            'finished_at': time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(finished)),
+            'duration_seconds': round(finished - started, 1),
+            'items': item_count,
+            'workers': self.workers,
+            'interval_seconds': self.config.get_monitor_interval(),
+            'next_round_at': time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(next_round)) if next_round else None,
+        }
+        if self.workers == 1:
+            status['overload_level'] = self.watchdog.level
+        self.read_api.state.set_round(status)
+        self.read_api.state.publish()
+
+    def _sleep_until(self, until: float) -> None:
+        """分段等待到指定时间戳，以便及时响应退出信号"""
+        while not _should_exit:
+            remaining = until - time.time()
+            if remaining <= 0:
+                break
+            time.sleep(min(1.0, remaining))
+
+    def _run_crawl_job(self, job: CrawlJob) -> Tuple[List[ListingBatch], List[ListingBatch]]:
+        """
+        执行一次合并抓取
+        
+        Returns:
+            (价格批次, 区间内全部挂单)，均与 job.bands 一一对应（出错时为空批次）；
+            后者是平台截取最便宜的若干个之前的结果，供滚动价格统计使用
+        """
+        monitor = self.monitors[job.platform]
+        batches: List[Any] = []
+        error: Optional[str] = None
+        monitor.last_in_band = None
+        try:
+            # 对于可能被信号中断的操作，进行重试（Windows后台运行时可能会收到误触发的信号）
+            max_retries = 10  # 增加重试次数
+            for retry in range(max_retries):
+                try:
+                    batches = monitor.get_item_prices_multi(job.item_name, job.bands, item_config=job.crawl_config)
+                    break  # 成功，跳出重试循环
+                except KeyboardInterrupt:
+                    if retry < max_retries - 1:
+                        self.logger.warning(f"{job.platform} 监控被意外中断，重试中... ({retry+1}/{max_retries})")
+                        time.sleep(1)  # 缩短重试间隔
+                    else:
+                        self.logger.error(f"{job.platform} 监控多次被中断，跳过")
+                        batches = []
+                        error = '多次被中断'
+                        break
+        except Exception as e:
+            self.logger.error(f"监控平台 {job.platform} 时出错: {e}")
+            batches = []
+            error = str(e)
+        self._record_breaker(job.platform, error or getattr(monitor, 'last_error', None))
+
+        in_band = (monitor.last_in_band or []) if batches else []
+        out: List[ListingBatch] = []
+        out_in_band: List[ListingBatch] = []
+        for i in range(len(job.bands)):
+            prices = batches[i] if i < len(batches) else None
+            # 兼容仍返回 list[dict] 的监控器
+            if not isinstance(prices, ListingBatch):
+                prices = ListingBatch.from_dicts(prices or [], platform=job.platform, item_name=job.item_name)
+            out.append(prices)
+            full = in_band[i] if i < len(in_band) else None
+            out_in_band.append(full if isinstance(full, ListingBatch) else prices)
+        return out, out_in_band
+
+    def _record_breaker(self, platform: str, error: Optional[str]) -> None:
+        """记录一次抓取结果，熔断状态变化时输出日志"""
+        breaker = self._breaker(platform)
+        before = breaker.state
+        if error:
+            breaker.record_failure(error)
+        else:
+            breaker.record_success()
+        if breaker.state == before:
+            return
+        if breaker.state == OPEN:
+            self.logger.warning(f"{platform} 熔断器打开（{breaker.describe()}），最近错误: {error}")
+        else:
+            self.logger.info(f"{platform} 熔断器状态: {before} -> {breaker.state}")
+
+    def _finalize_item(
+        self,
+        item_config: Dict[str, Any],
+        all_prices: List[ListingBatch],
+        in_band: Optional[List[ListingBatch]] = None,
+    ) -> None:
+        """
+        单个商品所有平台抓取完成后：入库、保存汇总结果、检查低价并通知
+        
+        Args:
+            item_config: 商品配置
+            all_prices: 各平台的价格批次（各平台返回的最便宜的若干个）
+            in_band: 各平台磨损区间内的全部挂单（计入滚动价格统计；默认同 all_prices）
+        """
+        item_name = item_config.get('name')
+        wear_min, wear_max = item_band(item_config)
+        target_price = item_config.get('target_price', 0)
+
+        # 检查是否有低于目标价格的商品
+        low_price_items: List[ListingBatch] = []
+        for prices in all_prices:
+            low = prices.price_at_most(target_price)
+            if low:
+                low_price_items.append(low)
+
+        # 低于滚动中位数一定比例的商品（并把本轮价格计入流式统计）
+        below_median_pct = self._below_median_pct(item_config)
+        median_deals = self._update_price_stats(
+            result_key(item_name, wear_min, wear_max), all_prices if in_band is None else in_band, below_median_pct
+        )
+        for low, _ in median_deals:
+            # 区间内挂单来自合并抓取，商品名称以配置项为准
+            low.item_name = item_name
         
         # 保存价格记录到数据库
         if all_prices:
             self.db.insert_prices_batch(all_prices)
-            self.logger.info(f"已保存 {len(all_prices)} 条价格记录")
+            self.logger.info(f"已保存 {count_listings(all_prices)} 条价格记录")
             
-            # 保存汇总结果到文件
+            # 登记汇总结果（本轮结束时统一写盘）
             try:
-                save_monitoring_results(all_prices, item_name, wear_min, wear_max)
+                record = self.result_writer.add(all_prices, item_name, wear_min, wear_max)
+                if record is not None and self.read_api is not None:
+                    self.read_api.state.update_item(result_key(item_name, wear_min, wear_max), record)
             except Exception as e:
                 self.logger.error(f"保存汇总结果失败: {e}")
         
         # 发送低价通知
         if low_price_items:
             self._send_price_alert(item_name, target_price, low_price_items)
+        if median_deals:
+            self._send_median_alert(item_name, below_median_pct, median_deals)
+
+    def _below_median_pct(self, item_config: Dict[str, Any]) -> float:
+        """低于滚动中位数多少百分比时提醒（商品配置优先，0 表示不提醒）"""
+        value = item_config.get('below_median_pct')
+        if value is None:
+            value = (self.config.get('stats', {}) or {}).get('below_median_pct', 0)
+        try:
+            return max(0.0, float(value or 0))
+        except (TypeError, ValueError):
+            return 0.0
+
+    def _update_price_stats(
+        self, item_key: str, all_prices: List[ListingBatch], below_median_pct: float
+    ) -> List[Tuple[ListingBatch, float]]:
+        """
+        先按更新前的滚动中位数找出低价挂单，再把本轮价格计入统计（避免本轮挂单拉低基准）
         
-        return all_prices
+        只有本轮新出现（或改价）的挂单计入分位数、参与低价提醒，同一挂单不会每轮重复提醒。
+        all_prices 应是磨损区间内的全部挂单，而不是各平台截取后的最便宜的若干个，
+        否则中位数偏低，且各平台含义不一致。
+        
+        Returns:
+            (低于阈值的价格批次, 该平台的滚动中位数) 列表
+        """
+        stats = self.price_stats
+        if stats is None:
+            return []
+        min_samples = int((self.config.get('stats', {}) or {}).get('min_samples', 50))
+        now = time.time()
+        deals: List[Tuple[ListingBatch, float]] = []
+        for prices in all_prices:
+            if not len(prices):
+                continue
+            key = stats.key(item_key, prices.platform)
+            identities = listing_identities(prices.prices, prices.wears, prices.ids)
+            if below_median_pct > 0 and stats.samples(key, now) >= min_samples:
+                median = stats.quantile(key, 0.5, now)
+                threshold = median * (1 - below_median_pct / 100)
+                low = prices.take(
+                    i for i in stats.fresh_indices(key, identities) if prices.prices[i] <= threshold
+                ).sorted_by_price()
+                if low:
+                    deals.append((low, median))
+            stats.update(key, prices.prices, now, identities)
+        return deals
     
-    def _send_price_alert(self, item_name: str, target_price: float, price_list: List[Dict[str, Any]]):
+    def _prune_latest_results(self) -> None:
+        """从最新结果索引与只读 API 中移除已不在配置中的商品（不受 --item / --platform 过滤影响）"""
+        keys = [result_key(item.get('name'), *item_band(item)) for item in self.config.get_items()]
+        removed = self.result_writer.retain(keys)
+        if not removed:
+            return
+        self.logger.info(f"最新结果索引移除 {len(removed)} 个已不在配置中的商品")
+        if self.read_api is not None:
+            self.read_api.state.remove_items(removed)
+            self.read_api.state.publish()
+
+    def _flush_results(self) -> None:
+        """写出本轮登记的监控结果（先剔除已从配置中移除的商品）"""
+        self._prune_latest_results()
+        try:
+            segment = self.result_writer.flush()
+            if segment is not None:
+                self.logger.info(f"监控结果已追加到: {segment}，最新结果: {self.result_writer.latest_path}")
+        except Exception as e:
+            self.logger.error(f"保存汇总结果失败: {e}")
+        self._save_price_stats()
+
+    def _send_price_alert(self, item_name: str, target_price: float, price_list: List[ListingBatch]):
         """
         发送价格预警通知
         
         Args:
             item_name: 商品名称
             target_price: 目标价格
-            price_list: 价格列表
+            price_list: 各平台低于目标价的价格批次
         """
         title = f"【价格预警】{item_name}"
-        content = f"发现低于目标价格 ¥{target_price:.2f} 的商品，共 {len(price_list)} 个"
+        content = f"发现低于目标价格 ¥{target_price:.2f} 的商品，共 {count_listings(price_list)} 个"
         
         self.logger.info(f"发送价格预警: {title}")
         self.notifier.send(title, content, price_list)
+
+    def _send_median_alert(self, item_name: str, pct: float, deals: List[Tuple[ListingBatch, float]]):
+        """
+        发送低于滚动中位数的预警通知
+        
+        Args:
+            item_name: 商品名称
+            pct: 低于中位数的百分比阈值
+            deals: (低价批次, 该平台滚动中位数) 列表
+        """
+        window_days = self.price_stats.window_days if self.price_stats is not None else 7
+        price_list = [low for low, _ in deals]
+        medians = '，'.join(f"{low.platform} 中位数 ¥{median:.2f}" for low, median in deals)
+        title = f"【低价预警】{item_name}"
+        content = (
+            f"发现低于 {window_days} 天中位数 {pct:g}% 的商品，共 {count_listings(price_list)} 个（{medians}）"
+        )
+
+        self.logger.info(f"发送价格预警: {title}")
+        self.notifier.send(title, content, price_list)
     
+    def run_once(self) -> int:
+        """
+        执行一轮监控后退出（供定时任务 / 临时检查使用）
+        
+        Returns:
+            进程退出码：0 正常，2 没有匹配的商品
+        """
+        signal.signal(signal.SIGINT, signal_handler)
+        items = self.get_items()
+        if not items:
+            self.logger.error("没有匹配的监控商品")
+            self._stop_logging()
+            return 2
+
+        self.logger.info(f"单次运行: {len(items)} 个商品，平台 {', '.join(sorted(self.monitors)) or '无'}")
+        started = time.time()
+        try:
+            results = self.run_round(items)
+        except KeyboardInterrupt:
+            self.logger.info("接收到强制停止信号，程序退出")
+            results = []
+        finally:
+            self._save_price_stats(force=True)
+            self._stop_read_api()
+            for monitor in self.monitors.values():
+                monitor.close()
+        listings = sum(count_listings(batches) for batches in results)
+        self.logger.info(f"单次运行完成: {len(items)} 个商品，{listings} 条价格记录，耗时 {time.time() - started:.1f} 秒")
+        self._stop_logging()
+        return 0
+
     def run(self):
         """运行监控"""
         global _should_exit
@@ -307,7 +1242,7 @@ class PriceMonitor:
         self.logger.info("价格监控程序启动")
         self.logger.info("=" * 50)
         
-        items = self.config.get_items()
+        items = self.get_items()
         interval = self.config.get_monitor_interval()
         
         if not items:
@@ -316,50 +1251,200 @@ class PriceMonitor:
         
         self.logger.info(f"监控商品数量: {len(items)}")
         self.logger.info(f"监控间隔: {interval} 秒")
+        if self.workers > 1:
+            self.logger.info(f"抓取进程数: {self.workers}")
         
         try:
             while not _should_exit:
-                # 每轮开始前做一次日志裁剪，避免长期运行把磁盘/内存拖垮
-                self._trim_log_file_if_needed()
+                # 每轮开始前应用配置变化，商品列表与间隔以最新配置为准
+                self._check_config_reload()
+                items = self.get_items()
+                interval = self.config.get_monitor_interval()
+
                 self.logger.info("-" * 50)
                 self.logger.info(f"开始新一轮监控 - {time.strftime('%Y-%m-%d %H:%M:%S')}")
                 self.logger.info("-" * 50)
                 
-                # 监控每个商品
-                for item_config in items:
-                    if _should_exit:
-                        break
-                    try:
-                        self.monitor_item(item_config)
-                    except Exception as e:
-                        self.logger.error(f"监控商品时出错: {e}", exc_info=True)
+                # 监控所有商品（同一商品标识合并抓取）
+                round_start = time.time()
+                spread = self._spread_enabled()
+                try:
+                    if self.workers > 1:
+                        self.run_round_sharded(items, deadline=round_start + interval, spread=spread)
+                    else:
+                        self.run_round(items, deadline=round_start + interval, spread=spread)
+                except Exception as e:
+                    self.logger.error(f"监控商品时出错: {e}", exc_info=True)
                 
                 if _should_exit:
                     break
+
+                self._maybe_export()
                 
-                self.logger.info(f"本轮监控完成，等待 {interval} 秒...")
+                # 均匀分布时本轮已覆盖整个间隔，只需等到下一轮的计划开始时间
+                wait = max(0, int(round(round_start + interval - time.time()))) if spread else interval
+                self.logger.info(f"本轮监控完成，等待 {wait} 秒...")
                 # 分段sleep，以便及时响应退出信号
-                for _ in range(interval):
+                for second in range(wait):
                     if _should_exit:
                         break
                     time.sleep(1)
+                    if second % 5 == 4:
+                        self._check_config_reload()
         
         except KeyboardInterrupt:
             self.logger.info("接收到强制停止信号，程序退出")
         except Exception as e:
             self.logger.error(f"程序运行异常: {e}", exc_info=True)
         finally:
+            self._stop_shards()
+            self._save_price_stats(force=True)
+            self._stop_read_api()
+            for monitor in self.monitors.values():
+                monitor.close()
             self.logger.info("程序正常退出")
+            self._stop_logging()
+
+
+# 熔断器状态的严重程度（汇总多个进程时取最差）
+_BREAKER_SEVERITY = {'closed': 0, 'half_open': 1, OPEN: 2}
+
+
+@dataclass
+class _ShardProcess:
+    """一个抓取进程及其任务队列"""
+
+    process: Any
+    tasks: Any
+
+
+class ShardWorker(PriceMonitor):
+    """
+    抓取进程中的监控器
+    
+    拥有自己的平台会话、熔断器和配置热加载；不打开数据库、不发通知，每个商品抓完后
+    把结果放入结果队列，由主进程统一写入。
+    """
+
+    def __init__(self, config_path: str, shard: int, results, log_queue, platforms: Optional[Sequence[str]] = None):
+        self.shard = shard
+        self._results = results
+        self._log_queue = log_queue
+        self._round_status: Dict[str, Any] = {}
+        super().__init__(config_path, workers=1, platforms=platforms)
+
+    def _setup_logging(self):
+        """日志全部经队列交给主进程输出"""
+        log_config = self.config.get_logging_config()
+        sample_config = log_config.get('sample', {})
+        queue_handler = QueueHandler(self._log_queue)
+        queue_handler.addFilter(RateSampleFilter(
+            sample_config.get('patterns', ['找到匹配商品']),
+            max_per_second=sample_config.get('max_per_second', 5),
+        ))
+        root_logger = logging.getLogger()
+        root_logger.setLevel(getattr(logging, log_config.get('level', 'INFO')))
+        root_logger.addHandler(queue_handler)
+        self._log_listener = None
+        self.logger = logging.getLogger(f"{self.__class__.__name__}-{self.shard}")
+
+    def _init_outputs(self) -> None:
+        self.price_stats = None
+        self.read_api = None
+
+    def _apply_config_change(self, change: ConfigChange) -> None:
+        self._apply_crawl_config_change(change)
+        if 'logging' in change.sections_changed:
+            self._apply_log_level()
+
+    def _finalize_item(
+        self,
+        item_config: Dict[str, Any],
+        all_prices: List[ListingBatch],
+        in_band: Optional[List[ListingBatch]] = None,
+    ) -> None:
+        self._results.put(('item', self.shard, (item_config, all_prices, in_band)))
+
+    def _flush_results(self) -> None:
+        pass
+
+    def _report_breakers(self) -> None:
+        self._round_status = {name: {'breaker': b.snapshot()} for name, b in self.breakers.items()}
+
+    def serve(self, tasks) -> None:
+        """循环执行主进程派发的轮次，收到 None 时退出"""
+        while not _should_exit:
+            task = tasks.get()
+            if task is None:
+                break
+            items, deadline, spread = task
+            self._check_config_reload()
+            # 读取其他进程记录的风控冷却
+            self.health.reload()
+            self._round_status = {}
+            try:
+                self.run_round(items, deadline=deadline, spread=spread)
+            except Exception as e:
+                self.logger.error(f"监控商品时出错: {e}", exc_info=True)
+            self._results.put(('done', self.shard, self._round_status))
+        for monitor in self.monitors.values():
+            monitor.close()
+
+
+def _exit_when_set(stop_event) -> None:
+    """主进程要求退出时设置本进程的退出标志"""
+    global _should_exit
+    stop_event.wait()
+    _should_exit = True
+
+
+def _shard_worker_main(
+    config_path: str,
+    shard: int,
+    tasks,
+    results,
+    log_queue,
+    stop_event,
+    platforms: Optional[Sequence[str]] = None,
+) -> None:
+    """抓取进程入口"""
+    # Ctrl+C 由主进程统一处理，子进程通过 stop_event 退出
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    threading.Thread(target=_exit_when_set, args=(stop_event,), daemon=True).start()
+    worker = ShardWorker(config_path, shard, results, log_queue, platforms)
+    worker.serve(tasks)
 
 
 def main():
     """主函数"""
-    # 创建监控器
-    monitor = PriceMonitor("config.json")
+    parser = argparse.ArgumentParser(description='平台价格监控程序')
+    parser.add_argument('--config', default='config.json', help='配置文件路径')
+    parser.add_argument('--workers', type=int, default=None, help='抓取进程数（默认读取配置 workers，1 为单进程）')
+    parser.add_argument('--once', action='store_true', help='只执行一轮后退出（单进程）')
+    parser.add_argument('--item', action='append', dest='items', metavar='NAME',
+                        help='只监控名称包含该关键字的商品（可重复）')
+    parser.add_argument('--platform', action='append', dest='platforms', metavar='PLATFORM',
+                        help='只监控该平台（可重复）')
+    parser.add_argument('--profile', action='store_true',
+                        help='剖析每一轮（cProfile + tracemalloc，结果写入 profiling.dir，默认 data/profiles）')
+    args = parser.parse_args()
+
+    # 创建监控器（只创建本次运行用到的平台会话）
+    monitor = PriceMonitor(
+        args.config,
+        workers=1 if args.once else args.workers,
+        platforms=args.platforms,
+        item_names=args.items,
+        profile=args.profile,
+    )
     
     # 运行监控
+    if args.once:
+        return monitor.run_once()
     monitor.run()
+    return 0
 
 
 if __name__ == "__main__":
-    main()
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -1,7 +1,34 @@
-"""监控模块初始化文件"""
+"""监控模块初始化文件
+
+平台监控器按需导入：只有实际用到的平台才会加载对应模块及其依赖。
+"""
+from importlib import import_module
+from typing import Optional, Type
+
 from .base import PlatformMonitor
-from .buff import BuffMonitor
-from .youpin import YoupinMonitor
-from .ecosteam import EcosteamMonitor
 
-__all__ = ['PlatformMonitor', 'BuffMonitor', 'YoupinMonitor', 'EcosteamMonitor']
+# 平台名 -> (模块, 类名)
+MONITOR_CLASSES = {
+    'buff': ('.buff', 'BuffMonitor'),
+    'youpin': ('.youpin', 'YoupinMonitor'),
+    'ecosteam': ('.ecosteam', 'EcosteamMonitor'),
+}
+
+
+def get_monitor_class(platform: str) -> Optional[Type[PlatformMonitor]]:
+    """按平台名导入并返回监控器类（未知平台返回 None）"""
+    entry = MONITOR_CLASSES.get(platform)
+    if entry is None:
+        return None
+    module_name, class_name = entry
+    return getattr(import_module(module_name, __name__), class_name)
+
+
+def __getattr__(name: str):
+    for module_name, class_name in MONITOR_CLASSES.values():
+        if class_name == name:
+            return getattr(import_module(module_name, __name__), class_name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+__all__ = ['PlatformMonitor', 'BuffMonitor', 'YoupinMonitor', 'EcosteamMonitor', 'get_monitor_class']
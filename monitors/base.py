@@ -1,14 +1,31 @@
 """平台监控基类"""
 from abc import ABC, abstractmethod
-from typing import Dict, List, Any, Optional
+from typing import Callable, Dict, List, Any, Optional, Sequence, Tuple
 import requests
 import time
 import logging
 from urllib.parse import urlparse
 
+from utils.listing_batch import ListingBatch
+from utils.listing_filter import range_indices, select_bands
+from utils.listing_sync import IncrementalListingSync
+from utils.names import goods_name_key
+from utils.page_fingerprint import PageFingerprintCache
+from utils.platform_health import PlatformHealth
+
 
 class PlatformMonitor(ABC):
     """平台监控抽象基类"""
+
+    # 影响单次抓取范围的商品级配置键 -> (平台级同名配置键, 默认值)
+    # 同一商品的多个配置项合并抓取时，按各自的有效值取最大
+    CRAWL_BUDGET_KEYS: Dict[str, Tuple[str, Optional[int]]] = {}
+
+    # 变化后必须重建会话的连接级配置键（其余配置可就地生效）
+    CONNECTION_KEYS: Tuple[str, ...] = ('base_url', 'headers', 'proxies', 'proxy')
+
+    # 平台名（用于健康状态等按平台区分的记录）
+    PLATFORM = ''
     
     def __init__(self, config: Dict[str, Any]):
         """
@@ -36,6 +53,16 @@ class PlatformMonitor(ABC):
         if cookie:
             self._load_cookie_string(str(cookie))
         self.logger = logging.getLogger(self.__class__.__name__)
+        # 平台健康状态（冷却期）；主程序会替换为共享、持久化的实例
+        self.health = PlatformHealth()
+        # 最近一次抓取的错误（成功时为 None）；抓取异常被监控器自行捕获，主程序据此统计熔断
+        self.last_error: Optional[str] = None
+        # 最近一次抓取各磨损区间内的全部挂单（截取最便宜的 limit 个之前），供滚动价格统计使用
+        self.last_in_band: Optional[List[Optional[ListingBatch]]] = None
+        # 第 1 页指纹缓存：第 1 页未变化时沿用上次抓取的后续页
+        self.page_cache = PageFingerprintCache()
+        # 增量同步：按最新上架排序只拉新挂单（平台配置 incremental_sync 开启）
+        self.listing_sync = IncrementalListingSync()
 
     def _load_cookie_string(self, cookie: str) -> None:
         """将 'a=1; b=2' 形式的 cookie 字符串写入 session.cookies。"""
@@ -71,6 +98,29 @@ class PlatformMonitor(ABC):
             else:
                 self.session.cookies.set(name, value)
     
+    def apply_config(self, config: Dict[str, Any]) -> bool:
+        """
+        就地应用新的平台配置（热加载）
+        
+        保留现有会话（Cookie、冷却状态、缓存等）；Cookie 变化时写入现有会话。
+        
+        Returns:
+            False 表示连接级配置发生变化，需要重建监控器
+        """
+        for key in self.CONNECTION_KEYS:
+            if self.config.get(key) != config.get(key):
+                return False
+        old_cookie = self.config.get('cookie') or self.config.get('Cookie')
+        self.config = config
+        cookie = config.get('cookie') or config.get('Cookie')
+        if cookie and cookie != old_cookie:
+            self._load_cookie_string(str(cookie))
+        return True
+
+    def close(self) -> None:
+        """释放会话资源（监控器被替换或平台停用时调用）"""
+        self.session.close()
+
     @abstractmethod
     def get_item_price(
         self,
@@ -89,14 +139,233 @@ class PlatformMonitor(ABC):
             item_config: 整个商品配置（可选，用于平台自定义字段，如 goods_id 等）
             
         Returns:
-            价格信息列表，每个元素包含：
-            - price: 价格
-            - wear: 磨损值
-            - url: 商品链接
-            - timestamp: 时间戳
+            价格信息批次 `utils.listing_batch.ListingBatch`（同批共享 platform/item_name/url/timestamp，
+            逐条只存 price/wear）；仍返回旧式 list[dict] 的实现会在主程序中被自动转换
         """
         pass
     
+    @classmethod
+    def goods_key(
+        cls,
+        item_name: str,
+        item_config: Optional[Dict[str, Any]] = None,
+        platform_config: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        """
+        平台商品标识：同一轮中 key 相同的配置项只抓取一次在售列表
+        
+        默认按商品名称区分（统一大小写与空白），平台可改为 goods_id / template_id 等。
+        只依赖配置、不需要监控器实例，多进程模式下主进程据此划分分片。
+        """
+        return f"name:{goods_name_key(item_name)}"
+
+    def get_goods_key(self, item_name: str, item_config: Optional[Dict[str, Any]] = None) -> str:
+        """当前平台配置下的商品标识（见 goods_key）"""
+        return self.goods_key(item_name, item_config, self.config)
+
+    def merge_crawl_configs(self, item_configs: Sequence[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        合并共享一次抓取的多个商品配置
+        
+        以第一个配置为基础，CRAWL_BUDGET_KEYS 中的抓取范围参数取各配置有效值的最大值
+        （未在商品中配置的取平台配置或默认值）；无法确定有效值时移除该键，交由平台默认逻辑处理。
+        """
+        merged = dict(item_configs[0])
+        for key, (platform_key, default) in self.CRAWL_BUDGET_KEYS.items():
+            if all(c.get(key) is None for c in item_configs):
+                continue
+            values: Optional[List[int]] = []
+            for c in item_configs:
+                value = c.get(key)
+                if value is None:
+                    value = self.config.get(platform_key, default)
+                try:
+                    values.append(int(value))
+                except (TypeError, ValueError):
+                    values = None
+                    break
+            if values:
+                merged[key] = max(values)
+            else:
+                merged.pop(key, None)
+        return merged
+
+    def scale_crawl_budget(self, crawl_config: Dict[str, Any], factor: float) -> Dict[str, Any]:
+        """
+        按系数缩减抓取范围（过载降级用）
+        
+        CRAWL_BUDGET_KEYS 中能确定有效值的参数乘以 factor，大于 0 的值至少保留 1；
+        没有抓取范围参数的平台原样返回。
+        """
+        scaled = dict(crawl_config)
+        for key, (platform_key, default) in self.CRAWL_BUDGET_KEYS.items():
+            value = scaled.get(key)
+            if value is None:
+                value = self.config.get(platform_key, default)
+            try:
+                value = int(value)
+            except (TypeError, ValueError):
+                continue
+            scaled[key] = max(1, int(value * factor)) if value > 0 else value
+        return scaled
+
+    def get_item_prices_multi(
+        self,
+        item_name: str,
+        bands: Sequence[Tuple[float, float]],
+        item_config: Optional[Dict[str, Any]] = None,
+    ) -> List[ListingBatch]:
+        """
+        对同一商品的多个磨损区间求价格
+        
+        默认逐个区间调用 get_item_price；支持一次抓取的平台应覆盖此方法。
+        
+        Args:
+            item_name: 商品名称
+            bands: 磨损区间列表 [(wear_min, wear_max), ...]
+            item_config: 商品配置（合并抓取时为合并后的配置）
+            
+        Returns:
+            与 bands 一一对应的价格批次
+        """
+        results = []
+        in_band: List[Optional[ListingBatch]] = []
+        for wear_min, wear_max in bands:
+            self.last_in_band = None
+            results.append(self.get_item_price(item_name, wear_min, wear_max, item_config))
+            in_band.append(self.last_in_band[0] if self.last_in_band else None)
+        self.last_in_band = in_band
+        return results
+
+    def _select_bands(
+        self,
+        crawl: ListingBatch,
+        bands: Sequence[Tuple[float, float]],
+        limit: Optional[int] = None,
+        observed_wears: Optional[Sequence[float]] = None,
+        label: str = '',
+    ) -> List[ListingBatch]:
+        """
+        从一次抓取的全部在售商品中，为每个磨损区间选出最便宜的 limit 个
+
+        截取前各区间内的全部挂单记录在 last_in_band 中（不排序），滚动价格统计据此计数，
+        不受各平台返回条数上限的影响。
+        """
+        selections = select_bands(crawl.wears, crawl.prices, bands, limit)
+        results = []
+        for (wear_min, wear_max), indices in zip(bands, selections):
+            batch = crawl.take(indices)
+            for result in batch:
+                self.logger.info(
+                    f"找到匹配商品 - 价格: {result.price}, 磨损: {result.wear:.6f}"
+                )
+            if not batch and observed_wears:
+                self.logger.info(
+                    f"{label} 未命中磨损区间: {wear_min}-{wear_max}；样本磨损范围: {min(observed_wears):.6f}-{max(observed_wears):.6f}"
+                )
+            results.append(batch)
+        if limit is None:
+            self.last_in_band = results
+        else:
+            self.last_in_band = [
+                crawl.take(range_indices(crawl.wears, wear_min, wear_max)) for wear_min, wear_max in bands
+            ]
+        return results
+
+    def _reuse_deeper_pages(self, key: str, fingerprint: str) -> Optional[Any]:
+        """
+        第 1 页与上次完整抓取时相同，且未到重新验证的轮数 / 时间时，返回上次的后续页结果
+
+        平台配置 `page1_revalidate_rounds`（默认 4，<=1 关闭）控制每隔多少轮强制完整抓取，
+        `page1_cache_max_age_seconds`（默认 1800）控制缓存最长沿用时间。
+        """
+        rounds = int(self.config.get('page1_revalidate_rounds', 4))
+        if rounds <= 1:
+            return None
+        return self.page_cache.lookup(
+            key, fingerprint, rounds, float(self.config.get('page1_cache_max_age_seconds', 1800))
+        )
+
+    def _remember_deeper_pages(self, key: str, fingerprint: str, payload: Any, complete: bool = True) -> None:
+        """登记一次完整抓取的后续页结果（抓取不完整时丢弃该商品的缓存）"""
+        if complete and int(self.config.get('page1_revalidate_rounds', 4)) > 1:
+            self.page_cache.store(key, fingerprint, payload)
+        else:
+            self.page_cache.invalidate(key)
+
+    def _incremental_sync_ready(self, key: str) -> bool:
+        """是否对该商品使用增量同步（已开启，且本轮不需要完整抓取）"""
+        if not self.config.get('incremental_sync', False):
+            return False
+        self.listing_sync.configure(
+            self.config.get('incremental_full_resync_rounds', 12),
+            self.config.get('incremental_recheck_rounds', 3),
+        )
+        return not self.listing_sync.needs_full(key)
+
+    def _seed_listing_sync(self, key: str, crawl: ListingBatch, complete: bool) -> None:
+        """完整抓取后重建该商品的在售集合（未开启增量同步或抓取不完整时丢弃）"""
+        if self.config.get('incremental_sync', False) and complete:
+            if not self.listing_sync.seed(key, crawl.ids, crawl.prices, crawl.wears):
+                self.logger.debug(f"{self.PLATFORM} 挂单缺少 ID，无法增量同步: {key}")
+        else:
+            self.listing_sync.drop(key)
+
+    def _sync_listings(
+        self,
+        key: str,
+        fetch_newest: Callable[[int], Optional[List[Dict[str, Any]]]],
+        fetch_cheapest: Callable[[], Optional[List[Dict[str, Any]]]],
+        parse: Callable[[List[Dict[str, Any]]], Tuple[List[Any], Sequence[float], Sequence[float]]],
+        page_delay: float = 0.0,
+    ) -> bool:
+        """
+        增量同步一轮：按最新上架翻页直到遇到已知挂单，到期时复查价格最低的一页
+        
+        Args:
+            key: 商品标识（与完整抓取时 seed 使用的一致）
+            fetch_newest: 按最新上架排序请求第 N 页（失败时返回 None）
+            fetch_cheapest: 按价格升序请求第 1 页（失败时返回 None）
+            parse: 把一页原始挂单解析为 (ID 列, 价格列, 磨损列)
+            page_delay: 翻页间隔秒数
+            
+        Returns:
+            False 表示本轮需要退回完整抓取
+        """
+        sync = self.listing_sync
+        max_pages = max(1, int(self.config.get('incremental_max_pages', 2)))
+        added = 0
+        for page in range(1, max_pages + 1):
+            if page > 1:
+                self._sleep(page_delay)
+            items = fetch_newest(page)
+            if items is None:
+                return False
+            ids, prices, wears = parse(items)
+            if any(i is None for i in ids):
+                return False
+            page_added, reached_known = sync.add_newest(key, ids, prices, wears)
+            added += page_added
+            if reached_known or not items:
+                break
+        else:
+            self.logger.info(f"{self.PLATFORM} 增量同步翻到第 {max_pages} 页仍未遇到已知挂单，改为完整抓取")
+            return False
+
+        removed = 0
+        if sync.recheck_due(key):
+            self._sleep(page_delay)
+            items = fetch_cheapest()
+            if items is None:
+                return False
+            ids, prices, wears = parse(items)
+            if any(i is None for i in ids):
+                return False
+            removed = sync.recheck(key, ids, prices, wears)
+        sync.finish_round(key)
+        self.logger.info(f"{self.PLATFORM} 增量同步: 新增 {added} 个挂单，移除 {removed} 个")
+        return True
+
     def _make_request(self, url: str, method: str = 'GET', **kwargs) -> requests.Response:
         """
         发送HTTP请求
@@ -1,22 +1,32 @@
 """网易BUFF平台监控"""
-from typing import Dict, List, Any, Optional
+from functools import partial
+from typing import Dict, List, Any, Optional, Sequence, Tuple
 import atexit
-import time
 import os
-import json
+from utils import jsoncodec
+from utils.listing_batch import ListingBatch
+from utils.listing_filter import parse_columns, range_indices
+from utils.names import goods_name_key
+from utils.page_fingerprint import page_fingerprint
 from .base import PlatformMonitor
+from .page_stream import PageStream
 
 
 class BuffMonitor(PlatformMonitor):
     """网易BUFF平台监控器"""
 
+    PLATFORM = 'buff'
+    CONNECTION_KEYS = PlatformMonitor.CONNECTION_KEYS + ('use_playwright', 'playwright_headless', 'playwright_proxy')
+    CRAWL_BUDGET_KEYS = {'buff_max_pages': ('max_pages', 10)}
+
     def __init__(self, config: Dict[str, Any]):
         super().__init__(config)
         self._pw = None
         self._browser = None
         self._context = None
         self._page = None
-        atexit.register(self._close_playwright)
+        # 退出时关闭浏览器的钩子在 Playwright 实际启动时才注册
+        self._pw_atexit_registered = False
 
     def _close_playwright(self) -> None:
         for obj in (self._page, self._context, self._browser):
@@ -35,6 +45,10 @@ class BuffMonitor(PlatformMonitor):
         self._context = None
         self._page = None
 
+    def close(self) -> None:
+        self._close_playwright()
+        super().close()
+
     def _load_cookies_from_file(self) -> None:
         """尝试从 data/buff_cookies.json 加载 Cookie。
 
@@ -49,8 +63,7 @@ class BuffMonitor(PlatformMonitor):
             return
 
         try:
-            with open(cookie_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            data = jsoncodec.read_file(cookie_file)
             cookies_list = data.get('cookies', [])
             if not isinstance(cookies_list, list) or not cookies_list:
                 return
@@ -95,6 +108,9 @@ class BuffMonitor(PlatformMonitor):
             ) from e
 
         self._pw = sync_playwright().start()
+        if not self._pw_atexit_registered:
+            atexit.register(self._close_playwright)
+            self._pw_atexit_registered = True
 
         headless = bool(self.config.get('playwright_headless', True))
 
@@ -195,7 +211,7 @@ class BuffMonitor(PlatformMonitor):
                     continue
                 if resp.status != 200:
                     raise RuntimeError(f"BUFF Playwright status={resp.status}")
-                return resp.json()
+                return jsoncodec.loads(resp.body())
             except Exception as e:
                 last_exc = e
 
@@ -231,20 +247,42 @@ class BuffMonitor(PlatformMonitor):
                     self.logger.warning("BUFF 返回 403，刷新 CSRF 后重试一次")
                     continue
                 resp.raise_for_status()
-                return resp.json()
+                return jsoncodec.response_json(resp)
             except Exception as e:
                 last_err = e
         if last_err:
             raise last_err
         raise RuntimeError('BUFF 请求失败')
     
+    def _parse_sell_order_item(self, item: Dict[str, Any]) -> Optional[Tuple[float, float]]:
+        """解析 sell_order 单条记录为 (wear, price)；缺少磨损或格式异常时返回 None。"""
+        try:
+            paintwear = (item.get('asset_info') or {}).get('paintwear')
+            if paintwear is None:
+                return None
+            return float(paintwear), float(item.get('price', 0))
+        except (ValueError, TypeError, AttributeError) as e:
+            self.logger.warning(f"解析商品数据失败: {e}")
+            return None
+
+    @classmethod
+    def goods_key(
+        cls,
+        item_name: str,
+        item_config: Optional[Dict[str, Any]] = None,
+        platform_config: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        """同一 buff_goods_id 的配置项共享一次在售列表抓取"""
+        goods_id = (item_config or {}).get('buff_goods_id')
+        return f"goods:{goods_id}" if goods_id else f"name:{goods_name_key(item_name)}"
+
     def get_item_price(
         self,
         item_name: str,
         wear_min: float,
         wear_max: float,
         item_config: Optional[Dict[str, Any]] = None,
-    ) -> List[Dict[str, Any]]:
+    ) -> ListingBatch:
         """
         获取BUFF平台商品价格
         
@@ -254,213 +292,192 @@ class BuffMonitor(PlatformMonitor):
             wear_max: 最大磨损
             
         Returns:
-            价格信息列表
+            价格信息批次（按价格升序，最多20个）
+        """
+        return self.get_item_prices_multi(item_name, [(wear_min, wear_max)], item_config)[0]
+
+    def _resolve_goods_id(self, item_name: str, item_config: Optional[Dict[str, Any]]) -> Optional[Any]:
+        """优先使用配置中的 goods_id，否则回退到搜索接口（接口失效时可能报错）"""
+        prefix = '(Playwright) ' if self._use_playwright() else ''
+        item_id = None
+        if item_config is not None:
+            item_id = item_config.get('buff_goods_id')
+            if item_id:
+                self.logger.info(f"{prefix}使用配置的 BUFF goods_id: {item_id}")
+                return item_id
+
+        search_url = f"{self.base_url}/api/market/search"
+        params = {
+            'game': 'csgo',
+            'page_num': 1,
+            'search': item_name
+        }
+        if self._use_playwright():
+            # goods_id 建议在配置里提供，否则搜索接口也可能被风控
+            self._pw_preheat('')
+            data = self._pw_get_json(search_url, params=params, referer=f"{self.base_url}/")
+        else:
+            self.logger.info(f"搜索商品: {item_name}")
+            data = jsoncodec.response_json(self._make_request(search_url, params=params))
+
+        if data.get('code') != 'OK' or not data.get('data', {}).get('items'):
+            self.logger.warning(f"{prefix}未找到商品: {item_name}")
+            return None
+
+        # 获取第一个匹配的商品ID
+        item_id = data['data']['items'][0]['id']
+        self.logger.info(f"{prefix}找到商品ID: {item_id}")
+        if not self._use_playwright():
+            self._sleep(1)
+        return item_id
+
+    def get_item_prices_multi(
+        self,
+        item_name: str,
+        bands: Sequence[Tuple[float, float]],
+        item_config: Optional[Dict[str, Any]] = None,
+    ) -> List[ListingBatch]:
+        """
+        抓取一次在售列表，同时评估多个磨损区间
+        
+        Args:
+            item_name: 商品名称
+            bands: 磨损区间列表 [(wear_min, wear_max), ...]
+            item_config: 商品配置
+            
+        Returns:
+            与 bands 一一对应的价格批次（各自按价格升序，最多20个）
         """
-        results = []
+        crawl = ListingBatch('buff', item_name)
         observed_wears: List[float] = []
+        self.last_error = None
         
         try:
             # 尝试加载文件 Cookie（只有完整登录态才会覆盖）
             self._load_cookies_from_file()
 
-            # 如果启用 Playwright：尽量用浏览器上下文请求（更容易通过风控）
-            if self._use_playwright():
-                # goods_id 建议在配置里提供，否则搜索接口也可能被风控
-                item_id = None
-                if item_config is not None:
-                    item_id = item_config.get('buff_goods_id')
-                    if item_id:
-                        self.logger.info(f"(Playwright) 使用配置的 BUFF goods_id: {item_id}")
-
-                if not item_id:
-                    # 尝试用 Playwright 搜索
-                    search_url = f"{self.base_url}/api/market/search"
-                    self._pw_preheat('')
-                    payload = self._pw_get_json(search_url, params={'game': 'csgo', 'page_num': 1, 'search': item_name}, referer=f"{self.base_url}/")
-                    if payload.get('code') != 'OK' or not payload.get('data', {}).get('items'):
-                        self.logger.warning(f"(Playwright) 未找到商品: {item_name}")
-                        return results
-                    item_id = payload['data']['items'][0]['id']
-
-                goods_url = f"{self.base_url}/goods/{item_id}"
-                self._pw_preheat(str(item_id))
-
-                sell_url = f"{self.base_url}/api/market/goods/sell_order"
-                max_pages = 10
-                page_size = 50
-                max_results = 100
-
-                for page_num in range(1, max_pages + 1):
-                    params = {
-                        'game': 'csgo',
-                        'goods_id': item_id,
-                        'page_num': page_num,
-                        'page_size': page_size,
-                        'sort_by': 'price.asc',
-                    }
-
-                    self.logger.info(f"(Playwright) 获取在售列表: {item_id} (page={page_num})")
-                    data = self._pw_get_json(sell_url, params=params, referer=goods_url)
-                    if data.get('code') != 'OK':
-                        self.logger.error(f"(Playwright) 获取在售列表失败: {data.get('error')}")
-                        return results
-
-                    items = data.get('data', {}).get('items', [])
-                    if not items:
-                        break
-
-                    for item in items:
-                        try:
-                            asset_info = item.get('asset_info', {})
-                            paintwear = asset_info.get('paintwear')
-                            if paintwear is None:
-                                continue
-
-                            wear_value = float(paintwear)
-                            if len(observed_wears) < 30:
-                                observed_wears.append(wear_value)
-
-                            if wear_min <= wear_value <= wear_max:
-                                price = float(item.get('price', 0))
-                                results.append({
-                                    'platform': 'buff',
-                                    'item_name': item_name,
-                                    'price': price,
-                                    'wear': wear_value,
-                                    'url': goods_url,
-                                    'timestamp': int(time.time()),
-                                })
-                        except Exception:
-                            continue
-
-                    if len(results) >= max_results:
-                        break
-
-                    time.sleep(0.6)
-
-                results.sort(key=lambda x: x['price'])
-                results = results[:20]
-                return results
-
-            # 优先使用配置中提供的 goods_id，避免依赖可能失效的搜索接口
-            item_id = None
-            if item_config is not None:
-                item_id = item_config.get('buff_goods_id')
-                if item_id:
-                    self.logger.info(f"使用配置的 BUFF goods_id: {item_id}")
-            
-            # 如未在配置中提供，则回退到原有搜索逻辑（若接口已失效可能会报错）
+            item_id = self._resolve_goods_id(item_name, item_config)
             if not item_id:
-                search_url = f"{self.base_url}/api/market/search"
-                params = {
-                    'game': 'csgo',
-                    'page_num': 1,
-                    'search': item_name
-                }
-                
-                self.logger.info(f"搜索商品: {item_name}")
-                response = self._make_request(search_url, params=params)
-                data = response.json()
-                
-                if data.get('code') != 'OK' or not data.get('data', {}).get('items'):
-                    self.logger.warning(f"未找到商品: {item_name}")
-                    return results
-                
-                # 获取第一个匹配的商品ID
-                item_id = data['data']['items'][0]['id']
-                self.logger.info(f"找到商品ID: {item_id}")
-                
-                self._sleep(1)
-            
-            # 2. 获取商品在售列表（使用 goods_id），多页扫描收集所有符合磨损区间的商品
-            # BUFF 风控经常校验 Referer/Origin/CSRF
-            self.session.headers.setdefault('Referer', f"{self.base_url}/goods/{item_id}")
-            self.session.headers.setdefault('Origin', self.base_url)
-            self.session.headers.setdefault('X-Requested-With', 'XMLHttpRequest')
-            self.session.headers.setdefault('Accept', 'application/json, text/plain, */*')
-            self.session.headers.setdefault('Accept-Language', 'zh-CN,zh;q=0.9,en-US;q=0.7,en;q=0.6')
-
-            # 预热一次商品页，刷新 session/csrf
-            self._preheat_goods_page(str(item_id))
+                return [crawl.take(()) for _ in bands]
 
+            goods_url = f"{self.base_url}/goods/{item_id}"
+            crawl.url = goods_url
             sell_url = f"{self.base_url}/api/market/goods/sell_order"
-            max_pages = 10  # 增加翻页上限以收集更多数据
-            page_size = 50
-            max_results = 100  # 收集足够多的候选项用于排序筛选
 
-            for page_num in range(1, max_pages + 1):
+            # 如果启用 Playwright：尽量用浏览器上下文请求（更容易通过风控）
+            if self._use_playwright():
+                self._pw_preheat(str(item_id))
+                prefix = '(Playwright) '
+                page_delay = 0.6
+                # Playwright 同步 API 只能在创建它的线程中使用，不做后台预取
+                prefetch = False
+                fetch_json = partial(self._pw_get_json, sell_url, referer=goods_url)
+            else:
+                # BUFF 风控经常校验 Referer/Origin/CSRF
+                self.session.headers.setdefault('Referer', goods_url)
+                self.session.headers.setdefault('Origin', self.base_url)
+                self.session.headers.setdefault('X-Requested-With', 'XMLHttpRequest')
+                self.session.headers.setdefault('Accept', 'application/json, text/plain, */*')
+                self.session.headers.setdefault('Accept-Language', 'zh-CN,zh;q=0.9,en-US;q=0.7,en;q=0.6')
+
+                # 预热一次商品页，刷新 session/csrf
+                self._preheat_goods_page(str(item_id))
+                prefix = ''
+                page_delay = 0.8
+                prefetch = True
+                fetch_json = partial(self._get_json_with_csrf_retry, sell_url)
+
+            # 获取商品在售列表（使用 goods_id），多页扫描收集所有在售商品
+            # 翻页上限：单品 buff_max_pages 优先，其次平台 max_pages（过载降级时会缩减 buff_max_pages）
+            max_pages = 10
+            budget = item_config.get('buff_max_pages') if item_config else None
+            try:
+                max_pages = max(1, int(budget if budget is not None else self.config.get('max_pages', 10)))
+            except (TypeError, ValueError):
+                pass
+            page_size = 50
+            max_results = 100  # 每个区间收集足够多的候选项用于排序筛选
+            hits = [0] * len(bands)
+            # 第 1 页指纹缓存（翻页提前结束的条件取决于磨损区间，按区间分开缓存）
+            cache_key = f"{item_id}|{tuple(bands)}"
+            fingerprint = None
+            page1_size = 0
+            complete = True
+
+            def fetch_page(page_num: int, sort_by: str = 'price.asc') -> Optional[List[Dict[str, Any]]]:
                 params = {
                     'game': 'csgo',
                     'goods_id': item_id,
                     'page_num': page_num,
                     'page_size': page_size,
-                    # 以价格升序获取更接近最低价的列表
-                    'sort_by': 'price.asc'
+                    # 默认以价格升序获取更接近最低价的列表；增量同步时按最新上架排序
+                    'sort_by': sort_by
                 }
 
-                self.logger.info(f"获取在售列表: {item_id} (page={page_num})")
-                data = self._get_json_with_csrf_retry(sell_url, params=params)
+                self.logger.info(f"{prefix}获取在售列表: {item_id} (page={page_num}, sort={sort_by})")
+                data = fetch_json(params)
 
                 if data.get('code') != 'OK':
-                    self.logger.error(f"获取在售列表失败: {data.get('error')}")
-                    return results
-
-                items = data.get('data', {}).get('items', [])
+                    self.logger.error(f"{prefix}获取在售列表失败: {data.get('error')}")
+                    if page_num == 1:
+                        self.last_error = f"获取在售列表失败: {data.get('error')}"
+                    return None
+                return data.get('data', {}).get('items', [])
+
+            def parse_page(items: List[Dict[str, Any]]) -> Tuple[List[Any], Sequence[float], Sequence[float]]:
+                wears, prices, source_index = parse_columns(items, self._parse_sell_order_item)
+                return [items[i].get('id') for i in source_index], prices, wears
+
+            # 增量同步：按最新上架只拉新挂单，沿用本地在售集合
+            if self._incremental_sync_ready(cache_key):
+                newest = str(self.config.get('incremental_sort_by', 'created.desc'))
+                if self._sync_listings(
+                    cache_key, lambda page_num: fetch_page(page_num, newest), lambda: fetch_page(1), parse_page, page_delay
+                ):
+                    prices, wears, ids = self.listing_sync.columns(cache_key)
+                    crawl.extend_columns(prices, wears, ids=ids)
+                    observed_wears.extend(wears[:30])
+                    return self._select_bands(crawl, bands, limit=20, observed_wears=observed_wears, label='BUFF')
+                # 退回完整抓取：增量请求的失败不计入本轮结果
+                self.last_error = None
+
+            # 解析当前页的同时在后台请求下一页
+            stream = PageStream(fetch_page, max_pages, page_delay=page_delay, prefetch=prefetch, name='buff-pages')
+            for page_num, items in stream:
                 if not items:
+                    # None 表示请求失败（空列表才是真正没有更多数据）
+                    complete = complete and items is not None
                     break
 
-                # 3. 筛选磨损区间内的商品
-                for item in items:
-                    try:
-                        asset_info = item.get('asset_info', {})
-                        paintwear = asset_info.get('paintwear')
-
-                        if paintwear is None:
-                            continue
-
-                        wear_value = float(paintwear)
-                        if len(observed_wears) < 30:
-                            observed_wears.append(wear_value)
-
-                        if wear_min <= wear_value <= wear_max:
-                            price = float(item.get('price', 0))
-
-                            result = {
-                                'platform': 'buff',
-                                'item_name': item_name,
-                                'price': price,
-                                'wear': wear_value,
-                                'url': f"{self.base_url}/goods/{item_id}",
-                                'timestamp': int(time.time())
-                            }
-                            results.append(result)
-
-                    except (ValueError, KeyError) as e:
-                        self.logger.warning(f"解析商品数据失败: {e}")
-                        continue
-
-                # 已收集足够数据，停止翻页
-                if len(results) >= max_results:
-                    break
-
-                self._sleep(0.8)
+                # 整页解析为磨损/价格列（连同挂单 ID），保留整页供所有区间共用
+                page_ids, prices, wears = parse_page(items)
+                observed_wears.extend(wears[:max(0, 30 - len(observed_wears))])
+                crawl.extend_columns(prices, wears, ids=page_ids)
+                if page_num == 1:
+                    fingerprint = page_fingerprint(wears, prices)
+                    page1_size = len(crawl)
+                    cached = self._reuse_deeper_pages(cache_key, fingerprint)
+                    if cached is not None:
+                        # 第 1 页未变化：沿用上次的后续页，取消已排队的预取
+                        cached_prices, cached_wears, cached_ids = cached
+                        crawl.extend_columns(cached_prices, cached_wears, ids=cached_ids)
+                        self.logger.info(f"{prefix}第1页未变化，沿用上次后续页的 {len(cached_prices)} 个商品")
+                        fingerprint = None
+                        break
+                for i, (wear_min, wear_max) in enumerate(bands):
+                    hits[i] += len(range_indices(wears, wear_min, wear_max))
 
-            # 按价格升序排序，取前20个
-            results.sort(key=lambda x: x['price'])
-            results = results[:20]
-            
-            # 打印日志
-            for result in results:
-                self.logger.info(
-                    f"找到匹配商品 - 价格: {result['price']}, 磨损: {result['wear']:.6f}"
-                )
+                # 每个区间都已收集足够数据，停止翻页（取消已发出的预取）
+                if min(hits) >= max_results:
+                    break
 
-            if not results and observed_wears:
-                self.logger.info(
-                    f"BUFF 未命中磨损区间: {wear_min}-{wear_max}；样本磨损范围: {min(observed_wears):.6f}-{max(observed_wears):.6f}"
-                )
+            if fingerprint is not None:
+                deeper = (crawl.prices[page1_size:], crawl.wears[page1_size:], crawl.ids[page1_size:] if crawl.ids is not None else None)
+                self._remember_deeper_pages(cache_key, fingerprint, deeper, complete)
+            self._seed_listing_sync(cache_key, crawl, complete and self.last_error is None)
         
         except Exception as e:
             self.logger.error(f"获取BUFF价格失败: {e}")
+            self.last_error = str(e)
         
-        return results
+        return self._select_bands(crawl, bands, limit=20, observed_wears=observed_wears, label='BUFF')
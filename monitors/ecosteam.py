@@ -1,15 +1,24 @@
 """ECOSteam平台监控（优先使用官方 API SellGoodsQuery）"""
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Sequence, Tuple
 import re
 import time
 import random
 from urllib.parse import urlparse
+from utils import jsoncodec
+from utils.listing_batch import ListingBatch
+from utils.listing_filter import parse_columns
+from utils.names import goods_name_key
+from utils.page_fingerprint import page_fingerprint
 from .base import PlatformMonitor
+from .page_stream import PageStream
 
 
 class EcosteamMonitor(PlatformMonitor):
     """ECOSteam平台监控器（API 优先，HTML 作为备用）"""
 
+    PLATFORM = 'ecosteam'
+    CRAWL_BUDGET_KEYS = {'ecosteam_max_pages': ('max_pages', 20)}
+
     def __init__(self, config: Dict[str, Any]):
         super().__init__(config)
 
@@ -229,20 +238,30 @@ class EcosteamMonitor(PlatformMonitor):
             self.logger.warning(f"ECOSteam 可能命中反爬挑战页，但自动解算失败: {e}")
             return None
 
-    def _get_goods_detail_url(self, item_config: Optional[Dict[str, Any]]) -> Optional[str]:
+    @staticmethod
+    def _goods_detail_url(
+        item_config: Optional[Dict[str, Any]], platform_config: Optional[Dict[str, Any]]
+    ) -> Optional[str]:
         if item_config:
             url = item_config.get('eco_goods_url') or item_config.get('ecosteam_goods_url')
             if url:
                 return str(url)
-        url = self.config.get('goods_detail_url')
+        url = (platform_config or {}).get('goods_detail_url')
         return str(url) if url else None
 
-    def _parse_sell_list_from_html(self, goods_url: str) -> List[Dict[str, float]]:
+    def _get_goods_detail_url(self, item_config: Optional[Dict[str, Any]]) -> Optional[str]:
+        return self._goods_detail_url(item_config, self.config)
+
+    def _parse_sell_list_from_html(self, goods_url: str, max_pages: Optional[int] = None) -> List[Dict[str, float]]:
         """从商品详情页 HTML 中解析在售列表。
 
         依据前端结构：
         - 磨损在 <p class="WearRate"> ... <span>0.xxx</span>
         - 分页链接形如: /goods/...-0-2.html 且带 data-page
+
+        Args:
+            goods_url: 商品详情页 URL
+            max_pages: 本次最多抓取的页数（默认取平台配置 max_pages，再默认 20）
         """
         import random
 
@@ -284,6 +303,9 @@ class EcosteamMonitor(PlatformMonitor):
 
         # Fetch page 1 with throttling + challenge handling.
         resp1 = self._request(goods_url, referer=goods_url)
+        if not 200 <= resp1.status_code < 300:
+            # 403/429 等拦截页：抛出让本次抓取计为失败（熔断器据此计数）
+            raise RuntimeError(f"ECOSteam 第1页请求失败: HTTP {resp1.status_code}")
         html1 = resp1.text
 
         # Some challenges may require 1-2 rounds (cookie set then reload).
@@ -304,42 +326,59 @@ class EcosteamMonitor(PlatformMonitor):
             wears = [r['wear'] for r in page1_rows]
             self.logger.info(f"ECOSteam 第1页：{len(page1_rows)}个商品，磨损范围 {min(wears):.6f}-{max(wears):.6f}")
 
-        # 从配置读取最大页数，默认20页；允许每个商品配置覆盖（减少请求量）
-        config_max_pages = int(self.config.get('max_pages', 20))
-        item_max_pages = None
-        try:
-            # item_config is not directly passed here; allow per-url mapping via config if needed.
-            # (Kept for future extension)
-            pass
-        except Exception:
-            item_max_pages = None
-
-        actual_max_page = min(max_page_on_site, config_max_pages)
+        # 最大页数：调用方传入的预算（商品级配置），否则取平台配置，默认20页
+        if max_pages is None:
+            max_pages = int(self.config.get('max_pages', 20))
+        actual_max_page = min(max_page_on_site, max(1, max_pages))
         page_delay = float(self.config.get('page_delay_seconds', 1.0))
         
-        if max_page_on_site == 1 and not page1_rows:
-            # 极大概率是结构变更或被拦截（挑战页/登录页等）
+        if not page1_rows:
+            # 挑战页重试后仍未通过，或网站显示有多页却解析不到商品：视为被拦截 / 结构变更，本次抓取失败
             if "acw_sc__v2" in html1 or "acw_sc" in html1:
-                self.logger.warning("ECOSteam 解析到 0 商品且页数为 1：疑似仍被反爬拦截（acw_sc__v2）")
-            else:
-                self.logger.warning("ECOSteam 解析到 0 商品且页数为 1：可能页面结构变更或需要登录/验证码")
+                raise RuntimeError("ECOSteam 第1页解析到 0 商品：重试后仍被反爬拦截（acw_sc__v2）")
+            if max_page_on_site > 1:
+                raise RuntimeError(f"ECOSteam 第1页解析到 0 商品，但网站显示共{max_page_on_site}页：可能页面结构变更")
+            # 只有 1 页且没有挑战页：可能确实无人在售，也可能需要登录/验证码
+            self.logger.warning("ECOSteam 解析到 0 商品且页数为 1：可能无人在售，或页面结构变更/需要登录验证码")
 
         self.logger.info(f"ECOSteam 网站共{max_page_on_site}页，将抓取前{actual_max_page}页")
 
-        # 抓取后续页面
-        for page in range(2, actual_max_page + 1):
-            # 添加随机延迟，避免触发反爬（同时 _request 内也有节流）
-            if page_delay > 0:
-                jitter = random.uniform(0.10, 0.45)
-                actual_delay = page_delay * (1 + jitter)
-                time.sleep(actual_delay)
-            
+        # 第 1 页与上次相同：沿用上次抓取的后续页（翻页范围不同的抓取分开缓存）
+        cache_key = f"{goods_url}|{actual_max_page}"
+        fingerprint = page_fingerprint([r['wear'] for r in page1_rows], [r['price'] for r in page1_rows])
+        if actual_max_page > 1 and page1_rows:
+            cached_rows = self._reuse_deeper_pages(cache_key, fingerprint)
+            if cached_rows is not None:
+                self.logger.info(
+                    f"ECOSteam 第1页未变化，沿用上次第2-{actual_max_page}页的 {len(cached_rows)} 个商品"
+                )
+                return all_rows + cached_rows
+
+        def _fetch_page_html(page: int) -> str:
             url = _page_url(goods_url, page)
             page_html = self._request(url, referer=goods_url).text
             # Handle challenge page on subsequent pages too
             bypassed = self._try_bypass_acw_sc_v2(url, page_html)
             if bypassed is not None:
                 page_html = bypassed
+            return page_html
+
+        def _next_page_delay() -> float:
+            # 添加随机延迟，避免触发反爬（同时 _request 内也有节流）
+            if page_delay <= 0:
+                return 0.0
+            return page_delay * (1 + random.uniform(0.10, 0.45))
+
+        # 抓取后续页面：解析当前页的同时在后台请求下一页
+        stream = PageStream(
+            _fetch_page_html,
+            actual_max_page,
+            start_page=2,
+            page_delay=_next_page_delay,
+            name='ecosteam-pages',
+        )
+        complete = True
+        for page, page_html in stream:
             page_rows = _parse_rows(page_html)
             all_rows.extend(page_rows)
             
@@ -349,7 +388,10 @@ class EcosteamMonitor(PlatformMonitor):
                 self.logger.info(f"ECOSteam 第{page}页：{len(page_rows)}个商品，磨损范围 {min(wears):.6f}-{max(wears):.6f}")
             else:
                 self.logger.warning(f"ECOSteam 第{page}页未解析到数据")
+                complete = False
 
+        if actual_max_page > 1 and page1_rows:
+            self._remember_deeper_pages(cache_key, fingerprint, all_rows[len(page1_rows):], complete)
         self.logger.info(f"ECOSteam HTML解析完成：共{len(all_rows)}个商品（{actual_max_page}页）")
         return all_rows
 
@@ -376,11 +418,11 @@ class EcosteamMonitor(PlatformMonitor):
 
     def _resolve_internal_id(self, hash_name: str, game_id: int) -> Optional[str]:
         try:
-            resp = self._make_request(
+            resp = jsoncodec.response_json(self._make_request(
                 f"{self.base_url.rstrip('/')}/Api/SteamGoods/GoodsDetailQueryPost",
                 method='POST',
                 json={'GameId': game_id, 'HashName': hash_name},
-            ).json()
+            ))
             sd = resp.get('StatusData') or {}
             rd = sd.get('ResultData') or {}
             internal_id = rd.get('Id') or rd.get('GoodsId') or rd.get('SteamGoodsId')
@@ -405,7 +447,7 @@ class EcosteamMonitor(PlatformMonitor):
             if internal_id:
                 payload['GoodsId'] = internal_id
 
-            resp = self._make_request(sell_url, method='POST', json=payload).json()
+            resp = jsoncodec.response_json(self._make_request(sell_url, method='POST', json=payload))
             sd = resp.get('StatusData') or {}
             rc = str(sd.get('ResultCode'))
             if rc not in ('0', '200', 'OK', 'SUCCESS'):
@@ -456,75 +498,68 @@ class EcosteamMonitor(PlatformMonitor):
                     continue
         return None
 
+    @classmethod
+    def goods_key(
+        cls,
+        item_name: str,
+        item_config: Optional[Dict[str, Any]] = None,
+        platform_config: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        """同一商品详情页 URL 的配置项共享一次 HTML 抓取"""
+        goods_url = cls._goods_detail_url(item_config, platform_config)
+        return f"url:{goods_url}" if goods_url else f"name:{goods_name_key(item_name)}"
+
     def get_item_price(
         self,
         item_name: str,
         wear_min: float,
         wear_max: float,
         item_config: Optional[Dict[str, Any]] = None,
-    ) -> List[Dict[str, Any]]:
+    ) -> ListingBatch:
         """获取ECOSteam平台商品价格（仅使用 HTML 解析）。"""
-        results: List[Dict[str, Any]] = []
+        return self.get_item_prices_multi(item_name, [(wear_min, wear_max)], item_config)[0]
+
+    def get_item_prices_multi(
+        self,
+        item_name: str,
+        bands: Sequence[Tuple[float, float]],
+        item_config: Optional[Dict[str, Any]] = None,
+    ) -> List[ListingBatch]:
+        """抓取一次商品详情页在售列表，同时评估多个磨损区间（各区间按价格升序、不截断）。"""
+        crawl = ListingBatch('ecosteam', item_name)
         observed_wears: List[float] = []
+        self.last_error = None
 
         try:
             goods_url = self._get_goods_detail_url(item_config)
             if not goods_url:
                 self.logger.error('ECOSteam 缺少 goods_detail_url（商品详情页 URL）')
-                return results
+                return [crawl.take(()) for _ in bands]
+            crawl.url = goods_url
 
             # Per-item max pages override to reduce requests when monitoring many items.
             # Example in config item: "ecosteam_max_pages": 3
+            # 作为参数传给解析函数，不改写（热加载共享的）平台配置
+            max_pages = int(self.config.get('max_pages', 20))
             if item_config and item_config.get('ecosteam_max_pages') is not None:
                 try:
                     per_item_pages = int(item_config.get('ecosteam_max_pages'))
                     if per_item_pages > 0:
-                        # Temporarily clamp for this call
-                        old = self.config.get('max_pages')
-                        self.config['max_pages'] = min(int(self.config.get('max_pages', 20)), per_item_pages)
-                    else:
-                        old = None
-                except Exception:
-                    old = None
-            else:
-                old = None
-
-            # 仅使用 HTML 解析在售列表
-            for row in self._parse_sell_list_from_html(goods_url):
-                wear_value = float(row.get('wear', 0))
-                price = float(row.get('price', 0))
-
-                if len(observed_wears) < 30:
-                    observed_wears.append(wear_value)
-
-                if wear_min <= wear_value <= wear_max:
-                    results.append({
-                        'platform': 'ecosteam',
-                        'item_name': item_name,
-                        'price': price,
-                        'wear': wear_value,
-                        'url': goods_url,
-                        'timestamp': int(time.time())
-                    })
-
-            # 只需要“磨损区间内的数据”，然后按价格升序排列（不再按磨损参与排序）
-            if results:
-                results.sort(key=lambda x: (x.get('price', float('inf'))))
-                for r in results:
-                    self.logger.info(
-                        f"找到匹配商品 - 价格: {r.get('price')}, 磨损: {float(r.get('wear', 0)):.6f}"
-                    )
-
-            if not results and observed_wears:
-                self.logger.info(
-                    f"ECOSteam 未命中磨损区间: {wear_min}-{wear_max}；样本磨损范围: {min(observed_wears):.6f}-{max(observed_wears):.6f}"
-                )
-
-            if old is not None:
-                # restore
-                self.config['max_pages'] = old
+                        max_pages = min(max_pages, per_item_pages)
+                except (TypeError, ValueError):
+                    pass
+
+            # 仅使用 HTML 解析在售列表，整体转为磨损/价格列，供所有区间共用
+            wears, prices, _ = parse_columns(
+                self._parse_sell_list_from_html(goods_url, max_pages),
+                lambda row: (float(row.get('wear', 0)), float(row.get('price', 0))),
+            )
+            observed_wears.extend(wears[:30])
+            crawl.extend_columns(prices, wears)
 
         except Exception as e:
             self.logger.error(f"获取ECOSteam价格失败: {e}")
+            self.last_error = str(e)
 
-        return results
+        # 只需要“磨损区间内的数据”，然后按价格升序排列
+        return self._select_bands(crawl, bands, observed_wears=observed_wears, label='ECOSteam')
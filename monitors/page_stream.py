@@ -0,0 +1,128 @@
+"""翻页预取流 - 当前页解析时在后台请求下一页
+
+各平台的翻页循环原本是严格串行的：请求一页 → 解析 → 筛选 → 等待 → 请求下一页。
+`PageStream` 以生成器形式逐页产出抓取结果，在调用方处理第 N 页的同时，
+由后台线程（等待翻页间隔后）请求第 N+1 页，让解析时间与网络时间重叠。
+
+同一时刻最多只有一个请求在进行，且请求只在后台线程发出，因此平台原有的
+节流/冷却逻辑与 requests.Session 的使用方式不变。调用方提前结束（break、
+异常或调用 cancel）时，尚未开始的预取会被取消，已发出的预取结果直接丢弃。
+"""
+from concurrent.futures import Future, ThreadPoolExecutor
+import threading
+import time
+from typing import Any, Callable, Iterator, Optional, Tuple, Union
+
+
+class PageStream:
+    """按页产出 (page, result)，并预取下一页"""
+
+    def __init__(
+        self,
+        fetch: Callable[[int], Any],
+        max_pages: int,
+        *,
+        start_page: int = 1,
+        page_delay: Union[float, Callable[[], float]] = 0.0,
+        prefetch: bool = True,
+        name: str = 'page-stream',
+    ):
+        """
+        初始化翻页流
+
+        Args:
+            fetch: 请求并解码单页的函数，返回空值表示没有更多数据
+            max_pages: 最大页码（可在迭代过程中用 extend 扩大）
+            start_page: 起始页码
+            page_delay: 请求下一页前的等待秒数（可传入函数以加入随机抖动）
+            prefetch: 是否在后台预取；依赖线程亲和性的客户端（如 Playwright 同步 API）需关闭
+            name: 后台线程名前缀
+        """
+        self._fetch = fetch
+        self.max_pages = int(max_pages)
+        self.start_page = int(start_page)
+        self._page_delay = page_delay
+        self._prefetch = prefetch
+        self._name = name
+        self._cancelled = threading.Event()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending: Optional[Future] = None
+
+    def extend(self, max_pages: int) -> None:
+        """扩大最大页码（如 0 命中时自动加页）"""
+        self.max_pages = max(self.max_pages, int(max_pages))
+
+    def cancel(self) -> None:
+        """取消尚未完成的预取（已发出的请求无法中断，其结果会被丢弃）"""
+        self._cancelled.set()
+        if self._pending is not None:
+            self._pending.cancel()
+            self._pending = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def _delay(self) -> float:
+        delay = self._page_delay() if callable(self._page_delay) else self._page_delay
+        return max(0.0, float(delay or 0.0))
+
+    def _load(self, page: int, wait: bool) -> Any:
+        if wait:
+            delay = self._delay()
+            if delay > 0:
+                time.sleep(delay)
+        if self._cancelled.is_set():
+            return None
+        return self._fetch(page)
+
+    def _submit(self, page: int, wait: bool) -> Future:
+        if self._prefetch:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=self._name)
+            return self._executor.submit(self._load, page, wait)
+
+        # 不预取：在调用方线程同步执行，保持相同的接口
+        future: Future = Future()
+        try:
+            future.set_result(self._load(page, wait))
+        except BaseException as e:
+            future.set_exception(e)
+        return future
+
+    def __iter__(self) -> Iterator[Tuple[int, Any]]:
+        page = self.start_page
+        if page > self.max_pages:
+            return
+        future: Optional[Future] = self._submit(page, wait=False)
+        try:
+            while future is not None and not self._cancelled.is_set():
+                result = future.result()
+                if self._cancelled.is_set():
+                    break
+
+                # 先发出下一页请求，再把当前页交给调用方处理
+                self._pending = None
+                if self._prefetch and result and page + 1 <= self.max_pages:
+                    self._pending = self._submit(page + 1, wait=True)
+
+                yield page, result
+
+                if not result:
+                    break
+                page += 1
+                if self._pending is None and page <= self.max_pages:
+                    # 未预取，或调用方在处理当前页时扩大了 max_pages
+                    self._pending = self._submit(page, wait=True)
+                future = self._pending
+        finally:
+            self.cancel()
+
+    def __enter__(self) -> 'PageStream':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.cancel()
@@ -1,43 +1,104 @@
 """悠悠有品平台监控（纯 requests 版）"""
-from typing import Dict, List, Any, Optional, Tuple
+from dataclasses import dataclass
+from typing import Dict, List, Any, Optional, Sequence, Tuple
 from urllib.parse import urlparse, parse_qs
 import base64
-import json
 import random
 import re
 import time
 import logging
+from utils import jsoncodec
+from utils.endpoint_cache import EndpointCache
+from utils.listing_batch import ListingBatch
+from utils.listing_filter import parse_columns, range_indices
+from utils.names import NameMatcher, goods_name_key
 from .base import PlatformMonitor
+from .page_stream import PageStream
+
+
+_UU_TOKEN_RE = re.compile(r'(?:^|;\s*)uu_token=([^;]+)')
+
+
+@dataclass
+class _MarketRequestProfile:
+    """同一 token 下所有页、所有商品共用的市场请求配置"""
+
+    token: Optional[str]
+    config: Dict[str, Any]
+    # 按尝试顺序排列的 (url, method)
+    attempts: List[Tuple[str, str]]
+    headers: Dict[str, Any]
+    static_params: Dict[str, Any]
+    # 请求体中固定部分的 JSON 片段（不含开头的 '{'）
+    body_tail: str
+    max_attempts: int
+    request_delay: float
+
+    def body(
+        self, template_id: int, page_index: int, page_size: int, extra: Optional[Dict[str, Any]] = None
+    ) -> bytes:
+        head = f'{{"pageIndex":{int(page_index)},"pageSize":{int(page_size)},"templateId":{int(template_id)}'
+        if extra:
+            # 额外字段（如排序参数）插在固定部分之前
+            head += ',' + jsoncodec.dumps(extra)[1:-1]
+        return (head + (',' + self.body_tail if self.body_tail != '}' else '}')).encode('utf-8')
+
+    def params(
+        self, template_id: int, page_index: int, page_size: int, extra: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        return {
+            'pageIndex': page_index,
+            'pageSize': page_size,
+            'templateId': int(template_id),
+            **self.static_params,
+            **(extra or {}),
+        }
 
 
 class YoupinMonitor(PlatformMonitor):
     """悠悠有品平台监控器（通过官方/移动端 API，避免 Selenium）"""
 
+    PLATFORM = 'youpin'
     DEFAULT_MARKET_API_PATH = '/api/homepage/pc/goods/market/queryOnSaleCommodityList'
+    CRAWL_BUDGET_KEYS = {
+        'youpin_max_pages': ('max_pages', 2),
+        'youpin_extra_pages_on_no_hit': ('extra_pages_on_no_hit', 0),
+        'youpin_hard_max_pages': ('hard_max_pages', None),
+    }
     
     def __init__(self, config: Dict[str, Any]):
         super().__init__(config)
         self.logger = logging.getLogger('YoupinMonitor')
-        self._blocked_until_ts: float = 0.0
+        # 按 token 预先构建的市场请求配置（token 或平台配置变化时重建）
+        self._profile: Optional[_MarketRequestProfile] = None
+        # 记住可用的接口地址/方法组合，重启后继续沿用
+        # 未落盘的分数在 close() 时写入（重建会话与退出时都会调用）
+        self._endpoints = EndpointCache(config.get('endpoint_cache_file', 'data/youpin_endpoint.json'))
+
+    def close(self) -> None:
+        self._endpoints.flush()
+        super().close()
 
     def _now(self) -> float:
         return time.time()
 
+    def _block_cooldown_seconds(self) -> float:
+        return float(self.config.get('market_block_cooldown_seconds', 1800))
+
     def _set_block_cooldown(self, reason: str) -> None:
-        cooldown_s = float(self.config.get('market_block_cooldown_seconds', 1800))
-        if cooldown_s <= 0:
+        base_cooldown = self._block_cooldown_seconds()
+        if base_cooldown <= 0:
             return
-        until = self._now() + cooldown_s
-        # 只延长不缩短
-        if until > self._blocked_until_ts:
-            self._blocked_until_ts = until
+        # 冷却状态记录在共享的平台健康状态中（持久化，主程序据此推迟本平台的任务）
+        until = self.health.block(self.PLATFORM, base_cooldown, reason)
+        cooldown_s = until - self._now()
         self.logger.warning(
-            f"Youpin 触发拦截/风控，进入冷却 {int(cooldown_s)}s（到 {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(self._blocked_until_ts))}）。"
+            f"Youpin 触发拦截/风控，进入冷却 {int(cooldown_s)}s（到 {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(until))}）。"
             f"原因: {reason}。建议：用浏览器登录后抓包更新 config.json 的 platforms.youpin.market_headers（尤其 authorization/deviceid/uk/deviceuk）和 Cookie(uu_token)，并适当加大延迟。"
         )
 
     def _in_block_cooldown(self) -> bool:
-        return self._now() < float(self._blocked_until_ts or 0.0)
+        return self.health.is_blocked(self.PLATFORM, self._now())
 
     def _is_likely_blocked_response(self, resp) -> bool:
         try:
@@ -55,13 +116,6 @@ class YoupinMonitor(PlatformMonitor):
         except Exception:
             return False
 
-    def _normalize_name(self, name: str) -> str:
-        # 归一化：去空白与常见分隔符，并去掉磨损括号部分，降低中英文标点差异影响
-        s = (name or '').strip().lower()
-        s = re.split(r'[\(（]', s, maxsplit=1)[0]
-        s = re.sub(r'[\s\|\-–—_\[\]【】\(\)（）]', '', s)
-        return s
-
     def _get_goods_list_url(self) -> Optional[str]:
         url = self.config.get('goods_list_url')
         return str(url) if url else None
@@ -84,22 +138,10 @@ class YoupinMonitor(PlatformMonitor):
             'gameId': _int('gameId', 730),
         }
 
-    def _ensure_token_headers(self, referer: Optional[str]):
+    def _ensure_token_headers(self, referer: Optional[str], token: Optional[str] = None):
         """确保请求头包含必要的 Cookie/Token 与移动端 UA"""
-        token = None
-
-        # 优先从 cookie jar 里拿（PlatformMonitor 会把 config 里的 Cookie 写入这里）
-        try:
-            token = self.session.cookies.get('uu_token')
-        except Exception:
-            token = None
-
-        # 兼容部分场景：用户把 Cookie 写进了 headers（不推荐，但可能存在）
-        if not token:
-            cookie = self.session.headers.get('Cookie', '')
-            m = re.search(r'(?:^|;\s*)uu_token=([^;]+)', cookie)
-            if m:
-                token = m.group(1)
+        if token is None:
+            token = self._current_token()
 
         if token:
             # 同时尝试多个头以兼容不同的后端校验
@@ -146,7 +188,7 @@ class YoupinMonitor(PlatformMonitor):
             # base64url padding
             payload_b64 += '=' * (-len(payload_b64) % 4)
             raw = base64.urlsafe_b64decode(payload_b64.encode('utf-8'))
-            obj = json.loads(raw.decode('utf-8', errors='ignore'))
+            obj = jsoncodec.loads(raw.decode('utf-8', errors='ignore'))
             return obj if isinstance(obj, dict) else None
         except Exception:
             return None
@@ -201,12 +243,28 @@ class YoupinMonitor(PlatformMonitor):
                     return lst
         return []
 
-    def _fetch_market_data(self, template_id: int, page_index: int = 1, page_size: int = 50) -> Optional[List[Dict[str, Any]]]:
-        """通过 requests 调用显式配置的市场 API 获取在售列表
+    def _current_token(self) -> Optional[str]:
+        """当前 uu_token（cookie jar 优先，其次兼容写在 headers 里的 Cookie）"""
+        # 优先从 cookie jar 里拿（PlatformMonitor 会把 config 里的 Cookie 写入这里）
+        try:
+            token = self.session.cookies.get('uu_token')
+        except Exception:
+            token = None
 
-        注意：默认不再调用 `inventory/list`，避免误拿账号库存。
-        必须在配置中提供 `market_api_url`（完整 URL）或 `market_api_path`（与 api_base_url 拼接）。
-        """
+        # 兼容部分场景：用户把 Cookie 写进了 headers（不推荐，但可能存在）
+        if not token:
+            cookie = self.session.headers.get('Cookie', '')
+            m = _UU_TOKEN_RE.search(cookie)
+            if m:
+                token = m.group(1)
+        return token
+
+    def _market_profile(self, template_id: int) -> Optional[_MarketRequestProfile]:
+        """取得（必要时构建）当前 token 对应的请求配置，token 或平台配置未变时直接复用"""
+        token = self._current_token()
+        profile = self._profile
+        if profile is not None and profile.token == token and profile.config is self.config:
+            return profile
 
         market_api_url = self.config.get('market_api_url')
         market_api_path = self.config.get('market_api_path')
@@ -224,20 +282,7 @@ class YoupinMonitor(PlatformMonitor):
                 return None
 
         referer = self._get_goods_list_url() or f'https://www.youpin898.com/market/goods-list?templateId={template_id}&gameId=730&listType=10'
-        self._ensure_token_headers(referer)
-
-        if self._in_block_cooldown():
-            self.logger.warning("Youpin 仍在冷却期内，跳过本次请求（避免加重风控）")
-            return None
-
-        info = {
-            'templateId': int(template_id),
-            'gameId': int(self.config.get('game_id', 730)),
-            'listType': int(self.config.get('list_type', 10)),
-        }
-        # 只保留最常见的参数组合，避免瞬间大量请求导致 429
-        payload_post = {'pageIndex': page_index, 'pageSize': page_size, **info}
-        payload_get = {'pageIndex': page_index, 'pageSize': page_size, **info}
+        self._ensure_token_headers(referer, token)
 
         method_pref = str(self.config.get('market_method', 'POST')).upper()
         methods_to_try = [method_pref] if method_pref in ('GET', 'POST') else ['POST']
@@ -256,103 +301,174 @@ class YoupinMonitor(PlatformMonitor):
             for base in self._iter_api_bases():
                 url_candidates.append(f"{base}{market_api_path}")
 
-        def _build_attempts() -> List[Tuple[str, Dict[str, Any]]]:
-            attempts: List[Tuple[str, Dict[str, Any]]] = []
-            for m in methods_to_try:
-                if m == 'POST':
-                    attempts.append(('POST', payload_post))
-                elif m == 'GET':
-                    attempts.append(('GET', payload_get))
-            # 去重
-            seen = set()
-            uniq: List[Tuple[str, Dict[str, Any]]] = []
-            for m, p in attempts:
-                key = (m, tuple(sorted(p.items())))
-                if key not in seen:
-                    seen.add(key)
-                    uniq.append((m, p))
-            return uniq
-
-        attempts = _build_attempts()
-
-        # 退避参数（可在配置中覆盖）
-        max_attempts = int(self.config.get('market_max_attempts', 4))
-        backoff_base = float(self.config.get('market_backoff_base', 0.8))
-        backoff_cap = float(self.config.get('market_backoff_cap', 8.0))
-        request_delay = float(self.config.get('market_request_delay_seconds', 0.25))
+        # 只保留最常见的参数组合，避免瞬间大量请求导致 429
+        static = {
+            'gameId': int(self.config.get('game_id', 730)),
+            'listType': int(self.config.get('list_type', 10)),
+        }
+
+        profile = _MarketRequestProfile(
+            token=token,
+            config=self.config,
+            attempts=[(url, m) for url in url_candidates for m in dict.fromkeys(methods_to_try)],
+            headers=dict(extra_headers) if isinstance(extra_headers, dict) else {},
+            static_params=static,
+            body_tail=jsoncodec.dumps(static)[1:],
+            # 退避参数（可在配置中覆盖）
+            max_attempts=int(self.config.get('market_max_attempts', 4)),
+            request_delay=float(self.config.get('market_request_delay_seconds', 0.25)),
+        )
+        self._profile = profile
+        return profile
 
-        tried = 0
-        for url in url_candidates:
-            for method, payload in attempts:
-                if tried >= max_attempts:
-                    break
-                tried += 1
+    def _fetch_market_data(
+        self,
+        template_id: int,
+        page_index: int = 1,
+        page_size: int = 50,
+        extra_params: Optional[Dict[str, Any]] = None,
+    ) -> Optional[List[Dict[str, Any]]]:
+        """通过 requests 调用显式配置的市场 API 获取在售列表
 
-                # 每次请求单独传 headers，避免污染 session 全局头
-                call_headers = dict(extra_headers) if isinstance(extra_headers, dict) else {}
+        注意：默认不再调用 `inventory/list`，避免误拿账号库存。
+        必须在配置中提供 `market_api_url`（完整 URL）或 `market_api_path`（与 api_base_url 拼接）。
+        `extra_params` 为附加的请求字段（如增量同步的排序参数）。
+        """
+        profile = self._market_profile(template_id)
+        if profile is None:
+            return None
 
-                try:
-                    self.logger.debug(f"Youpin request: {method} {url} page={page_index}")
+        if self._in_block_cooldown():
+            self.logger.warning("Youpin 仍在冷却期内，跳过本次请求（避免加重风控）")
+            return None
+
+        max_attempts = profile.max_attempts
+        request_delay = profile.request_delay
+
+        # 上次成功的 (url, method) 排在最前，只有它失败后才探测其他候选
+        pinned = self._endpoints.preferred(profile.attempts)
+        tried = 0
+        for url, method in self._endpoints.order(profile.attempts):
+            if tried >= max_attempts:
+                break
+            tried += 1
+
+            try:
+                self.logger.debug(f"Youpin request: {method} {url} page={page_index}")
+                # 每次请求单独传 headers，避免污染 session 全局头；POST 直接发送预先序列化好的请求体
+                if method == 'POST':
                     resp = self.session.request(
                         method,
                         url,
                         timeout=12,
-                        headers=call_headers,
-                        json=payload if method == 'POST' else None,
-                        params=payload if method == 'GET' else None,
+                        headers=profile.headers,
+                        data=profile.body(template_id, page_index, page_size, extra_params),
                     )
+                else:
+                    resp = self.session.request(
+                        method,
+                        url,
+                        timeout=12,
+                        headers=profile.headers,
+                        params=profile.params(template_id, page_index, page_size, extra_params),
+                    )
+
+                if self._is_likely_blocked_response(resp):
+                    self._log_http_block(url, resp)
+                    self._set_block_cooldown(f"HTTP {resp.status_code} / content-type={resp.headers.get('content-type', '')}")
+                    return None
+
+                if resp.status_code != 200:
+                    # 其他状态：记录片段并继续
+                    self._log_http_block(url, resp)
+                    self._endpoints.record_failure(url, method)
+                    time.sleep(request_delay)
+                    continue
+
+                try:
+                    data = jsoncodec.response_json(resp)
+                except Exception:
+                    self._log_http_block(url, resp)
+                    self._endpoints.record_failure(url, method)
+                    time.sleep(request_delay)
+                    continue
 
-                    if self._is_likely_blocked_response(resp):
-                        self._log_http_block(url, resp)
-                        self._set_block_cooldown(f"HTTP {resp.status_code} / content-type={resp.headers.get('content-type', '')}")
-                        return None
-
-                    if resp.status_code != 200:
-                        # 其他状态：记录片段并继续
-                        self._log_http_block(url, resp)
-                        time.sleep(request_delay)
-                        continue
-
-                    try:
-                        data = resp.json()
-                    except Exception:
-                        self._log_http_block(url, resp)
-                        time.sleep(request_delay)
-                        continue
-
-                    code = None
-                    if isinstance(data, dict):
-                        code = data.get('code')
-                        if code is None:
-                            code = data.get('Code')
-                    # 常见成功码：0；也可能直接没有 code
-                    if code not in (None, 0, '0'):
-                        # 85100 常见于版本/网络限制
-                        if str(code) == '85100':
-                            self.logger.warning(f"Youpin 返回限制码 85100，可能需要补齐 app-version/设备信息/浏览器指纹头。")
-                        self.logger.debug(f"{url} returned code={code}")
-                        time.sleep(request_delay)
-                        continue
-
-                    items = self._extract_items(data)
-                    if items:
-                        return items
+                code = None
+                if isinstance(data, dict):
+                    code = data.get('code')
+                    if code is None:
+                        code = data.get('Code')
+                # 常见成功码：0；也可能直接没有 code
+                if code not in (None, 0, '0'):
+                    # 85100 常见于版本/网络限制
+                    if str(code) == '85100':
+                        self.logger.warning(f"Youpin 返回限制码 85100，可能需要补齐 app-version/设备信息/浏览器指纹头。")
+                    else:
+                        self._endpoints.record_failure(url, method)
+                    self.logger.debug(f"{url} returned code={code}")
                     time.sleep(request_delay)
-                except Exception as e:
-                    # 网络错误等：稍微等一下再继续
-                    self.logger.debug(f"Youpin request exception: {e}")
-                    time.sleep(max(request_delay, 0.5))
                     continue
 
+                items = self._extract_items(data)
+                if items:
+                    self._endpoints.record_success(url, method)
+                    self.health.record_success(self.PLATFORM, self._block_cooldown_seconds())
+                    return items
+                if (url, method) == pinned:
+                    # 已验证可用的端点返回空列表：确实没有更多数据，不再探测其他候选
+                    return items
+                time.sleep(request_delay)
+            except Exception as e:
+                # 网络错误等：稍微等一下再继续
+                self.logger.debug(f"Youpin request exception: {e}")
+                self._endpoints.record_failure(url, method)
+                time.sleep(max(request_delay, 0.5))
+                continue
+
         return None
     
+    def _parse_market_item(self, item: Dict[str, Any], expected: NameMatcher, page: int) -> Optional[Tuple[float, float]]:
+        """解析市场列表单条记录为 (wear, price)；名称不符或格式异常时返回 None。"""
+        commodity_name = item.get('commodityName') or item.get('CommodityName') or item.get('name') or item.get('goods_name') or ''
+
+        # 名称过滤（先做，减少无关解析）
+        if not expected.matches(commodity_name):
+            return None
+
+        abrade_raw = item.get('abrade') or item.get('Abrade') or item.get('wear') or item.get('Wear')
+        price_raw = item.get('price') or item.get('Price') or item.get('sellingPrice') or item.get('SellingPrice')
+        try:
+            wear = float(abrade_raw)
+            if wear > 1:
+                wear = wear / 100.0
+            price = float(price_raw)
+        except Exception:
+            return None
+
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(f"  [{page}页] {commodity_name[:20]}... 价格:{price} 磨损:{wear:.4f}")
+        return wear, price
+
+    @classmethod
+    def goods_key(
+        cls,
+        item_name: str,
+        item_config: Optional[Dict[str, Any]] = None,
+        platform_config: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        """同一 templateId 的配置项共享一次市场列表抓取"""
+        template_id = None
+        if item_config:
+            template_id = item_config.get('youpin_template_id') or item_config.get('youpin_goods_id')
+        return f"template:{template_id}" if template_id else f"name:{goods_name_key(item_name)}"
+
     def get_item_price(
         self,
         item_name: str,
         wear_min: float,
         wear_max: float,
         item_config: Optional[Dict[str, Any]] = None,
-    ) -> List[Dict[str, Any]]:
+    ) -> ListingBatch:
         """
         获取悠悠有品平台商品价格（requests API）
         
@@ -363,9 +479,29 @@ class YoupinMonitor(PlatformMonitor):
             item_config: 商品配置
             
         Returns:
-            价格信息列表
+            价格信息批次（按价格升序，最多20个）
+        """
+        return self.get_item_prices_multi(item_name, [(wear_min, wear_max)], item_config)[0]
+
+    def get_item_prices_multi(
+        self,
+        item_name: str,
+        bands: Sequence[Tuple[float, float]],
+        item_config: Optional[Dict[str, Any]] = None,
+    ) -> List[ListingBatch]:
+        """
+        抓取一次市场在售列表，同时评估多个磨损区间
+        
+        Args:
+            item_name: 商品名称
+            bands: 磨损区间列表 [(wear_min, wear_max), ...]
+            item_config: 商品配置
+            
+        Returns:
+            与 bands 一一对应的价格批次（各自按价格升序，最多20个）
         """
-        results = []
+        crawl = ListingBatch('youpin', item_name)
+        self.last_error = None
         
         try:
             # 获取 templateId
@@ -383,7 +519,9 @@ class YoupinMonitor(PlatformMonitor):
                 self.logger.error(
                     '悠悠有品缺少 templateId：请在 items 中配置 youpin_template_id，或在 platforms.youpin 中配置 goods_list_url'
                 )
-                return results
+                return [crawl.take(()) for _ in bands]
+
+            crawl.url = f'https://www.youpin898.com/market/goods-list?templateId={template_id}'
 
             # 直接使用 API 多页拉取
             self.logger.info(f"开始获取市场在售商品: {item_name} (templateId={template_id})")
@@ -436,8 +574,8 @@ class YoupinMonitor(PlatformMonitor):
 
             page_delay = float(self.config.get('market_page_delay_seconds', 2.0))
 
-            expected = self._normalize_name(item_name)
-            filtered: List[Dict[str, Any]] = []
+            expected = NameMatcher(item_name)
+            hits = [0] * len(bands)
             pages_fetched = 0
             total_items = 0
             effective_max_pages = base_max_pages
@@ -446,103 +584,104 @@ class YoupinMonitor(PlatformMonitor):
                 f"Youpin 分页参数: pageSize={page_size} baseMaxPages={base_max_pages} extraOnNoHit={extra_pages_on_no_hit} hardMaxPages={hard_max_pages}"
             )
 
-            page = 1
-            while page <= effective_max_pages:
+            def fetch_page(page: int) -> Optional[List[Dict[str, Any]]]:
                 self.logger.info(f"获取第 {page} 页数据... (API)")
-                items = self._fetch_market_data(template_id, page, page_size)
+                return self._fetch_market_data(template_id, page, page_size)
+
+            def parse_page(items: List[Dict[str, Any]]) -> Tuple[List[Any], Sequence[float], Sequence[float]]:
+                wears_in_page, prices_in_page, source_index = parse_columns(
+                    items, lambda it: self._parse_market_item(it, expected, 1)
+                )
+                return [items[i].get('id') or items[i].get('Id') for i in source_index], prices_in_page, wears_in_page
+
+            def next_page_delay() -> float:
+                # 翻页间隔：降低触发 429/85100 的概率，增加随机性
+                if page_delay <= 0:
+                    return 0.0
+                actual_delay = page_delay * (1 + random.uniform(0.1, 0.3))
+                self.logger.debug(f"等待 {actual_delay:.2f} 秒后请求下一页...")
+                return actual_delay
+
+            # 增量同步：按最新上架只拉新挂单（排序参数因接口而异，需在配置中显式给出）
+            sort_params = self.config.get('incremental_sort_params')
+            sync_key = str(template_id) if isinstance(sort_params, dict) and sort_params else None
+            if sync_key is not None and self._incremental_sync_ready(sync_key):
+                if self._sync_listings(
+                    sync_key,
+                    lambda page: self._fetch_market_data(template_id, page, page_size, sort_params),
+                    lambda: fetch_page(1),
+                    parse_page,
+                    next_page_delay(),
+                ):
+                    prices, wears, ids = self.listing_sync.columns(sync_key)
+                    crawl.extend_columns(prices, wears, ids=ids)
+                    return self._select_bands(crawl, bands, limit=20)
+                # 退回完整抓取：增量请求的失败不计入本轮结果
+                self.last_error = None
+
+            complete = True
+            # 解析当前页的同时在后台请求下一页
+            stream = PageStream(fetch_page, effective_max_pages, page_delay=next_page_delay, name='youpin-pages')
+            for page, items in stream:
                 if not items:
                     self.logger.warning(f"第 {page} 页无数据或请求失败，停止")
+                    complete = items is not None
+                    if page == 1 and items is None:
+                        self.last_error = '第 1 页请求失败'
                     break
 
                 pages_fetched += 1
                 total_items += len(items)
 
-                # 输出本页磨损范围（便于判断是否需要多翻页）
-                wears_in_page = []
-                prices_in_page = []
-                hits_in_page = 0
-                for item in items:
-                    abrade_raw = item.get('abrade') or item.get('Abrade') or item.get('wear') or item.get('Wear')
-                    price_raw = item.get('price') or item.get('Price') or item.get('sellingPrice') or item.get('SellingPrice')
-                    commodity_name = item.get('commodityName') or item.get('CommodityName') or item.get('name') or item.get('goods_name') or ''
-
-                    # 名称过滤（先做，减少无关解析）
-                    if expected != self._normalize_name(commodity_name):
-                        continue
-
-                    try:
-                        wear = float(abrade_raw)
-                        if wear > 1:
-                            wear = wear / 100.0
-                        price = float(price_raw)
-                    except Exception:
-                        continue
-
-                    wears_in_page.append(wear)
-                    prices_in_page.append(price)
-                    self.logger.debug(f"  [{page}页] {commodity_name[:20]}... 价格:{price} 磨损:{wear:.4f}")
-
-                    if wear_min <= wear <= wear_max:
-                        hits_in_page += 1
-                        filtered.append({
-                            'platform': 'youpin',
-                            'item_name': item_name,
-                            'price': price,
-                            'wear': wear,
-                            'url': f'https://www.youpin898.com/market/goods-list?templateId={template_id}',
-                            'timestamp': int(time.time()),
-                            'id': item.get('id') or item.get('Id'),
-                        })
+                # 整页解析为磨损/价格列（名称不符的条目在解析时跳过），整页保留供所有区间共用
+                wears_in_page, prices_in_page, source_index = parse_columns(
+                    items, lambda it: self._parse_market_item(it, expected, page)
+                )
+                page_ids = [items[i].get('id') or items[i].get('Id') for i in source_index]
+                crawl.extend_columns(prices_in_page, wears_in_page, ids=page_ids)
+                hits_in_page = [len(range_indices(wears_in_page, lo, hi)) for lo, hi in bands]
+                for i, n in enumerate(hits_in_page):
+                    hits[i] += n
 
+                # 输出本页磨损范围（便于判断是否需要多翻页）
                 if wears_in_page:
                     min_wear = min(wears_in_page)
                     max_wear = max(wears_in_page)
                     min_price = min(prices_in_page)
                     max_price = max(prices_in_page)
                     self.logger.info(
-                        f"第 {page} 页: {len(items)}个商品 | 磨损: {min_wear:.4f}~{max_wear:.4f} | 价格: ¥{min_price:.2f}~¥{max_price:.2f} | 区间命中: {hits_in_page}"
+                        f"第 {page} 页: {len(items)}个商品 | 磨损: {min_wear:.4f}~{max_wear:.4f} | 价格: ¥{min_price:.2f}~¥{max_price:.2f} | 区间命中: {'/'.join(map(str, hits_in_page))}"
                     )
                 else:
                     self.logger.info(f"第 {page} 页获取到 {len(items)} 个商品")
 
-                # 若扫完基础页数仍 0 命中，则按配置自动加页
+                # 若扫完基础页数仍有区间 0 命中，则按配置自动加页
+                missed = [band for band, n in zip(bands, hits) if n == 0]
                 if (
                     page == base_max_pages
-                    and len(filtered) == 0
+                    and missed
                     and extra_pages_on_no_hit > 0
                     and effective_max_pages < hard_max_pages
                 ):
                     new_max = min(hard_max_pages, base_max_pages + extra_pages_on_no_hit)
                     if new_max > effective_max_pages:
                         effective_max_pages = new_max
+                        stream.extend(effective_max_pages)
                         self.logger.info(
-                            f"磨损区间 {wear_min}-{wear_max} 前{base_max_pages}页命中为0，自动扩展抓取到 {effective_max_pages} 页"
+                            f"磨损区间 {', '.join(f'{lo}-{hi}' for lo, hi in missed)} 前{base_max_pages}页命中为0，自动扩展抓取到 {effective_max_pages} 页"
                         )
 
-                # 翻页间隔：降低触发 429/85100 的概率，增加随机性
-                if page_delay > 0 and page < effective_max_pages:
-                    jitter = random.uniform(0.1, 0.3)
-                    actual_delay = page_delay * (1 + jitter)
-                    self.logger.debug(f"等待 {actual_delay:.2f} 秒后请求下一页...")
-                    time.sleep(actual_delay)
-
-                page += 1
 
             self.logger.info(f"共获取 {total_items} 个在售商品（{pages_fetched}/{effective_max_pages} 页）")
+            if sync_key is not None:
+                self._seed_listing_sync(sync_key, crawl, complete)
             
-            # 按价格升序排序，取前20个
-            filtered.sort(key=lambda x: x['price'])
-            results = filtered[:20]
-            
-            self.logger.info(f"磨损区间 {wear_min}-{wear_max} 内找到 {len(filtered)} 个商品，返回前 {len(results)} 个")
-            
-            # 打印结果
-            for item in results:
-                self.logger.info(
-                    f"找到匹配商品 - 价格: {item['price']}, 磨损: {item['wear']:.6f}"
-                )
+            for (wear_min, wear_max), n in zip(bands, hits):
+                self.logger.info(f"磨损区间 {wear_min}-{wear_max} 内找到 {n} 个商品，返回前 {min(n, 20)} 个")
         
         except Exception as e:
             self.logger.error(f"获取悠悠有品价格失败: {e}", exc_info=True)
+            self.last_error = str(e)
         
-        return results
+        # 每个区间按价格升序排序，取前20个
+        return self._select_bands(crawl, bands, limit=20)
@@ -0,0 +1,334 @@
+"""Local HTTP stub that replays recorded platform responses for benchmarking.
+
+Served endpoints (all backed by files in scripts/bench_fixtures/):
+- BUFF:     GET  /api/market/goods/sell_order, GET /api/market/search, GET /goods/<id>
+- Youpin:   POST/GET /api/homepage/pc/goods/market/queryOnSaleCommodityList
+- ECOSteam: GET  /goods/<...>-0-<page>.html, POST /Api/SteamGoods/SellGoodsQuery,
+            POST /Api/SteamGoods/GoodsDetailQueryPost
+
+Control endpoints:
+- GET  /__stats  request counters (total / per platform / per status)
+- POST /__reset  reset counters
+- POST /__config update fault-injection options at runtime (JSON body)
+
+Options (CLI flags or /__config keys):
+- pages: number of non-empty listing pages per goods
+- latency_ms / latency_jitter_ms: per-request latency
+- error_403_rate / error_429_rate: probability of answering 403 / 429
+- challenge_rate: probability of serving the acw_sc__v2 challenge page (ECOSteam HTML)
+
+Usage:
+    python scripts/bench_stub_server.py --port 18080 --pages 3 --latency-ms 50
+"""
+
+import argparse
+import json
+import random
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+FIXTURES = Path(__file__).resolve().parent / "bench_fixtures"
+
+DEFAULT_OPTIONS: Dict[str, Any] = {
+    "pages": 3,
+    "latency_ms": 0.0,
+    "latency_jitter_ms": 0.0,
+    "error_403_rate": 0.0,
+    "error_429_rate": 0.0,
+    "challenge_rate": 0.0,
+    "seed": None,
+}
+
+_ECO_PAGE_RE = re.compile(r"^/goods/[0-9A-Za-z\-]+-0-(\d+)\.html$")
+_BUFF_GOODS_RE = re.compile(r"^/goods/(\d+)/?$")
+
+_BLOCK_HTML = b"<!doctype html><html><head><meta charset='utf-8'><title>403</title></head><body>Forbidden</body></html>"
+
+
+def _load_fixtures() -> Dict[str, Any]:
+    return {
+        "buff_sell_order": json.loads((FIXTURES / "buff_sell_order.json").read_text(encoding="utf-8")),
+        "youpin_market": json.loads((FIXTURES / "youpin_query_on_sale.json").read_text(encoding="utf-8")),
+        "eco_sell_query": json.loads((FIXTURES / "ecosteam_sell_goods_query.json").read_text(encoding="utf-8")),
+        "eco_html": (FIXTURES / "ecosteam_goods_page.html").read_text(encoding="utf-8"),
+        "eco_challenge": (FIXTURES / "ecosteam_acw_challenge.html").read_bytes(),
+    }
+
+
+class StubState:
+    """Shared mutable state: options, counters and pre-encoded bodies."""
+
+    def __init__(self, options: Dict[str, Any]):
+        self.lock = threading.Lock()
+        self.options = dict(DEFAULT_OPTIONS)
+        self.options.update({k: v for k, v in options.items() if v is not None})
+        self.rng = random.Random(self.options.get("seed"))
+        self.fixtures = _load_fixtures()
+        self._json_cache: Dict[str, bytes] = {}
+        self._eco_html_cache: Dict[Tuple[int, int], bytes] = {}
+        self.reset()
+
+    def reset(self) -> None:
+        with self.lock:
+            self.total = 0
+            self.by_platform: Dict[str, int] = {}
+            self.by_status: Dict[str, int] = {}
+
+    def count(self, platform: str, status: int) -> None:
+        with self.lock:
+            self.total += 1
+            self.by_platform[platform] = self.by_platform.get(platform, 0) + 1
+            self.by_status[str(status)] = self.by_status.get(str(status), 0) + 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                "total": self.total,
+                "by_platform": dict(self.by_platform),
+                "by_status": dict(self.by_status),
+                "options": dict(self.options),
+            }
+
+    def update_options(self, new_options: Dict[str, Any]) -> None:
+        with self.lock:
+            for k, v in new_options.items():
+                if k in DEFAULT_OPTIONS:
+                    self.options[k] = v
+            if "seed" in new_options:
+                self.rng = random.Random(new_options.get("seed"))
+
+    def roll(self, key: str) -> bool:
+        rate = float(self.options.get(key) or 0.0)
+        if rate <= 0:
+            return False
+        with self.lock:
+            return self.rng.random() < rate
+
+    def latency_seconds(self) -> float:
+        base = float(self.options.get("latency_ms") or 0.0)
+        jitter = float(self.options.get("latency_jitter_ms") or 0.0)
+        if base <= 0 and jitter <= 0:
+            return 0.0
+        with self.lock:
+            extra = self.rng.uniform(-jitter, jitter) if jitter > 0 else 0.0
+        return max(0.0, base + extra) / 1000.0
+
+    def eco_html_page(self, page: int) -> bytes:
+        pages = int(self.options.get("pages") or 1)
+        key = (page, pages)
+        cached = self._eco_html_cache.get(key)
+        if cached is not None:
+            return cached
+        html = self.fixtures["eco_html"]
+        if page > pages:
+            html = re.sub(r'<ul class="SellList">[\s\S]*?</ul>', '<ul class="SellList"></ul>', html)
+        links = "".join(
+            f'<a href="/goods/730-15231-1-laypagesale-0-{p}.html" data-page="{p}">{p}</a>' for p in range(1, pages + 1)
+        )
+        html = html.replace("</body>", f'<div class="Pagination">{links}</div>\n</body>')
+        body = html.encode("utf-8")
+        self._eco_html_cache[key] = body
+        return body
+
+    def json_page(self, name: str, page: int) -> bytes:
+        """Recorded JSON body for `page`; pages beyond the configured count are empty."""
+        pages = int(self.options.get("pages") or 1)
+        if page <= pages:
+            cache_key = name
+        else:
+            cache_key = f"{name}:empty"
+        cached = self._json_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        payload = json.loads(json.dumps(self.fixtures[name]))
+        if page > pages:
+            if name == "buff_sell_order":
+                payload["data"]["items"] = []
+            elif name == "youpin_market":
+                payload["Data"] = []
+            elif name == "eco_sell_query":
+                payload["StatusData"]["ResultData"]["PageResult"] = []
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self._json_cache[cache_key] = body
+        return body
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    server_version = "PlatformStub/1.0"
+    protocol_version = "HTTP/1.1"
+
+    @property
+    def state(self) -> StubState:
+        return self.server.state  # type: ignore[attr-defined]
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002 - signature from base class
+        return
+
+    def _read_body(self) -> bytes:
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length > 0 else b""
+
+    def _send(self, status: int, body: bytes, content_type: str, platform: Optional[str] = None) -> None:
+        if platform:
+            self.state.count(platform, status)
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, status: int, body: bytes, platform: Optional[str] = None) -> None:
+        self._send(status, body, "application/json; charset=utf-8", platform)
+
+    def _maybe_fail(self, platform: str) -> bool:
+        """Apply latency and 403/429 injection. Returns True when a failure was sent."""
+        delay = self.state.latency_seconds()
+        if delay > 0:
+            # Event.wait instead of time.sleep: the benchmark may patch time.sleep in-process.
+            threading.Event().wait(delay)
+        if self.state.roll("error_403_rate"):
+            self._send(403, _BLOCK_HTML, "text/html; charset=utf-8", platform)
+            return True
+        if self.state.roll("error_429_rate"):
+            self._send_json(429, b'{"code":"Too Many Requests"}', platform)
+            return True
+        return False
+
+    def do_GET(self) -> None:  # noqa: N802 - BaseHTTPRequestHandler naming
+        self._dispatch("GET")
+
+    def do_POST(self) -> None:  # noqa: N802 - BaseHTTPRequestHandler naming
+        self._dispatch("POST")
+
+    def _dispatch(self, method: str) -> None:
+        parsed = urlparse(self.path)
+        path = parsed.path
+        query = parse_qs(parsed.query)
+        body = self._read_body() if method == "POST" else b""
+
+        if path == "/__stats":
+            self._send_json(200, json.dumps(self.state.snapshot()).encode("utf-8"))
+            return
+        if path == "/__reset":
+            self.state.reset()
+            self._send_json(200, b'{"ok":true}')
+            return
+        if path == "/__config":
+            try:
+                self.state.update_options(json.loads(body.decode("utf-8") or "{}"))
+            except ValueError:
+                self._send_json(400, b'{"ok":false}')
+                return
+            self._send_json(200, b'{"ok":true}')
+            return
+
+        if path == "/api/market/goods/sell_order":
+            if self._maybe_fail("buff"):
+                return
+            page = int((query.get("page_num") or ["1"])[0])
+            self._send_json(200, self.state.json_page("buff_sell_order", page), "buff")
+            return
+        if path == "/api/market/search":
+            if self._maybe_fail("buff"):
+                return
+            payload = {"code": "OK", "data": {"items": [{"id": 968354, "name": "AK-47 | 红线 (久经沙场)"}]}}
+            self._send_json(200, json.dumps(payload, ensure_ascii=False).encode("utf-8"), "buff")
+            return
+        if _BUFF_GOODS_RE.match(path):
+            self._send(200, b"<html><body>goods</body></html>", "text/html; charset=utf-8", "buff")
+            return
+
+        if path.endswith("/queryOnSaleCommodityList"):
+            if self._maybe_fail("youpin"):
+                return
+            if method == "POST":
+                try:
+                    req = json.loads(body.decode("utf-8") or "{}")
+                except ValueError:
+                    req = {}
+                page = int(req.get("pageIndex") or 1)
+            else:
+                page = int((query.get("pageIndex") or ["1"])[0])
+            self._send_json(200, self.state.json_page("youpin_market", page), "youpin")
+            return
+
+        m = _ECO_PAGE_RE.match(path)
+        if m:
+            if self._maybe_fail("ecosteam"):
+                return
+            if self.state.roll("challenge_rate"):
+                self._send(200, self.state.fixtures["eco_challenge"], "text/html; charset=utf-8", "ecosteam")
+                return
+            self._send(200, self.state.eco_html_page(int(m.group(1))), "text/html; charset=utf-8", "ecosteam")
+            return
+        if path == "/Api/SteamGoods/SellGoodsQuery":
+            if self._maybe_fail("ecosteam"):
+                return
+            try:
+                req = json.loads(body.decode("utf-8") or "{}")
+            except ValueError:
+                req = {}
+            page = int(req.get("PageIndex") or 1)
+            self._send_json(200, self.state.json_page("eco_sell_query", page), "ecosteam")
+            return
+        if path == "/Api/SteamGoods/GoodsDetailQueryPost":
+            payload = {"StatusData": {"ResultCode": "0", "ResultData": {"Id": "15231"}}}
+            self._send_json(200, json.dumps(payload).encode("utf-8"), "ecosteam")
+            return
+
+        self._send_json(404, b'{"error":"not found"}', "unknown")
+
+
+def make_server(host: str = "127.0.0.1", port: int = 0, **options: Any) -> ThreadingHTTPServer:
+    """Create (but do not start) a stub server; port=0 picks a free port."""
+    server = ThreadingHTTPServer((host, port), StubHandler)
+    server.daemon_threads = True
+    server.state = StubState(options)  # type: ignore[attr-defined]
+    return server
+
+
+def serve(host: str, port: int, ready=None, **options: Any) -> None:
+    """Run the stub server forever. `ready` (optional multiprocessing queue) receives the bound port."""
+    server = make_server(host, port, **options)
+    if ready is not None:
+        ready.put(server.server_address[1])
+    try:
+        server.serve_forever(poll_interval=0.2)
+    finally:
+        server.server_close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Replay recorded BUFF/Youpin/ECOSteam responses locally.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=18080)
+    parser.add_argument("--pages", type=int, default=DEFAULT_OPTIONS["pages"])
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--latency-jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-403-rate", type=float, default=0.0)
+    parser.add_argument("--error-429-rate", type=float, default=0.0)
+    parser.add_argument("--challenge-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    print(f"stub server listening on http://{args.host}:{args.port}")
+    serve(
+        args.host,
+        args.port,
+        pages=args.pages,
+        latency_ms=args.latency_ms,
+        latency_jitter_ms=args.latency_jitter_ms,
+        error_403_rate=args.error_403_rate,
+        error_429_rate=args.error_429_rate,
+        challenge_rate=args.challenge_rate,
+        seed=args.seed,
+    )
+
+
+if __name__ == "__main__":
+    main()
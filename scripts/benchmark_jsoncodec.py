@@ -0,0 +1,90 @@
+"""Micro-benchmark for utils.jsoncodec on the recorded platform payloads.
+
+Times decoding and encoding of every JSON fixture in scripts/bench_fixtures
+(BUFF sell_order, Youpin queryOnSaleCommodityList, ECOSteam SellGoodsQuery)
+with the stdlib `json` module and with the codec's active backend. Decoding
+starts from the raw response bytes, as the monitors do; encoding covers the
+compact form (result segments, read API) and the indented form (cookie/cache
+files, script dumps).
+
+Usage:
+    python scripts/benchmark_jsoncodec.py
+    python scripts/benchmark_jsoncodec.py --rounds 2000
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from utils import jsoncodec  # noqa: E402
+
+FIXTURES = Path(__file__).resolve().parent / "bench_fixtures"
+PAYLOADS = ["buff_sell_order.json", "youpin_query_on_sale.json", "ecosteam_sell_goods_query.json"]
+
+
+def _stdlib_loads(raw: bytes) -> Any:
+    return json.loads(raw)
+
+
+def _stdlib_dumps(obj: Any) -> bytes:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _stdlib_dumps_indent(obj: Any) -> bytes:
+    return json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8")
+
+
+def _codec_dumps_indent(obj: Any) -> bytes:
+    return jsoncodec.dumps_bytes(obj, indent=True)
+
+
+def _per_call_us(func: Callable[[Any], Any], arg: Any, rounds: int) -> float:
+    func(arg)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        func(arg)
+    return (time.perf_counter() - start) / rounds * 1e6
+
+
+def run(rounds: int) -> List[Dict[str, Any]]:
+    rows = []
+    for name in PAYLOADS:
+        raw = (FIXTURES / name).read_bytes()
+        obj = json.loads(raw)
+        assert jsoncodec.loads(raw) == obj
+        for op, stdlib, codec, arg in (
+            ("loads", _stdlib_loads, jsoncodec.loads, raw),
+            ("dumps", _stdlib_dumps, jsoncodec.dumps_bytes, obj),
+            ("dumps indent", _stdlib_dumps_indent, _codec_dumps_indent, obj),
+        ):
+            base = _per_call_us(stdlib, arg, rounds)
+            fast = _per_call_us(codec, arg, rounds)
+            rows.append({"payload": name, "bytes": len(raw), "op": op, "json_us": base, "codec_us": fast})
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=500, help="calls per measurement")
+    args = parser.parse_args()
+
+    rows = run(max(1, args.rounds))
+    print(f"backend={jsoncodec.BACKEND} rounds={args.rounds}")
+    print(f"{'payload':<34} {'bytes':>8} {'op':<13} {'json us':>9} {'codec us':>9} {'speedup':>8}")
+    for r in rows:
+        speedup = r["json_us"] / r["codec_us"] if r["codec_us"] else float("inf")
+        print(
+            f"{r['payload']:<34} {r['bytes']:>8} {r['op']:<13} "
+            f"{r['json_us']:>9.1f} {r['codec_us']:>9.1f} {speedup:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+"""End-to-end throughput benchmark for PriceMonitor against the local stub server.
+
+Each scenario in scripts/bench_fixtures/scenarios.json starts
+scripts/bench_stub_server.py in a child process (so its CPU is not counted),
+writes a throwaway config.json pointing every platform at the stub, and runs
+`PriceMonitor` for N rounds. Per round it reports:
+
+- items/min:      configured items finished per minute of wall time
+- requests/item:  HTTP requests seen by the stub divided by item count
+- cpu/round:      process CPU seconds (user+sys) of the monitor process
+
+Usage:
+    python scripts/benchmark_monitor.py                      # all scenarios
+    python scripts/benchmark_monitor.py -s baseline -s latency --no-sleep
+    python scripts/benchmark_monitor.py --output data/bench_result.json
+
+`--no-sleep` disables the monitors' pacing sleeps (page delays, BUFF/ECOSteam
+throttling, the 2s inter-platform pause) so that parse and request overhead
+dominate; without it the numbers reflect production pacing.
+"""
+
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+SCRIPTS = Path(__file__).resolve().parent
+if str(SCRIPTS) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS))
+
+SCENARIOS_PATH = SCRIPTS / "bench_fixtures" / "scenarios.json"
+
+ITEM_NAME = "AK-47 | 红线 (久经沙场)"
+WEAR_BANDS = [(0.15, 0.38), (0.15, 0.18), (0.18, 0.25), (0.25, 0.38)]
+
+
+def _start_stub(options: Dict[str, Any]):
+    from bench_stub_server import serve
+
+    ready = multiprocessing.Queue()
+    proc = multiprocessing.Process(
+        target=serve,
+        args=("127.0.0.1", 0),
+        kwargs={"ready": ready, **options},
+        daemon=True,
+    )
+    proc.start()
+    port = ready.get(timeout=10)
+    return proc, f"http://127.0.0.1:{port}"
+
+
+def _control(base: str, path: str, payload: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    data = json.dumps(payload).encode("utf-8") if payload is not None else None
+    req = urllib.request.Request(base + path, data=data, method="POST" if data is not None else "GET")
+    with urllib.request.urlopen(req, timeout=5) as resp:
+        return json.loads(resp.read().decode("utf-8"))
+
+
+def _build_config(base: str, scenario: Dict[str, Any]) -> Dict[str, Any]:
+    platforms = scenario.get("platforms") or ["buff", "youpin", "ecosteam"]
+    goods_url = f"{base}/goods/730-15231-1-laypagesale-0-1.html"
+    platform_cfg = {
+        "buff": {
+            "enabled": "buff" in platforms,
+            "base_url": base,
+        },
+        "youpin": {
+            "enabled": "youpin" in platforms,
+            "base_url": base,
+            "api_base_url": base,
+            "market_api_url": f"{base}/api/homepage/pc/goods/market/queryOnSaleCommodityList",
+            "market_method": "POST",
+            "market_block_cooldown_seconds": 0,
+            "market_page_delay_seconds": 0,
+            "market_request_delay_seconds": 0,
+            "max_pages": 2,
+            "page_size": 50,
+        },
+        "ecosteam": {
+            "enabled": "ecosteam" in platforms,
+            "base_url": base,
+            "goods_detail_url": goods_url,
+            "request_min_interval_seconds": 0,
+            "request_jitter_seconds": 0,
+            "page_delay_seconds": 0,
+            "challenge_backoff_seconds": 0,
+        },
+    }
+    for name, overrides in (scenario.get("platform_overrides") or {}).items():
+        platform_cfg.setdefault(name, {}).update(overrides)
+
+    items = []
+    for i in range(int(scenario.get("items", 1))):
+        wear_min, wear_max = WEAR_BANDS[i % len(WEAR_BANDS)]
+        items.append({
+            "name": ITEM_NAME,
+            "wear_range": {"min": wear_min, "max": wear_max},
+            "target_price": 0.0,
+            "platforms": platforms,
+            "buff_goods_id": 968354,
+            "youpin_template_id": 109545,
+            "eco_goods_url": goods_url,
+        })
+
+    return {
+        "monitor_interval": 300,
+        "platforms": platform_cfg,
+        "items": items,
+        "notification": {},
+        "database": {"type": "sqlite", "path": "data/price_history.db"},
+        "logging": {"level": scenario.get("log_level", "INFO"), "file": "logs/monitor.log"},
+    }
+
+
+def _reset_root_logging() -> None:
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+        try:
+            handler.close()
+        except Exception:
+            pass
+
+
+def run_scenario(name: str, scenario: Dict[str, Any], rounds: Optional[int], verbose: bool) -> Dict[str, Any]:
+    from main import PriceMonitor
+
+    server_opts = dict(scenario.get("server") or {})
+    server_opts.setdefault("seed", 42)
+    proc, base = _start_stub(server_opts)
+    cwd = os.getcwd()
+    tmp = tempfile.TemporaryDirectory(prefix=f"bench_{name}_")
+    monitor = None
+    try:
+        os.chdir(tmp.name)
+        config = _build_config(base, scenario)
+        # 平台冷却与接口缓存写在临时目录内，不污染仓库的 data/
+        config["health_file"] = str(Path(tmp.name) / "data" / "platform_health.json")
+        config["platforms"]["youpin"]["endpoint_cache_file"] = str(Path(tmp.name) / "data" / "youpin_endpoint.json")
+        Path("config.json").write_text(json.dumps(config, ensure_ascii=False, indent=2), encoding="utf-8")
+
+        _reset_root_logging()
+        monitor = PriceMonitor("config.json")
+        if not verbose:
+            monitor._console_handler.setLevel(logging.CRITICAL + 1)
+
+        items = config["items"]
+        n_rounds = int(rounds or scenario.get("rounds", 1))
+        round_stats: List[Dict[str, Any]] = []
+        for round_no in range(1, n_rounds + 1):
+            _control(base, "/__reset", {})
+            wall0 = time.perf_counter()
+            cpu0 = time.process_time()
+            listings = sum(len(batch) for batches in monitor.run_round(items) for batch in batches)
+            wall = time.perf_counter() - wall0
+            cpu = time.process_time() - cpu0
+            stats = _control(base, "/__stats")
+            round_stats.append({
+                "round": round_no,
+                "items": len(items),
+                "listings": listings,
+                "wall_seconds": round(wall, 3),
+                "cpu_seconds": round(cpu, 3),
+                "items_per_minute": round(len(items) / wall * 60.0, 2) if wall > 0 else None,
+                "requests": stats["total"],
+                "requests_per_item": round(stats["total"] / len(items), 2) if items else None,
+                "requests_by_platform": stats["by_platform"],
+                "responses_by_status": stats["by_status"],
+            })
+        return {"scenario": name, "description": scenario.get("description", ""), "rounds": round_stats}
+    finally:
+        if monitor is not None:
+            monitor._stop_logging()
+        _reset_root_logging()
+        os.chdir(cwd)
+        tmp.cleanup()
+        proc.terminate()
+        proc.join(timeout=5)
+
+
+def _print_report(result: Dict[str, Any]) -> None:
+    print(f"\n=== {result['scenario']}: {result['description']}")
+    print(f"{'round':>5} {'items/min':>10} {'req/item':>9} {'cpu/round':>10} {'wall(s)':>8} {'listings':>9}  status")
+    for r in result["rounds"]:
+        print(
+            f"{r['round']:>5} {r['items_per_minute'] or 0:>10.2f} {r['requests_per_item'] or 0:>9.2f} "
+            f"{r['cpu_seconds']:>10.3f} {r['wall_seconds']:>8.2f} {r['listings']:>9}  {r['responses_by_status']}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Offline PriceMonitor throughput benchmark.")
+    parser.add_argument("-s", "--scenario", action="append", help="scenario name (repeatable); default: all")
+    parser.add_argument("--rounds", type=int, default=None, help="override rounds per scenario")
+    parser.add_argument("--no-sleep", action="store_true", help="disable pacing sleeps inside the monitors")
+    parser.add_argument("--verbose", action="store_true", help="keep console logging from PriceMonitor")
+    parser.add_argument("--output", default=None, help="write the JSON report to this path")
+    args = parser.parse_args()
+
+    scenarios = json.loads(SCENARIOS_PATH.read_text(encoding="utf-8"))
+    names = args.scenario or list(scenarios.keys())
+    unknown = [n for n in names if n not in scenarios]
+    if unknown:
+        raise SystemExit(f"unknown scenario(s): {', '.join(unknown)}; available: {', '.join(scenarios)}")
+
+    if args.no_sleep:
+        # The stub server runs in a child process and waits with Event.wait, so this only affects the monitors.
+        time.sleep = lambda _seconds=0: None
+
+    results = []
+    for name in names:
+        result = run_scenario(name, scenarios[name], args.rounds, args.verbose)
+        _print_report(result)
+        results.append(result)
+
+    if args.output:
+        out_path = Path(args.output)
+        if not out_path.is_absolute():
+            out_path = ROOT / out_path
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        out_path.write_text(json.dumps(results, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"\nreport written to {out_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,15 +6,19 @@ correspond to the UI wear/price.
 Output: data/ecosteam_sell_dump_from_api.json
 """
 
-import json
 import re
 from pathlib import Path
+import sys
 from typing import Any, Dict, List, Optional
 
 import requests
 
 ROOT = Path(__file__).resolve().parents[1]
-CFG = json.loads((ROOT / "config.json").read_text(encoding="utf-8"))
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from utils import jsoncodec  # noqa: E402
+CFG = jsoncodec.read_file(ROOT / "config.json")
 
 
 def get_cookie(platform: str) -> str:
@@ -51,11 +55,11 @@ def main() -> None:
     print("hash_name=", hash_name)
 
     print("query internal goods id...")
-    detail = s.post(
+    detail = jsoncodec.response_json(s.post(
         base + "/Api/SteamGoods/GoodsDetailQueryPost",
         json={"GameId": 730, "HashName": hash_name},
         timeout=30,
-    ).json()
+    ))
     sd = detail.get("StatusData") or {}
     rd = sd.get("ResultData") or {}
     internal_id = rd.get("Id")
@@ -79,7 +83,7 @@ def main() -> None:
             "PageSize": page_size,
         }
         print(f"fetch page {page_index}...")
-        resp = s.post(sell_url, json=payload, timeout=30).json()
+        resp = jsoncodec.response_json(s.post(sell_url, json=payload, timeout=30))
         sd = resp.get("StatusData") or {}
         rc = str(sd.get("ResultCode"))
         if rc != "0":
@@ -119,7 +123,7 @@ def main() -> None:
         "count": len(all_items),
         "items": all_items,
     }
-    out_path.write_text(json.dumps(payload_out, ensure_ascii=False, indent=2), encoding="utf-8")
+    jsoncodec.write_file(out_path, payload_out)
 
     print("total_record=", total_record)
     print("items_dumped=", len(all_items))
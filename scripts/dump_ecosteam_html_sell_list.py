@@ -7,17 +7,21 @@ This script follows the frontend structure:
 It writes a JSON file under data/ with all parsed rows.
 """
 
-import json
 import re
 from dataclasses import dataclass
 from pathlib import Path
+import sys
 from typing import Dict, List, Optional, Tuple
 
 import requests
 
 
 ROOT = Path(__file__).resolve().parents[1]
-CFG = json.loads((ROOT / "config.json").read_text(encoding="utf-8"))
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from utils import jsoncodec  # noqa: E402
+CFG = jsoncodec.read_file(ROOT / "config.json")
 
 
 def get_cookie(platform: str) -> str:
@@ -139,7 +143,7 @@ def main() -> None:
         "count": len(all_rows),
         "rows": [row.__dict__ for row in all_rows],
     }
-    out_path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+    jsoncodec.write_file(out_path, payload)
 
     print(f"goods_url={goods_url}")
     print(f"max_page={max_page}")
@@ -3,7 +3,6 @@
 Output: data/ecosteam_sell_raw_via_monitor.json
 """
 
-import json
 from pathlib import Path
 import sys
 
@@ -15,8 +14,9 @@ if str(ROOT) not in sys.path:
 
 def main() -> None:
     from monitors.ecosteam import EcosteamMonitor
+    from utils import jsoncodec
 
-    cfg = json.loads((ROOT / "config.json").read_text(encoding="utf-8"))
+    cfg = jsoncodec.read_file(ROOT / "config.json")
     plat = cfg.get("platforms", {}).get("ecosteam", {})
 
     m = EcosteamMonitor(plat)
@@ -41,17 +41,17 @@ def main() -> None:
         "PageSize": 40,
     }
 
-    resp = m._make_request(
+    resp = jsoncodec.response_json(m._make_request(
         sell_url,
         method="POST",
         json=payload,
         headers=m._ajax_headers(goods_url),
-    ).json()
+    ))
 
     out_dir = ROOT / "data"
     out_dir.mkdir(parents=True, exist_ok=True)
     out_path = out_dir / "ecosteam_sell_raw_via_monitor.json"
-    out_path.write_text(json.dumps(resp, ensure_ascii=False, indent=2), encoding="utf-8")
+    jsoncodec.write_file(out_path, resp)
 
     sd = resp.get("StatusData") or {}
     rd = sd.get("ResultData") or {}
@@ -0,0 +1,64 @@
+"""Incrementally export price_history to partitioned Parquet / Arrow files.
+
+Reads only the rows added since the last export (high-water mark on `id`,
+stored in <out>/_export_state.json) through a read-only SQLite connection,
+in chunks of --chunk-rows, and writes them under
+<out>/date=YYYY-MM-DD/platform=<name>/. Defaults come from the `export` and
+`database` sections of config.json. Requires pyarrow.
+
+Usage:
+    python scripts/export_price_history.py
+    python scripts/export_price_history.py --format arrow --out data/export_arrow
+    python scripts/export_price_history.py --max-chunks 10      # cap one run
+"""
+
+import argparse
+from pathlib import Path
+import sys
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from utils import jsoncodec  # noqa: E402
+from utils.exporter import FORMATS, PriceHistoryExporter, pyarrow_available  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--config", default=str(ROOT / "config.json"), help="config file for defaults")
+    parser.add_argument("--db", help="SQLite database (default: database.path)")
+    parser.add_argument("--out", help="output directory (default: export.dir or data/export)")
+    parser.add_argument("--format", choices=sorted(FORMATS), help="parquet (default) or arrow")
+    parser.add_argument("--chunk-rows", type=int, help="rows read per chunk (default 50000)")
+    parser.add_argument("--compression", help="zstd (default), lz4, snappy, none ...")
+    parser.add_argument("--max-chunks", type=int, help="stop after this many chunks")
+    args = parser.parse_args()
+
+    if not pyarrow_available():
+        print("pyarrow is not installed: python -m pip install pyarrow", file=sys.stderr)
+        return 1
+
+    cfg = jsoncodec.read_file(args.config) if Path(args.config).exists() else {}
+    export_cfg = cfg.get("export", {}) or {}
+    exporter = PriceHistoryExporter(
+        args.db or (cfg.get("database", {}) or {}).get("path", "data/price_history.db"),
+        args.out or export_cfg.get("dir", "data/export"),
+        fmt=args.format or export_cfg.get("format", "parquet"),
+        chunk_rows=args.chunk_rows or export_cfg.get("chunk_rows", 50000),
+        compression=args.compression or export_cfg.get("compression", "zstd"),
+    )
+    if not exporter.db_path.exists():
+        print(f"database not found: {exporter.db_path}", file=sys.stderr)
+        return 1
+
+    result = exporter.export(max_chunks=args.max_chunks)
+    print(
+        f"exported rows={result.rows} chunks={result.chunks} files={result.files} "
+        f"high_water_mark={result.high_water_mark} seconds={result.seconds:.2f} -> {exporter.out_dir}"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
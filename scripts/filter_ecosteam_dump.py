@@ -8,15 +8,19 @@ Output:
 - data/ecosteam_sell_filtered_sorted.json
 """
 
-import json
 from pathlib import Path
+import sys
 from typing import Any, Dict, List, Tuple
 
 ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from utils import jsoncodec  # noqa: E402
 
 
 def _load_json(path: Path) -> Dict[str, Any]:
-    return json.loads(path.read_text(encoding="utf-8"))
+    return jsoncodec.read_file(path)
 
 
 def main() -> None:
@@ -60,7 +64,7 @@ def main() -> None:
     }
 
     out_path = ROOT / "data" / "ecosteam_sell_filtered_sorted.json"
-    out_path.write_text(json.dumps(out, ensure_ascii=False, indent=2), encoding="utf-8")
+    jsoncodec.write_file(out_path, out)
 
     print("wear_range=", wear_min, wear_max)
     print("matched=", len(filtered))
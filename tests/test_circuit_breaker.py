@@ -0,0 +1,107 @@
+from utils.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+
+def test_opens_after_consecutive_failures():
+    breaker = CircuitBreaker('buff', failure_threshold=3, open_seconds=60)
+    breaker.record_failure('e1', now=0)
+    breaker.record_failure('e2', now=0)
+    assert breaker.state == CLOSED and breaker.allow(now=0)
+    breaker.record_failure('e3', now=10)
+    assert breaker.state == OPEN
+    assert breaker.opened_until == 70
+    assert not breaker.allow(now=69)
+    assert breaker.snapshot(now=40)['open_remaining_seconds'] == 30
+    assert breaker.snapshot(now=40)['last_error'] == 'e3'
+
+
+def test_success_resets_consecutive_failures():
+    breaker = CircuitBreaker('buff', failure_threshold=2, min_calls=100)
+    breaker.record_failure(now=0)
+    breaker.record_success()
+    breaker.record_failure(now=0)
+    assert breaker.state == CLOSED
+
+
+def test_opens_on_error_rate_once_min_calls_reached():
+    breaker = CircuitBreaker('youpin', failure_threshold=10, error_rate_threshold=0.5, window=10, min_calls=4)
+    breaker.record_success()
+    breaker.record_failure(now=0)
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    breaker.record_failure(now=0)
+    assert breaker.error_rate() == 0.5
+    assert breaker.state == OPEN
+
+
+def test_half_open_allows_a_single_probe():
+    breaker = CircuitBreaker('buff', failure_threshold=1, open_seconds=60)
+    breaker.record_failure(now=0)
+    assert breaker.allow(now=60)
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow(now=61)
+
+
+def test_failed_probe_doubles_open_time_up_to_max():
+    breaker = CircuitBreaker('buff', failure_threshold=1, open_seconds=60, max_open_seconds=200)
+    breaker.record_failure(now=0)
+    assert breaker.allow(now=60)
+    breaker.record_failure(now=60)
+    assert breaker.state == OPEN and breaker.opened_until == 180
+    assert breaker.allow(now=180)
+    breaker.record_failure(now=180)
+    assert breaker.opened_until == 380
+
+
+def test_successful_probe_closes_and_resets_open_time():
+    breaker = CircuitBreaker('buff', failure_threshold=1, open_seconds=60)
+    breaker.record_failure(now=0)
+    breaker.allow(now=60)
+    breaker.record_failure(now=60)
+    breaker.allow(now=180)
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert breaker.open_seconds == 60
+    assert breaker.error_rate() == 0.0
+    assert breaker.allow(now=181)
+
+
+class _Response:
+    def __init__(self, status_code, text):
+        self.status_code = status_code
+        self.text = text
+
+
+def _ecosteam(responses):
+    from monitors.ecosteam import EcosteamMonitor
+
+    monitor = EcosteamMonitor({'enabled': True, 'challenge_max_retries': 0})
+    monitor._request = lambda url, **kwargs: responses.pop(0)
+    return monitor
+
+
+_ROW = '<p class="WearRate"><span>0.2</span></p><span>￥ 12.5</span>'
+_ITEM = {'eco_goods_url': 'https://www.ecosteam.cn/goods/730-1-0-1.html'}
+
+
+def test_ecosteam_crawl_failures_set_last_error():
+    blocked = _ecosteam([_Response(429, '')])
+    assert len(blocked.get_item_price('AK', 0, 1, _ITEM)) == 0
+    assert 'HTTP 429' in blocked.last_error
+
+    challenge = _ecosteam([_Response(200, "<script>var arg1='AB';document.cookie='acw_sc__v2='</script>")])
+    challenge.get_item_price('AK', 0, 1, _ITEM)
+    assert 'acw_sc__v2' in challenge.last_error
+
+    changed = _ecosteam([_Response(200, '<a data-page="3">3</a>')])
+    changed.get_item_price('AK', 0, 1, _ITEM)
+    assert '共3页' in changed.last_error
+
+
+def test_ecosteam_single_empty_page_is_not_a_failure():
+    monitor = _ecosteam([_Response(200, '<html>暂无在售</html>')])
+    assert len(monitor.get_item_price('AK', 0, 1, _ITEM)) == 0
+    assert monitor.last_error is None
+
+    monitor = _ecosteam([_Response(200, _ROW)])
+    assert [listing.price for listing in monitor.get_item_price('AK', 0, 1, _ITEM)] == [12.5]
+    assert monitor.last_error is None
@@ -0,0 +1,86 @@
+from utils.config_watcher import diff_config, validate_config
+
+
+def _config(**overrides):
+    config = {
+        'monitor_interval': 300,
+        'platforms': {'buff': {'enabled': True, 'cookie': 'a'}, 'youpin': {'enabled': False}},
+        'items': [{'name': 'AK', 'wear_range': {'min': 0.1, 'max': 0.2}, 'platforms': ['buff']}],
+        'notification': {},
+    }
+    config.update(overrides)
+    return config
+
+
+def test_validate_accepts_valid_config():
+    assert validate_config(_config()) == []
+
+
+def test_validate_reports_each_problem():
+    assert validate_config([]) == ['配置根节点必须是对象']
+    errors = validate_config({
+        'monitor_interval': 0,
+        'platforms': {'buff': 'x'},
+        'items': [
+            'oops',
+            {'wear_range': {'min': 0.5, 'max': 0.1}},
+            {'name': 'AK', 'priority': 'urgent', 'below_median_pct': 120, 'platforms': 'buff'},
+            {'name': 'AK', 'below_median_pct': True},
+        ],
+    })
+    assert errors == [
+        'monitor_interval 必须是正整数',
+        'platforms.buff 必须是对象',
+        'items[0] 必须是对象',
+        'items[1] 缺少 name',
+        'items[1].wear_range 的 min 大于 max',
+        'items[2].platforms 必须是数组',
+        'items[2].priority 必须是 high / normal / low 之一',
+        'items[2].below_median_pct 必须是 0~100 之间的数字',
+        'items[3].below_median_pct 必须是 0~100 之间的数字',
+    ]
+
+
+def test_validate_rejects_bool_interval():
+    assert validate_config(_config(monitor_interval=True)) == ['monitor_interval 必须是正整数']
+
+
+def test_diff_without_changes():
+    change = diff_config(_config(), _config())
+    assert not change.items_modified
+    assert change.summary() == '无实际变化'
+
+
+def test_diff_items_platforms_and_sections():
+    old = _config()
+    new = _config(
+        monitor_interval=600,
+        platforms={'buff': {'enabled': True, 'cookie': 'b'}, 'youpin': {'enabled': True}, 'ecosteam': {'enabled': False}},
+        items=[
+            {'name': 'AK', 'wear_range': {'min': 0.1, 'max': 0.2}, 'platforms': ['buff', 'youpin']},
+            {'name': 'AWP', 'wear_range': {'min': 0, 'max': 1}},
+        ],
+    )
+    change = diff_config(old, new)
+    assert [i['name'] for i in change.items_changed] == ['AK']
+    assert [i['name'] for i in change.items_added] == ['AWP']
+    assert change.items_removed == []
+    assert change.platforms_enabled == {'youpin'}
+    assert change.platforms_disabled == set()
+    assert change.platforms_changed == {'buff': {'cookie'}}
+    assert change.sections_changed == {'monitor_interval'}
+
+
+def test_diff_item_identity_is_name_and_wear_range():
+    old = _config()
+    new = _config(items=[{'name': 'AK', 'wear_range': {'min': 0.2, 'max': 0.3}, 'platforms': ['buff']}])
+    change = diff_config(old, new)
+    assert len(change.items_added) == 1 and len(change.items_removed) == 1
+    assert change.items_changed == []
+
+
+def test_diff_platform_disabled():
+    new = _config(platforms={'buff': {'enabled': False}, 'youpin': {'enabled': False}})
+    change = diff_config(_config(), new)
+    assert change.platforms_disabled == {'buff'}
+    assert change.platforms_changed == {}
@@ -0,0 +1,50 @@
+from monitors.ecosteam import EcosteamMonitor
+
+_ITEM_URL = 'https://www.ecosteam.cn/goods/730-1-0-1.html'
+
+
+class _Response:
+    status_code = 200
+
+    def __init__(self, text):
+        self.text = text
+
+
+def _page(price):
+    return f'<a data-page="3">3</a><p class="WearRate"><span>0.2</span></p><span>￥ {price}</span>'
+
+
+def _monitor(requested, fail_on=None):
+    monitor = EcosteamMonitor({'enabled': True, 'max_pages': 5, 'page_delay_seconds': 0, 'page1_revalidate_rounds': 1})
+
+    def request(url, **kwargs):
+        requested.append(url)
+        if fail_on is not None and url.endswith(fail_on):
+            raise ConnectionError('boom')
+        return _Response(_page(len(requested)))
+
+    monitor._request = request
+    return monitor
+
+
+def test_item_page_budget_is_passed_without_touching_config():
+    requested = []
+    monitor = _monitor(requested)
+    batch = monitor.get_item_price('AK', 0, 1, {'eco_goods_url': _ITEM_URL, 'ecosteam_max_pages': 2})
+    assert len(requested) == 2 and len(batch) == 2
+    assert monitor.config['max_pages'] == 5
+
+    requested.clear()
+    monitor.get_item_price('AK', 0, 1, {'eco_goods_url': _ITEM_URL})
+    assert len(requested) == 3
+
+
+def test_failed_crawl_keeps_platform_budget():
+    monitor = _monitor([], fail_on='-0-2.html')
+    monitor.get_item_price('AK', 0, 1, {'eco_goods_url': _ITEM_URL, 'ecosteam_max_pages': 2})
+    assert monitor.config['max_pages'] == 5
+
+
+def test_scale_crawl_budget_uses_platform_default():
+    monitor = EcosteamMonitor({'enabled': True, 'max_pages': 8})
+    assert monitor.scale_crawl_budget({}, 0.5) == {'ecosteam_max_pages': 4}
@@ -0,0 +1,103 @@
+import sqlite3
+
+import pytest
+
+from utils.database import Database
+from utils.exporter import PriceHistoryExporter
+
+pytest.importorskip('pyarrow')
+import pyarrow.dataset as ds  # noqa: E402
+
+# 2024-01-31 00:00:00 UTC
+MIDNIGHT = 1706659200
+
+
+def _insert(db_path, rows):
+    conn = sqlite3.connect(db_path)
+    conn.executemany(
+        'INSERT INTO price_history (platform, item_name, price, wear, url, timestamp) VALUES (?, ?, ?, ?, ?, ?)',
+        rows,
+    )
+    conn.commit()
+    conn.close()
+
+
+def _rows(n, start_ts):
+    return [(platform, 'AK', 100.0 + i, 0.2, 'u', start_ts + i * 60) for i in range(n) for platform in ('buff', 'youpin')]
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = tmp_path / 'price_history.db'
+    Database(str(path))
+    return path
+
+
+def _read_ids(out_dir):
+    table = ds.dataset(str(out_dir), format='parquet', partitioning='hive').to_table()
+    return table
+
+
+def test_incremental_export_advances_high_water_mark(db_path, tmp_path):
+    out = tmp_path / 'export'
+    _insert(db_path, _rows(30, MIDNIGHT))
+    exporter = PriceHistoryExporter(str(db_path), str(out), chunk_rows=25)
+
+    first = exporter.export(max_chunks=1)
+    assert (first.rows, first.chunks, first.high_water_mark) == (25, 1, 25)
+    rest = exporter.export()
+    assert (rest.rows, rest.high_water_mark) == (35, 60)
+    assert exporter.export().rows == 0
+
+    _insert(db_path, _rows(1, MIDNIGHT + 7200))
+    assert exporter.export().rows == 2
+    state = exporter.load_state()
+    assert state['last_id'] == 62 and state['exported_rows'] == 62 and not state['pending']
+
+    ids = _read_ids(out).column('id').to_pylist()
+    assert sorted(ids) == list(range(1, 63))
+
+
+def test_partitions_use_utc_dates(db_path, tmp_path):
+    out = tmp_path / 'export'
+    # 跨越 UTC 零点的两小时
+    _insert(db_path, _rows(120, MIDNIGHT - 3600))
+    PriceHistoryExporter(str(db_path), str(out)).export()
+    table = _read_ids(out)
+    for date, ts in zip(table.column('date').to_pylist(), table.column('timestamp').to_pylist()):
+        assert str(date) == ts.strftime('%Y-%m-%d')
+    assert sorted(p.name for p in out.glob('date=*')) == ['date=2024-01-30', 'date=2024-01-31']
+    assert sorted(p.name for p in out.glob('date=2024-01-31/platform=*')) == ['platform=buff', 'platform=youpin']
+
+
+def test_interrupted_chunk_leaves_no_duplicates(db_path, tmp_path):
+    out = tmp_path / 'export'
+    _insert(db_path, _rows(10, MIDNIGHT))
+    exporter = PriceHistoryExporter(str(db_path), str(out), chunk_rows=10)
+    exporter.export(max_chunks=1)
+
+    # 模拟写到一半退出：标记 pending，并留下高水位线之后的文件和临时文件
+    state = exporter.load_state()
+    state['pending'] = True
+    exporter._save_state(state)
+    orphan = exporter._write_partition('2024-01-31', 'buff', [(11, 'buff', 'AK', 1.0, 0.1, 'u', MIDNIGHT)])
+    tmp_file = orphan.with_name('part-000000000015-000000000016.parquet.tmp')
+    tmp_file.write_bytes(b'')
+    kept = next(out.glob('date=*/platform=*/part-000000000001-*.parquet'))
+
+    result = exporter.export()
+    assert not orphan.exists() and not tmp_file.exists()
+    assert kept.exists()
+    assert result.rows == 10
+    ids = _read_ids(out).column('id').to_pylist()
+    assert sorted(ids) == list(range(1, 21))
+
+
+def test_missing_database_returns_empty_result(tmp_path):
+    result = PriceHistoryExporter(str(tmp_path / 'missing.db'), str(tmp_path / 'export')).export()
+    assert result.rows == 0 and result.high_water_mark == 0
+
+
+def test_rejects_unknown_format(tmp_path):
+    with pytest.raises(ValueError):
+        PriceHistoryExporter(str(tmp_path / 'db'), str(tmp_path / 'out'), fmt='csv')
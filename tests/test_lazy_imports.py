@@ -0,0 +1,19 @@
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# 只有启用对应功能时才应导入的模块
+LAZY_MODULES = ('http.server', 'socketserver', 'utils.read_api', 'numpy', 'requests', 'sqlite3', 'smtplib')
+
+
+def test_importing_main_does_not_load_optional_subsystems():
+    code = (
+        'import sys, main; '
+        f'print(",".join(m for m in {LAZY_MODULES!r} if m in sys.modules))'
+    )
+    out = subprocess.run(
+        [sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True, check=True
+    ).stdout.strip()
+    assert out == ''
@@ -0,0 +1,105 @@
+import pytest
+
+from utils.listing_batch import Listing, ListingBatch, count_listings, iter_listings, iter_price_rows
+
+
+def _batch(ids=None):
+    batch = ListingBatch('buff', 'AK', 'https://x', timestamp=1000)
+    for i, (price, wear) in enumerate([(30.0, 0.3), (10.0, 0.2), (20.0, 0.25), (10.0, 0.1)]):
+        batch.append(price, wear, ids[i] if ids else None)
+    return batch
+
+
+def test_append_and_listing_view():
+    batch = _batch()
+    assert len(batch) == 4
+    assert batch.ids is None
+    listing = batch[1]
+    assert isinstance(listing, Listing)
+    assert (listing['price'], listing.wear, listing.url, listing.timestamp) == (10.0, 0.2, 'https://x', 1000)
+    assert listing.get('id', 'none') == 'none'
+    assert listing.get('unknown', 5) == 5
+    with pytest.raises(KeyError):
+        listing['unknown']
+    assert batch[-1].wear == 0.1
+    with pytest.raises(IndexError):
+        batch[4]
+
+
+def test_ids_backfilled_when_first_id_arrives_late():
+    batch = ListingBatch('youpin', 'AK', timestamp=1)
+    batch.append(1.0, 0.1)
+    batch.append(2.0, 0.2, 'b')
+    assert batch.ids == [None, 'b']
+    assert batch[1].to_dict() == {
+        'platform': 'youpin', 'item_name': 'AK', 'price': 2.0, 'wear': 0.2, 'url': '', 'timestamp': 1, 'id': 'b',
+    }
+
+
+def test_take_copies_rows_and_shares_metadata():
+    batch = _batch(ids=['a', 'b', 'c', 'd'])
+    picked = batch.take([3, 0])
+    assert list(picked.prices) == [10.0, 30.0]
+    assert list(picked.wears) == [0.1, 0.3]
+    assert picked.ids == ['d', 'a']
+    assert (picked.platform, picked.item_name, picked.url, picked.timestamp) == ('buff', 'AK', 'https://x', 1000)
+    picked.append(5.0, 0.5, 'e')
+    assert len(batch) == 4
+
+
+def test_take_accepts_generator_and_empty():
+    batch = _batch()
+    assert len(batch.take(i for i in range(len(batch)) if batch.prices[i] < 25)) == 3
+    empty = batch.take([])
+    assert len(empty) == 0 and empty.min_price() is None
+
+
+def test_slicing_returns_batch():
+    batch = _batch(ids=['a', 'b', 'c', 'd'])
+    assert list(batch[1:3].prices) == [10.0, 20.0]
+    assert batch[::-1].ids == ['d', 'c', 'b', 'a']
+    assert len(batch[10:]) == 0
+
+
+def test_sorted_by_price_breaks_ties_by_wear_and_limits():
+    batch = _batch()
+    ordered = batch.sorted_by_price()
+    assert [(l.price, l.wear) for l in ordered] == [(10.0, 0.1), (10.0, 0.2), (20.0, 0.25), (30.0, 0.3)]
+    assert list(batch.sorted_by_price(limit=2).wears) == [0.1, 0.2]
+    assert list(batch.price_at_most(20.0).prices) == [10.0, 20.0, 10.0]
+    assert (batch.min_price(), batch.max_price()) == (10.0, 30.0)
+
+
+def test_from_dicts_takes_metadata_from_first_entry():
+    batch = ListingBatch.from_dicts([
+        {'platform': 'ecosteam', 'item_name': 'AK', 'price': 3, 'wear': 0.1, 'url': 'u', 'timestamp': 7},
+        {'price': 4, 'wear': 0.2, 'id': 'x'},
+    ])
+    assert (batch.platform, batch.url, batch.timestamp) == ('ecosteam', 'u', 7)
+    assert list(batch.prices) == [3.0, 4.0]
+    assert batch.ids == [None, 'x']
+    empty = ListingBatch.from_dicts([], platform='buff', item_name='AK')
+    assert (empty.platform, empty.item_name, len(empty)) == ('buff', 'AK', 0)
+
+
+def test_iter_price_rows_mixes_batches_and_dicts():
+    batch = _batch()
+    legacy = {'platform': 'youpin', 'item_name': 'AK', 'price': 9.0, 'wear': 0.4, 'url': 'v', 'timestamp': 2}
+    rows = list(iter_price_rows([batch[:2], legacy]))
+    assert rows == [
+        ('buff', 'AK', 30.0, 0.3, 'https://x', 1000),
+        ('buff', 'AK', 10.0, 0.2, 'https://x', 1000),
+        ('youpin', 'AK', 9.0, 0.4, 'v', 2),
+    ]
+    assert list(iter_price_rows(batch)) == list(batch.rows())
+    assert list(iter_price_rows(None)) == []
+
+
+def test_iter_listings_and_count():
+    batch = _batch()
+    legacy = {'price': 1.0}
+    data = [batch, legacy]
+    assert [l.get('price') for l in iter_listings(data)] == [30.0, 10.0, 20.0, 10.0, 1.0]
+    assert count_listings(data) == 5
+    assert count_listings(batch) == 4
+    assert count_listings([]) == 0
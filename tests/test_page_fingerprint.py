@@ -0,0 +1,51 @@
+from utils.page_fingerprint import PageFingerprintCache, page_fingerprint
+
+
+def test_fingerprint_depends_on_wears_and_prices():
+    fp = page_fingerprint([0.1, 0.2], [10.0, 11.0])
+    assert fp == page_fingerprint([0.1, 0.2], [10.0, 11.0])
+    assert fp != page_fingerprint([0.1, 0.2], [10.0, 11.5])
+    assert fp != page_fingerprint([0.2, 0.1], [10.0, 11.0])
+
+
+def test_hit_requires_same_fingerprint():
+    cache = PageFingerprintCache()
+    cache.store('k', 'fp1', 'deeper', now=0)
+    assert cache.lookup('k', 'fp2', revalidate_rounds=4, max_age=100, now=1) is None
+    assert cache.lookup('other', 'fp1', revalidate_rounds=4, max_age=100, now=1) is None
+    assert cache.lookup('k', 'fp1', revalidate_rounds=4, max_age=100, now=1) == 'deeper'
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_forces_full_crawl_every_revalidate_rounds():
+    cache = PageFingerprintCache()
+    cache.store('k', 'fp', 'deeper', now=0)
+    results = [cache.lookup('k', 'fp', revalidate_rounds=3, max_age=100, now=1) for _ in range(3)]
+    assert results == ['deeper', 'deeper', None]
+    # 完整抓取后重新登记，重新计数
+    cache.store('k', 'fp', 'fresh', now=2)
+    assert cache.lookup('k', 'fp', revalidate_rounds=3, max_age=100, now=3) == 'fresh'
+
+
+def test_revalidate_rounds_of_one_disables_cache():
+    cache = PageFingerprintCache()
+    cache.store('k', 'fp', 'deeper', now=0)
+    assert cache.lookup('k', 'fp', revalidate_rounds=1, max_age=100, now=0) is None
+
+
+def test_expires_after_max_age_and_invalidate():
+    cache = PageFingerprintCache()
+    cache.store('k', 'fp', 'deeper', now=0)
+    assert cache.lookup('k', 'fp', revalidate_rounds=10, max_age=100, now=101) is None
+    cache.store('k', 'fp', 'deeper', now=200)
+    cache.invalidate('k')
+    assert cache.lookup('k', 'fp', revalidate_rounds=10, max_age=100, now=201) is None
+
+
+def test_evicts_oldest_entry_when_full():
+    cache = PageFingerprintCache(max_entries=2)
+    cache.store('a', 'fp', 1, now=0)
+    cache.store('b', 'fp', 2, now=0)
+    cache.store('c', 'fp', 3, now=0)
+    assert cache.lookup('a', 'fp', revalidate_rounds=10, max_age=100, now=1) is None
+    assert cache.lookup('c', 'fp', revalidate_rounds=10, max_age=100, now=1) == 3
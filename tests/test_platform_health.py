@@ -0,0 +1,47 @@
+from utils.platform_health import PlatformHealth
+
+
+def test_saves_from_two_processes_merge_instead_of_overwrite(tmp_path):
+    path = str(tmp_path / 'health.json')
+    shard_a, shard_b = PlatformHealth(path), PlatformHealth(path)
+    shard_a.block('youpin', 100, 'a')
+    # shard_b 的内存状态里没有 youpin 的冷却，写入时不能把它抹掉
+    shard_b.block('buff', 50, 'b')
+    merged = PlatformHealth(path)
+    assert merged.is_blocked('youpin') and merged.is_blocked('buff')
+
+
+def test_stale_probe_does_not_erase_newer_block(tmp_path):
+    path = str(tmp_path / 'health.json')
+    stale = PlatformHealth(path)
+    stale._state['ecosteam'] = {'blocked_until': 1.0, 'blocked_at': 0, 'cooldown': 10}
+    PlatformHealth(path).block('ecosteam', 100, 'fresh')
+    # 冷却已过期的旧状态切换为探测时合并到其他进程刚记录的冷却
+    assert stale.is_blocked('ecosteam')
+    assert PlatformHealth(path).is_blocked('ecosteam')
+
+
+def test_probe_success_shortens_cooldown(tmp_path):
+    health = PlatformHealth(str(tmp_path / 'health.json'))
+    health.block('youpin', 100)
+    health._state['youpin']['blocked_until'] = 0.5
+    assert not health.is_blocked('youpin')
+    health.record_success('youpin', 100)
+    assert health.blocked_until('youpin') == 0.0
+    assert health._state['youpin']['cooldown'] == 50
+
+
+def test_endpoint_cache_saves_from_two_processes_merge(tmp_path):
+    from utils.endpoint_cache import EndpointCache
+
+    path = str(tmp_path / 'endpoint.json')
+    shard_a, shard_b = EndpointCache(path), EndpointCache(path)
+    shard_a.record_success('https://a/api', 'POST')
+    shard_b.record_success('https://b/api', 'GET')
+    merged = EndpointCache(path)
+    assert merged.preferred([('https://a/api', 'POST')]) == ('https://a/api', 'POST')
+    assert merged.preferred([('https://b/api', 'GET')]) == ('https://b/api', 'GET')
+    # 较新的本地改动覆盖磁盘上的同一端点
+    shard_a.record_failure('https://a/api', 'POST')
+    shard_a.record_failure('https://a/api', 'POST')
+    assert EndpointCache(path).preferred([('https://a/api', 'POST')]) is None
@@ -0,0 +1,119 @@
+import math
+
+import pytest
+
+from utils.price_stats import DAY_SECONDS, PriceStatsEngine, QuantileSketch, RollingPriceStats, listing_identities
+
+
+def test_sketch_quantiles_within_relative_accuracy():
+    sketch = QuantileSketch(0.01)
+    values = [float(v) for v in range(1, 1001)]
+    for v in values:
+        sketch.add(v)
+    for q in (0.1, 0.5, 0.9):
+        exact = values[int(q * (len(values) - 1))]
+        assert sketch.quantile(q) == pytest.approx(exact, rel=0.011)
+
+
+def test_sketch_merge_and_zero_values():
+    a, b = QuantileSketch(0.01), QuantileSketch(0.01)
+    a.add(0)
+    a.add(10)
+    b.add(20, count=2)
+    a.merge(b)
+    assert a.count == 4
+    assert a.quantile(0) == 0.0
+    assert a.quantile(1) == pytest.approx(20, rel=0.011)
+    assert QuantileSketch().quantile(0.5) is None
+
+
+def test_sketch_dict_roundtrip():
+    sketch = QuantileSketch(0.02)
+    for v in (1.0, 5.0, 5.0, 100.0):
+        sketch.add(v)
+    restored = QuantileSketch.from_dict(sketch.to_dict(), 0.02)
+    assert restored.count == 4
+    assert restored.quantile(0.5) == sketch.quantile(0.5)
+
+
+def test_rolling_window_expires_old_days():
+    stats = RollingPriceStats(window_days=2)
+    day0 = 100 * DAY_SECONDS
+    stats.add_prices([10.0] * 5, day0)
+    stats.add_prices([20.0] * 5, day0 + DAY_SECONDS)
+    assert stats.window(day0 + DAY_SECONDS).count == 10
+    # 第 3 天：第 1 天的桶超出 2 天窗口
+    stats.add_prices([30.0], day0 + 2 * DAY_SECONDS)
+    window = stats.window(day0 + 2 * DAY_SECONDS)
+    assert window.count == 6
+    assert window.quantile(0) == pytest.approx(20, rel=0.011)
+    assert min(stats.days) == 101
+
+
+def test_rolling_history_cache_sees_new_prices_today():
+    stats = RollingPriceStats(window_days=7)
+    now = 100 * DAY_SECONDS
+    stats.add_prices([10.0], now - DAY_SECONDS)
+    assert stats.window(now).count == 1
+    stats.add_prices([12.0, 14.0], now)
+    assert stats.window(now).count == 3
+
+
+def test_floor_ewma_and_volatility():
+    stats = RollingPriceStats(alpha=0.5)
+    stats.observe_floor(100.0)
+    stats.observe_floor(100.0)
+    assert stats.ewma == 100.0
+    assert stats.volatility == 0.0
+    stats.observe_floor(110.0)
+    assert stats.ewma == pytest.approx(105.0)
+    r = math.log(1.1)
+    assert stats.volatility == pytest.approx(math.sqrt(0.5 * 0.5 * r * r))
+
+
+def test_unchanged_listing_counted_once_and_reprice_counted_again():
+    engine = PriceStatsEngine(None)
+    key = engine.key('AK|0-1', 'buff')
+    prices, wears, ids = [100.0, 101.0], [0.2, 0.3], ['a', 'b']
+    identities = listing_identities(prices, wears, ids)
+    engine.update(key, prices, 1000.0, identities)
+    engine.update(key, prices, 1300.0, identities)
+    assert engine.samples(key, 1300.0) == 2
+
+    repriced = listing_identities([90.0, 101.0], wears, ids)
+    assert engine.fresh_indices(key, repriced) == [0]
+    engine.update(key, [90.0, 101.0], 1600.0, repriced)
+    assert engine.samples(key, 1600.0) == 3
+    assert engine.fresh_indices(key, repriced) == []
+
+
+def test_checkpoint_roundtrip_and_accuracy_mismatch(tmp_path):
+    path = tmp_path / 'stats.json'
+    engine = PriceStatsEngine(str(path), relative_accuracy=0.01)
+    key = engine.key('AK|0-1', 'youpin')
+    ids = listing_identities([1.0, 2.0, 3.0], [0.1, 0.2, 0.3])
+    engine.update(key, [1.0, 2.0, 3.0], identities=ids)
+    assert engine.save(force=True)
+
+    reloaded = PriceStatsEngine(str(path), relative_accuracy=0.01)
+    assert reloaded.samples(key) == 3
+    assert reloaded.fresh_indices(key, ids) == []
+
+    assert PriceStatsEngine(str(path), relative_accuracy=0.02).samples(key) == 0
+
+
+def test_select_bands_keeps_full_in_band_listings_for_stats():
+    from monitors.buff import BuffMonitor
+    from utils.listing_batch import ListingBatch
+
+    monitor = BuffMonitor({'enabled': True})
+    crawl = ListingBatch('buff', 'AK')
+    for i in range(30):
+        crawl.append(100.0 + i, 0.1 + i * 0.01)
+    top, = monitor._select_bands(crawl, [(0.1, 0.25)], limit=5)
+    assert list(top.prices) == [100.0, 101.0, 102.0, 103.0, 104.0]
+    full, = monitor.last_in_band
+    assert sorted(full.prices) == [100.0 + i for i in range(16)]
+
+    monitor._select_bands(crawl, [(0.1, 0.25)])
+    assert len(monitor.last_in_band[0]) == 16
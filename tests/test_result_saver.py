@@ -0,0 +1,56 @@
+from utils import jsoncodec
+from utils.listing_batch import ListingBatch
+from utils.read_api import ReadApiState
+from utils.result_saver import RoundResultWriter, iter_result_records, result_key
+
+
+def _batch(platform, *prices):
+    batch = ListingBatch(platform, 'AK', timestamp=1)
+    for i, price in enumerate(prices):
+        batch.append(price, 0.1 * (i + 1))
+    return batch
+
+
+def test_flush_appends_segment_and_writes_latest_index(tmp_path):
+    writer = RoundResultWriter(str(tmp_path))
+    record = writer.add([_batch('buff', 12.0, 10.0), _batch('youpin', 11.0)], 'AK', 0, 0.5)
+    assert record['summary'] == {
+        'buff': {'count': 2, 'min_price': 10.0, 'max_price': 12.0},
+        'youpin': {'count': 1, 'min_price': 11.0, 'max_price': 11.0},
+    }
+    assert [d['price'] for d in record['details']['buff']] == [10.0, 12.0]
+    assert writer.add([], 'AWP', 0, 1) is None
+
+    segment = writer.flush()
+    assert [r['item_name'] for r in iter_result_records(str(segment))] == ['AK']
+    latest = jsoncodec.read_file(writer.latest_path)
+    assert list(latest['items']) == [result_key('AK', 0, 0.5)]
+    assert writer.flush() is None
+
+
+def test_retain_prunes_items_removed_from_config(tmp_path):
+    writer = RoundResultWriter(str(tmp_path))
+    writer.add([_batch('buff', 1.0)], 'AK', 0, 0.5)
+    writer.add([_batch('buff', 2.0)], 'AWP', 0, 1)
+    writer.flush()
+
+    reopened = RoundResultWriter(str(tmp_path))
+    assert reopened.retain([result_key('AK', 0, 0.5)]) == [result_key('AWP', 0, 1)]
+    assert reopened.retain([result_key('AK', 0, 0.5)]) == []
+    # 本轮没有新记录也要把剔除结果写盘
+    assert reopened.flush() is None
+    assert list(jsoncodec.read_file(reopened.latest_path)['items']) == [result_key('AK', 0, 0.5)]
+
+
+def test_read_api_state_drops_removed_items():
+    state = ReadApiState()
+    record = {'item_name': 'AK', 'summary': {'buff': {'min_price': 1.0, 'count': 1}}}
+    state.update_item('AK|0-1', record)
+    state.update_item('AWP|0-1', dict(record, item_name='AWP'))
+    state.remove_items(['AWP|0-1'])
+    state.publish()
+    items = jsoncodec.loads(state.response('/items', {}))
+    assert list(items['items']) == ['AK|0-1']
+    assert state.response('/item', {'key': ['AWP|0-1']}) is None
+    assert state.response('/history', {'key': ['AWP|0-1']}) is None
+    assert state.response('/item', {'key': ['AK|0-1']}) is not None
@@ -0,0 +1,51 @@
+from monitors.buff import BuffMonitor
+from utils.round_planner import item_band, plan_crawl_jobs
+
+
+def _item(name, lo, hi, platforms=('buff',), **extra):
+    return {'name': name, 'wear_range': {'min': lo, 'max': hi}, 'platforms': list(platforms), **extra}
+
+
+def test_item_band_defaults():
+    assert item_band({}) == (0, 1)
+    assert item_band(_item('AK', 0.1, 0.2)) == (0.1, 0.2)
+
+
+def test_same_goods_id_coalesces_into_one_job():
+    monitors = {'buff': BuffMonitor({'enabled': True, 'max_pages': 4})}
+    items = [
+        _item('AK-47 | 红线 (久经沙场)', 0.15, 0.38, buff_goods_id=1, buff_max_pages=2),
+        _item('AK 红线 别名', 0.15, 0.18, buff_goods_id=1),
+        _item('AK-47 | 红线 (久经沙场)', 0.15, 0.38, buff_goods_id=1, buff_max_pages=6),
+        _item('AWP', 0, 1, buff_goods_id=2),
+    ]
+    jobs = plan_crawl_jobs(items, monitors)
+    assert [job.goods_key for job in jobs] == ['goods:1', 'goods:2']
+
+    job = jobs[0]
+    assert job.item_name == 'AK-47 | 红线 (久经沙场)'
+    assert job.item_indices == [0, 1, 2]
+    # 相同磨损区间去重，band_indices 指回去重后的区间
+    assert job.bands == [(0.15, 0.38), (0.15, 0.18)]
+    assert job.band_indices == [0, 1, 0]
+    # 翻页预算取各配置项有效值的最大值（未配置的取平台 max_pages）
+    assert job.crawl_config['buff_max_pages'] == 6
+
+
+def test_items_without_goods_id_coalesce_by_normalized_name():
+    monitors = {'buff': BuffMonitor({'enabled': True})}
+    jobs = plan_crawl_jobs([_item('AK  Redline', 0, 0.5), _item('ak redline', 0.5, 1)], monitors)
+    assert len(jobs) == 1
+    assert jobs[0].bands == [(0, 0.5), (0.5, 1)]
+
+
+def test_disabled_platforms_are_skipped():
+    monitors = {'buff': BuffMonitor({'enabled': True})}
+    jobs = plan_crawl_jobs([_item('AK', 0, 1, platforms=('buff', 'youpin'))], monitors)
+    assert [job.platform for job in jobs] == ['buff']
+
+
+def test_scale_crawl_budget_for_buff():
+    monitor = BuffMonitor({'enabled': True})
+    assert monitor.scale_crawl_budget({}, 0.5) == {'buff_max_pages': 5}
+    assert monitor.scale_crawl_budget({'buff_max_pages': 1}, 0.5) == {'buff_max_pages': 1}
@@ -0,0 +1,31 @@
+from monitors import get_monitor_class
+from utils.sharding import partition_items
+
+
+def _goods_keys(item):
+    return [
+        f"{platform}|{get_monitor_class(platform).goods_key(item.get('name'), item, {})}"
+        for platform in item.get('platforms', [])
+    ]
+
+
+def test_same_name_stays_together_and_groups_balance():
+    items = [{'name': 'AK'}, {'name': 'AWP'}, {'name': 'ak'}, {'name': 'M4'}]
+    assert partition_items(items, 2) == [[0, 2], [1, 3]]
+    assert partition_items(items, 1) == [[0, 1, 2, 3]]
+    assert partition_items([], 3) == [[], [], []]
+
+
+def test_shared_platform_goods_keys_stay_together():
+    items = [
+        {'name': 'AK 红线', 'platforms': ['buff'], 'buff_goods_id': 1},
+        {'name': 'AWP', 'platforms': ['buff'], 'buff_goods_id': 2},
+        {'name': 'AK-47 | Redline', 'platforms': ['buff', 'youpin'], 'buff_goods_id': 1, 'youpin_template_id': 9},
+        {'name': 'M4', 'platforms': ['youpin'], 'youpin_template_id': 9},
+        {'name': 'Glock', 'platforms': ['ecosteam'], 'eco_goods_url': 'u'},
+        {'name': 'USP', 'platforms': ['ecosteam'], 'eco_goods_url': 'u'},
+    ]
+    partitions = partition_items(items, 3, _goods_keys)
+    assert partitions == [[0, 2, 3], [4, 5], [1]]
+    # 只按名称时这些配置项会被拆开
+    assert len([p for p in partition_items(items, 3) if 0 in p and 2 in p]) == 0
@@ -1,6 +1,23 @@
-"""工具模块初始化文件"""
-from .config import Config
-from .database import Database
-from .notification import Notifier
+"""工具模块初始化文件
 
-__all__ = ['Config', 'Database', 'Notifier']
+子模块按需导入：`from utils import Notifier` 等写法照常可用，但只有实际访问时
+才会加载对应模块（及 requests、sqlite3 等依赖）。
+"""
+from importlib import import_module
+
+_EXPORTS = {
+    'Config': '.config',
+    'Database': '.database',
+    'Notifier': '.notification',
+    'ListingBatch': '.listing_batch',
+}
+
+
+def __getattr__(name: str):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(import_module(module_name, __name__), name)
+
+
+__all__ = ['Config', 'Database', 'Notifier', 'ListingBatch']
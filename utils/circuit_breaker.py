@@ -0,0 +1,137 @@
+"""平台熔断器 - 平台持续出错时快速失败，并用单次半开探测恢复
+
+closed（正常）：记录最近 `window` 次调用的结果；连续失败达到 `failure_threshold`，
+或调用数不少于 `min_calls` 且错误率达到 `error_rate_threshold` 时打开熔断。
+open（熔断）：`open_seconds` 内所有调用直接拒绝，不再为每个商品付出超时与重试成本。
+half_open（半开）：熔断时间结束后只放行一次探测调用，成功则关闭熔断，
+失败则重新打开且熔断时长加倍（不超过 `max_open_seconds`）。
+"""
+from collections import deque
+import threading
+import time
+from typing import Any, Dict, Optional
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitBreaker:
+    """单个平台的熔断器（线程安全）"""
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 3,
+        error_rate_threshold: float = 0.5,
+        window: int = 20,
+        min_calls: int = 6,
+        open_seconds: float = 300.0,
+        max_open_seconds: float = 3600.0,
+    ):
+        """
+        初始化熔断器
+
+        Args:
+            name: 平台名
+            failure_threshold: 连续失败多少次后打开
+            error_rate_threshold: 窗口内错误率阈值
+            window: 统计错误率的最近调用数
+            min_calls: 错误率生效所需的最少调用数
+            open_seconds: 打开后的初始熔断时长（秒）
+            max_open_seconds: 反复探测失败时的最长熔断时长（秒）
+        """
+        self.name = name
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.error_rate_threshold = float(error_rate_threshold)
+        self.min_calls = max(1, int(min_calls))
+        self.base_open_seconds = float(open_seconds)
+        self.max_open_seconds = max(float(max_open_seconds), self.base_open_seconds)
+
+        self.state = CLOSED
+        self.open_seconds = self.base_open_seconds
+        self.opened_until = 0.0
+        self.consecutive_failures = 0
+        self.last_error: Optional[str] = None
+        self._results: deque = deque(maxlen=max(1, int(window)))
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self, now: Optional[float] = None) -> bool:
+        """本次调用是否放行（熔断结束后只放行一次半开探测）"""
+        now = time.time() if now is None else now
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN:
+                if now < self.opened_until:
+                    return False
+                self.state = HALF_OPEN
+                self._probe_in_flight = False
+            if self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._results.append(True)
+            self.consecutive_failures = 0
+            if self.state != CLOSED:
+                # 半开探测成功：恢复正常
+                self.state = CLOSED
+                self.open_seconds = self.base_open_seconds
+                self.opened_until = 0.0
+                self._probe_in_flight = False
+                self._results.clear()
+
+    def record_failure(self, error: Optional[str] = None, now: Optional[float] = None) -> None:
+        now = time.time() if now is None else now
+        with self._lock:
+            self._results.append(False)
+            self.consecutive_failures += 1
+            self.last_error = error
+            if self.state == HALF_OPEN:
+                # 探测失败：重新打开，熔断时长加倍
+                self.open_seconds = min(self.open_seconds * 2, self.max_open_seconds)
+                self._open(now)
+            elif self.state == CLOSED and self._should_open():
+                self._open(now)
+
+    def _should_open(self) -> bool:
+        if self.consecutive_failures >= self.failure_threshold:
+            return True
+        calls = len(self._results)
+        if calls < self.min_calls:
+            return False
+        failures = calls - sum(self._results)
+        return failures / calls >= self.error_rate_threshold
+
+    def _open(self, now: float) -> None:
+        self.state = OPEN
+        self.opened_until = now + self.open_seconds
+        self._probe_in_flight = False
+
+    def error_rate(self) -> float:
+        with self._lock:
+            calls = len(self._results)
+            return (calls - sum(self._results)) / calls if calls else 0.0
+
+    def snapshot(self, now: Optional[float] = None) -> Dict[str, Any]:
+        """当前状态（用于日志和结果索引）"""
+        now = time.time() if now is None else now
+        error_rate = self.error_rate()
+        with self._lock:
+            return {
+                'state': self.state,
+                'consecutive_failures': self.consecutive_failures,
+                'error_rate': round(error_rate, 3),
+                'open_remaining_seconds': max(0, int(self.opened_until - now)) if self.state == OPEN else 0,
+                'last_error': self.last_error,
+            }
+
+    def describe(self, now: Optional[float] = None) -> str:
+        snap = self.snapshot(now)
+        if snap['state'] == OPEN:
+            return f"{self.name}=open(剩余 {snap['open_remaining_seconds']}s)"
+        return f"{self.name}={snap['state']}(错误率 {snap['error_rate']:.0%})"
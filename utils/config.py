@@ -1,8 +1,9 @@
 """配置管理模块"""
-import json
 import os
 from typing import Dict, Any
 
+from . import jsoncodec
+
 
 class Config:
     """配置管理类"""
@@ -30,8 +31,7 @@ class Config:
                 "请复制 config.json.example 为 config.json 并修改配置"
             )
         
-        with open(self.config_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return jsoncodec.read_file(self.config_path)
     
     def get(self, key: str, default: Any = None) -> Any:
         """
@@ -0,0 +1,197 @@
+"""配置热加载 - 监视 config.json 变化，校验并计算差异
+
+`ConfigWatcher.poll()` 只做一次 stat；文件的修改时间或大小变化后才重新读取、
+校验新配置。校验失败时保留旧配置继续运行；校验通过后原地替换 `Config.config`，
+并返回 `ConfigChange` 描述哪些商品、平台和其他配置段发生了变化，由主程序
+决定如何就地应用（例如只为连接级配置变化的平台重建会话）。
+"""
+from dataclasses import dataclass, field
+import logging
+import os
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from . import jsoncodec
+from .config import Config
+from .load_shedder import PRIORITIES
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ConfigChange:
+    """一次配置变更的差异"""
+
+    items_added: List[Dict[str, Any]] = field(default_factory=list)
+    items_removed: List[Dict[str, Any]] = field(default_factory=list)
+    items_changed: List[Dict[str, Any]] = field(default_factory=list)
+    platforms_enabled: Set[str] = field(default_factory=set)
+    platforms_disabled: Set[str] = field(default_factory=set)
+    # 平台名 -> 发生变化的配置键
+    platforms_changed: Dict[str, Set[str]] = field(default_factory=dict)
+    # 发生变化的其他顶层配置段（monitor_interval / notification / logging ...）
+    sections_changed: Set[str] = field(default_factory=set)
+
+    @property
+    def items_modified(self) -> bool:
+        return bool(self.items_added or self.items_removed or self.items_changed)
+
+    def summary(self) -> str:
+        parts = []
+        if self.items_modified:
+            parts.append(
+                f"商品 +{len(self.items_added)} -{len(self.items_removed)} ~{len(self.items_changed)}"
+            )
+        if self.platforms_enabled:
+            parts.append(f"启用平台 {', '.join(sorted(self.platforms_enabled))}")
+        if self.platforms_disabled:
+            parts.append(f"停用平台 {', '.join(sorted(self.platforms_disabled))}")
+        if self.platforms_changed:
+            parts.append(
+                '平台配置 ' + ', '.join(f"{p}({', '.join(sorted(keys))})" for p, keys in sorted(self.platforms_changed.items()))
+            )
+        if self.sections_changed:
+            parts.append(f"其他 {', '.join(sorted(self.sections_changed))}")
+        return '；'.join(parts) if parts else '无实际变化'
+
+
+def validate_config(data: Any) -> List[str]:
+    """校验配置结构，返回错误列表（为空表示通过）"""
+    if not isinstance(data, dict):
+        return ['配置根节点必须是对象']
+    errors: List[str] = []
+
+    interval = data.get('monitor_interval', 300)
+    if not isinstance(interval, int) or isinstance(interval, bool) or interval <= 0:
+        errors.append('monitor_interval 必须是正整数')
+
+    platforms = data.get('platforms', {})
+    if not isinstance(platforms, dict):
+        errors.append('platforms 必须是对象')
+    else:
+        for name, cfg in platforms.items():
+            if not isinstance(cfg, dict):
+                errors.append(f'platforms.{name} 必须是对象')
+
+    items = data.get('items', [])
+    if not isinstance(items, list):
+        errors.append('items 必须是数组')
+        return errors
+    for i, item in enumerate(items):
+        if not isinstance(item, dict):
+            errors.append(f'items[{i}] 必须是对象')
+            continue
+        if not item.get('name'):
+            errors.append(f'items[{i}] 缺少 name')
+        wear_range = item.get('wear_range', {})
+        if not isinstance(wear_range, dict):
+            errors.append(f'items[{i}].wear_range 必须是对象')
+            continue
+        try:
+            if float(wear_range.get('min', 0)) > float(wear_range.get('max', 1)):
+                errors.append(f'items[{i}].wear_range 的 min 大于 max')
+        except (TypeError, ValueError):
+            errors.append(f'items[{i}].wear_range 必须是数字')
+        if not isinstance(item.get('platforms', []), list):
+            errors.append(f'items[{i}].platforms 必须是数组')
+        if item.get('priority') is not None and str(item.get('priority')).lower() not in PRIORITIES:
+            errors.append(f"items[{i}].priority 必须是 {' / '.join(PRIORITIES)} 之一")
+        below_median_pct = item.get('below_median_pct')
+        if below_median_pct is not None and (
+            isinstance(below_median_pct, bool)
+            or not isinstance(below_median_pct, (int, float))
+            or not 0 <= below_median_pct < 100
+        ):
+            errors.append(f'items[{i}].below_median_pct 必须是 0~100 之间的数字')
+    return errors
+
+
+def _item_key(item: Dict[str, Any]) -> Tuple[Any, Any, Any]:
+    wear_range = item.get('wear_range', {}) or {}
+    return (item.get('name'), wear_range.get('min', 0), wear_range.get('max', 1))
+
+
+def _dumps(value: Any) -> str:
+    return jsoncodec.dumps(value, sort_keys=True)
+
+
+def diff_config(old: Dict[str, Any], new: Dict[str, Any]) -> ConfigChange:
+    """计算两份配置的差异"""
+    change = ConfigChange()
+
+    old_items = {_item_key(i): i for i in old.get('items', [])}
+    new_items = {_item_key(i): i for i in new.get('items', [])}
+    for key, item in new_items.items():
+        if key not in old_items:
+            change.items_added.append(item)
+        elif _dumps(item) != _dumps(old_items[key]):
+            change.items_changed.append(item)
+    change.items_removed = [item for key, item in old_items.items() if key not in new_items]
+
+    old_platforms = old.get('platforms', {}) or {}
+    new_platforms = new.get('platforms', {}) or {}
+    for name in set(old_platforms) | set(new_platforms):
+        old_cfg = old_platforms.get(name) or {}
+        new_cfg = new_platforms.get(name) or {}
+        was_enabled = bool(old_cfg.get('enabled', False))
+        is_enabled = bool(new_cfg.get('enabled', False))
+        if is_enabled and not was_enabled:
+            change.platforms_enabled.add(name)
+        elif was_enabled and not is_enabled:
+            change.platforms_disabled.add(name)
+        elif is_enabled:
+            keys = {k for k in set(old_cfg) | set(new_cfg) if _dumps(old_cfg.get(k)) != _dumps(new_cfg.get(k))}
+            if keys:
+                change.platforms_changed[name] = keys
+
+    for section in (set(old) | set(new)) - {'items', 'platforms'}:
+        if _dumps(old.get(section)) != _dumps(new.get(section)):
+            change.sections_changed.add(section)
+    return change
+
+
+class ConfigWatcher:
+    """按修改时间轮询配置文件，变化时校验并原地更新 Config"""
+
+    def __init__(self, config: Config):
+        """
+        初始化监视器
+
+        Args:
+            config: 要保持同步的配置对象
+        """
+        self.config = config
+        self._signature = self._stat()
+
+    def _stat(self) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(self.config.config_path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def poll(self) -> Optional[ConfigChange]:
+        """
+        检查配置文件是否变化
+
+        Returns:
+            有效的配置变更；文件未变化、无法解析或校验失败时返回 None
+        """
+        signature = self._stat()
+        if signature is None or signature == self._signature:
+            return None
+        self._signature = signature
+
+        try:
+            new = jsoncodec.read_file(self.config.config_path)
+        except (OSError, ValueError) as e:
+            logger.error(f"配置文件已修改但无法解析，继续使用旧配置: {e}")
+            return None
+
+        errors = validate_config(new)
+        if errors:
+            logger.error(f"配置文件校验失败，继续使用旧配置: {'; '.join(errors)}")
+            return None
+
+        change = diff_config(self.config.config, new)
+        self.config.config = new
+        return change
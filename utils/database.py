@@ -5,6 +5,8 @@ import os
 from typing import List, Dict, Any
 from datetime import datetime
 
+from .listing_batch import PriceData, iter_price_rows
+
 
 class Database:
     """数据库管理类"""
@@ -84,12 +86,12 @@ class Database:
         conn.commit()
         conn.close()
     
-    def insert_prices_batch(self, price_list: List[Dict[str, Any]]):
+    def insert_prices_batch(self, price_list: PriceData):
         """
         批量插入价格记录
         
         Args:
-            price_list: 价格信息列表
+            price_list: ListingBatch、ListingBatch 列表或价格信息字典列表
         """
         if not price_list:
             return
@@ -97,22 +99,11 @@ class Database:
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
         
-        data = [
-            (
-                p.get('platform'),
-                p.get('item_name'),
-                p.get('price'),
-                p.get('wear'),
-                p.get('url'),
-                p.get('timestamp')
-            )
-            for p in price_list
-        ]
-        
+        # 直接把行生成器交给 executemany，不再先拼出中间列表
         cursor.executemany('''
             INSERT INTO price_history (platform, item_name, price, wear, url, timestamp)
             VALUES (?, ?, ?, ?, ?, ?)
-        ''', data)
+        ''', iter_price_rows(price_list))
         
         conn.commit()
         conn.close()
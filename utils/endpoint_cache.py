@@ -0,0 +1,136 @@
+"""接口探测缓存 - 记住可用的 (URL, 请求方法) 组合并持久化
+
+平台接口常有多个候选地址与 GET/POST 两种调用方式。`EndpointCache` 为每个组合
+维护成功分数：最近成功过的组合总是排在最前面，只有它失败后才会继续尝试其他候选。
+学到的结果写入 JSON 文件（原子替换），重启后直接复用。
+
+多进程运行时各抓取进程共用同一个文件：写入时持有文件锁，先读取磁盘上的内容，
+只用本进程改动过的端点覆盖（改动时间更晚者优先），不会抹掉其他进程学到的结果。
+"""
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+from . import jsoncodec
+from .file_lock import file_lock, lock_path
+
+logger = logging.getLogger(__name__)
+
+Endpoint = Tuple[str, str]
+
+# 分数上限，以及失败时的扣分（失败扣分大于成功加分，坏掉的端点会很快让位）
+MAX_SCORE = 10.0
+FAILURE_PENALTY = 3.0
+
+
+class EndpointCache:
+    """按成功分数排序候选端点，并把学习结果持久化"""
+
+    def __init__(self, path: Optional[str] = None, save_interval: float = 60.0):
+        """
+        初始化缓存
+
+        Args:
+            path: 持久化文件路径（为空时只在内存中记录；相对路径按创建时的工作目录解析）
+            save_interval: 分数变化后的最短落盘间隔（秒）；首选端点变化时立即落盘
+        """
+        # 创建时即解析为绝对路径，之后切换工作目录也不会写到别处
+        self.path = Path(path).resolve() if path else None
+        self.save_interval = float(save_interval)
+        self._entries: Dict[str, Dict[str, Any]] = self._load()
+        # 本进程改动过、尚未写入文件的端点
+        self._dirty: Set[str] = set()
+        self._last_save = 0.0
+
+    @staticmethod
+    def _key(url: str, method: str) -> str:
+        return f"{method.upper()} {url}"
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        if self.path is None or not self.path.exists():
+            return {}
+        try:
+            data = jsoncodec.read_file(self.path)
+        except (OSError, ValueError) as e:
+            logger.warning(f"读取接口缓存失败，将重新探测: {e}")
+            return {}
+        entries = data.get('endpoints', {}) if isinstance(data, dict) else {}
+        return {k: v for k, v in entries.items() if isinstance(v, dict)}
+
+    def _score(self, url: str, method: str) -> float:
+        entry = self._entries.get(self._key(url, method))
+        return float(entry.get('score', 0.0)) if entry else 0.0
+
+    def preferred(self, candidates: Sequence[Endpoint]) -> Optional[Endpoint]:
+        """候选中分数最高且为正的端点（没有则返回 None）"""
+        best = None
+        best_score = 0.0
+        for url, method in candidates:
+            score = self._score(url, method)
+            if score > best_score:
+                best, best_score = (url, method), score
+        return best
+
+    def order(self, candidates: Sequence[Endpoint]) -> List[Endpoint]:
+        """首选端点排最前，其余保持配置给出的顺序"""
+        best = self.preferred(candidates)
+        if best is None:
+            return list(candidates)
+        return [best] + [c for c in candidates if c != best]
+
+    def record_success(self, url: str, method: str) -> None:
+        before = self.preferred([(url, method)] + self._known())
+        entry = self._entries.setdefault(self._key(url, method), {'url': url, 'method': method.upper()})
+        entry['score'] = min(MAX_SCORE, float(entry.get('score', 0.0)) + 1.0)
+        entry['successes'] = int(entry.get('successes', 0)) + 1
+        entry['last_success'] = int(time.time())
+        self._touch(entry, url, method)
+        self._maybe_save(force=before != (url, method))
+
+    def record_failure(self, url: str, method: str) -> None:
+        key = self._key(url, method)
+        entry = self._entries.get(key)
+        if entry is None:
+            # 从未成功过的候选不需要记录
+            return
+        entry['score'] = float(entry.get('score', 0.0)) - FAILURE_PENALTY
+        entry['failures'] = int(entry.get('failures', 0)) + 1
+        self._touch(entry, url, method)
+        self._maybe_save(force=entry['score'] <= 0)
+
+    def _touch(self, entry: Dict[str, Any], url: str, method: str) -> None:
+        entry['updated_at'] = time.time()
+        self._dirty.add(self._key(url, method))
+
+    def _known(self) -> List[Endpoint]:
+        return [(e.get('url', ''), e.get('method', 'GET')) for e in self._entries.values()]
+
+    def _maybe_save(self, force: bool = False) -> None:
+        if self.path is None or not self._dirty:
+            return
+        now = time.time()
+        if not force and now - self._last_save < self.save_interval:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with file_lock(lock_path(self.path)):
+                merged = self._load()
+                for key in self._dirty:
+                    local = self._entries.get(key)
+                    if local is not None and local.get('updated_at', 0.0) >= merged.get(key, {}).get('updated_at', 0.0):
+                        merged[key] = local
+                # 每个进程使用自己的临时文件，避免互相替换写了一半的文件
+                tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+                jsoncodec.write_file(tmp_path, {'endpoints': merged})
+                os.replace(tmp_path, self.path)
+            self._entries = merged
+            self._dirty.clear()
+            self._last_save = now
+        except OSError as e:
+            logger.warning(f"保存接口缓存失败: {e}")
+
+    def flush(self) -> None:
+        """把尚未落盘的分数写入文件"""
+        self._maybe_save(force=True)
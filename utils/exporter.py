@@ -0,0 +1,226 @@
+"""价格历史导出 - 把 price_history 增量导出为按日期、平台分区的 Parquet / Arrow 文件
+
+分析任务不再直接读取线上的 `price_history.db`：导出按 `id` 的高水位线增量进行，
+每次只读取上次导出之后新增的行。读取使用只读连接，按 `id` 键集分页，每次最多
+`chunk_rows` 行，内存占用与表大小无关；每个分块按 (日期, 平台) 分组后各写一个文件：
+
+    <out_dir>/date=2024-01-31/platform=buff/part-000000123456-000000173455.parquet
+
+分区日期按 UTC 计算，与文件中 `timestamp` 列（UTC）的日界一致。
+目录采用 Hive 分区命名，pyarrow / DuckDB / Spark 等可直接按分区读取整个目录。
+每个分块写完后原子更新 `_export_state.json` 中的高水位线；写入中途退出时，下一次
+导出会先删除高水位线之后的残留文件再继续，不会产生重复行。
+
+需要安装 pyarrow（可选依赖）：
+
+    python -m pip install pyarrow
+"""
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+import logging
+import os
+from pathlib import Path
+import re
+import sqlite3
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from . import jsoncodec
+
+try:  # pyarrow 为可选依赖
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - 取决于运行环境
+    pa = feather = pq = None
+
+logger = logging.getLogger(__name__)
+
+FORMATS = {'parquet': '.parquet', 'arrow': '.arrow'}
+STATE_FILE = '_export_state.json'
+
+_COLUMNS = 'id, platform, item_name, price, wear, url, timestamp'
+_PART_RE = re.compile(r'part-(\d+)-\d+\.')
+_UNSAFE_RE = re.compile(r'[^\w.-]')
+
+Rows = List[Tuple[Any, ...]]
+
+
+def pyarrow_available() -> bool:
+    return pa is not None
+
+
+@dataclass
+class ExportResult:
+    """一次导出的统计"""
+
+    rows: int = 0
+    chunks: int = 0
+    files: int = 0
+    high_water_mark: int = 0
+    max_timestamp: int = 0
+    seconds: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class PriceHistoryExporter:
+    """price_history 的增量分区导出"""
+
+    def __init__(
+        self,
+        db_path: str,
+        out_dir: str = 'data/export',
+        fmt: str = 'parquet',
+        chunk_rows: int = 50000,
+        compression: str = 'zstd',
+    ):
+        """
+        初始化导出器
+
+        Args:
+            db_path: SQLite 数据库路径
+            out_dir: 导出目录（同时保存高水位线状态）
+            fmt: 导出格式 parquet / arrow（Arrow IPC，即 Feather v2）
+            chunk_rows: 每个分块读取的最大行数
+            compression: 压缩算法（zstd / lz4 / snappy / none 等，取决于格式）
+        """
+        if fmt not in FORMATS:
+            raise ValueError(f"不支持的导出格式: {fmt}（可选 {' / '.join(FORMATS)}）")
+        self.db_path = Path(db_path)
+        self.out_dir = Path(out_dir)
+        self.fmt = fmt
+        self.chunk_rows = max(1, int(chunk_rows))
+        self.compression = None if str(compression).lower() in ('', 'none') else compression
+        self.state_path = self.out_dir / STATE_FILE
+        self._date_cache: Dict[int, str] = {}
+
+    def load_state(self) -> Dict[str, Any]:
+        """读取高水位线状态（不存在或无法解析时从头导出）"""
+        try:
+            state = jsoncodec.read_file(self.state_path)
+        except (OSError, ValueError):
+            return {}
+        return state if isinstance(state, dict) else {}
+
+    def _save_state(self, state: Dict[str, Any]) -> None:
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.state_path.with_name(self.state_path.name + '.tmp')
+        jsoncodec.write_file(tmp_path, state)
+        os.replace(tmp_path, self.state_path)
+
+    def _connect(self) -> sqlite3.Connection:
+        # 只读打开，不会在线上数据库上创建日志文件或加写锁
+        return sqlite3.connect(f"{self.db_path.resolve().as_uri()}?mode=ro", uri=True)
+
+    def _chunks(self, conn: sqlite3.Connection, after_id: int) -> Iterator[Rows]:
+        """按 id 键集分页读取高水位线之后的行"""
+        while True:
+            rows = conn.execute(
+                f"SELECT {_COLUMNS} FROM price_history WHERE id > ? ORDER BY id LIMIT ?",
+                (after_id, self.chunk_rows),
+            ).fetchall()
+            if not rows:
+                return
+            yield rows
+            after_id = rows[-1][0]
+
+    def _date(self, timestamp: int) -> str:
+        # UTC 日期，与 timestamp 列的时区一致；同一批次的记录共享时间戳，按时间戳缓存日期字符串
+        date = self._date_cache.get(timestamp)
+        if date is None:
+            if len(self._date_cache) > 100000:
+                self._date_cache.clear()
+            date = self._date_cache[timestamp] = datetime.fromtimestamp(timestamp, timezone.utc).strftime('%Y-%m-%d')
+        return date
+
+    def _partition(self, rows: Rows) -> Dict[Tuple[str, str], Rows]:
+        parts: Dict[Tuple[str, str], Rows] = {}
+        for row in rows:
+            parts.setdefault((self._date(row[6]), row[1]), []).append(row)
+        return parts
+
+    def _partition_dir(self, date: str, platform: str) -> Path:
+        return self.out_dir / f"date={date}" / f"platform={_UNSAFE_RE.sub('_', platform or 'unknown')}"
+
+    def _write_partition(self, date: str, platform: str, rows: Rows) -> Path:
+        """把一个分区的行写成一个文件（分区列 date / platform 由目录名表示）"""
+        table = pa.table({
+            'id': pa.array([r[0] for r in rows], pa.int64()),
+            'item_name': pa.array([r[2] for r in rows], pa.string()),
+            'price': pa.array([r[3] for r in rows], pa.float64()),
+            'wear': pa.array([r[4] for r in rows], pa.float64()),
+            'url': pa.array([r[5] for r in rows], pa.string()),
+            'timestamp': pa.array([r[6] for r in rows], pa.timestamp('s', tz='UTC')),
+        })
+        directory = self._partition_dir(date, platform)
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f"part-{rows[0][0]:012d}-{rows[-1][0]:012d}{FORMATS[self.fmt]}"
+        tmp_path = path.with_name(path.name + '.tmp')
+        if self.fmt == 'parquet':
+            pq.write_table(table, tmp_path, compression=self.compression)
+        else:
+            feather.write_feather(table, tmp_path, compression=self.compression or 'uncompressed')
+        os.replace(tmp_path, path)
+        return path
+
+    def _remove_orphans(self, last_id: int) -> None:
+        """删除上次中断时写出、但未计入高水位线的文件"""
+        for path in self.out_dir.glob(f"date=*/platform=*/part-*{FORMATS[self.fmt]}*"):
+            match = _PART_RE.match(path.name)
+            if path.name.endswith('.tmp') or (match and int(match.group(1)) > last_id):
+                try:
+                    path.unlink()
+                except OSError as e:
+                    logger.warning(f"删除残留导出文件失败 {path}: {e}")
+
+    def export(self, max_chunks: Optional[int] = None) -> ExportResult:
+        """
+        导出高水位线之后的新行
+
+        Args:
+            max_chunks: 本次最多导出的分块数（为空时导出全部新行）
+
+        Returns:
+            本次导出的统计
+        """
+        if pa is None:
+            raise RuntimeError("导出需要 pyarrow，请先执行 pip install pyarrow")
+        started = time.perf_counter()
+        state = self.load_state()
+        last_id = int(state.get('last_id', 0))
+        result = ExportResult(high_water_mark=last_id, max_timestamp=int(state.get('max_timestamp', 0)))
+        if state.get('pending'):
+            self._remove_orphans(last_id)
+        if not self.db_path.exists():
+            return result
+
+        conn = self._connect()
+        try:
+            for rows in self._chunks(conn, last_id):
+                # 先标记写入中，写完全部分区后再推进高水位线
+                state['pending'] = True
+                self._save_state(state)
+                for (date, platform), part in self._partition(rows).items():
+                    self._write_partition(date, platform, part)
+                    result.files += 1
+                result.rows += len(rows)
+                result.chunks += 1
+                result.high_water_mark = rows[-1][0]
+                result.max_timestamp = max(result.max_timestamp, max(r[6] for r in rows))
+                state.update({
+                    'last_id': result.high_water_mark,
+                    'max_timestamp': result.max_timestamp,
+                    'exported_rows': int(state.get('exported_rows', 0)) + len(rows),
+                    'format': self.fmt,
+                    'updated_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                    'pending': False,
+                })
+                self._save_state(state)
+                if max_chunks is not None and result.chunks >= max_chunks:
+                    break
+        finally:
+            conn.close()
+        result.seconds = time.perf_counter() - started
+        return result
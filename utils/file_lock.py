@@ -0,0 +1,38 @@
+"""跨进程文件锁 - 多个抓取进程共用同一个状态文件时串行化“读取-合并-写入”
+
+POSIX 使用 fcntl.flock，Windows 使用 msvcrt.locking。锁加在单独的 `.lock` 文件上，
+状态文件本身仍通过临时文件 + 原子替换写入。
+"""
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+try:  # 跨进程文件锁：POSIX 用 fcntl，Windows 用 msvcrt
+    import fcntl
+except ImportError:  # pragma: no cover - 取决于运行平台
+    fcntl = None
+    import msvcrt
+
+
+@contextmanager
+def file_lock(path: Path) -> Iterator[None]:
+    """在 path 上持有排他锁（阻塞等待）"""
+    with open(path, 'a+b') as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:  # pragma: no cover - Windows
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:  # pragma: no cover - Windows
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def lock_path(path: Path) -> Path:
+    """状态文件对应的锁文件路径"""
+    return path.with_name(path.name + '.lock')
@@ -0,0 +1,65 @@
+"""JSON 编解码 - 安装了 orjson 时使用 orjson，否则回退到标准库 json
+
+所有平台响应解析、结果文件、Cookie 文件和脚本导出都经由这里，输出格式统一：
+UTF-8、不转义中文；默认紧凑格式，`indent=True` 时缩进 2 空格。解析失败统一抛出
+`ValueError`（orjson.JSONDecodeError 与 json.JSONDecodeError 都是它的子类）。
+
+    python -m pip install orjson    # 可选，解析/序列化通常快数倍
+"""
+import json
+from pathlib import Path
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - 取决于运行环境
+    orjson = None
+
+BACKEND = 'orjson' if orjson is not None else 'json'
+
+_COMPACT = {'ensure_ascii': False, 'separators': (',', ':')}
+
+
+def loads(data: Union[bytes, bytearray, memoryview, str]) -> Any:
+    """解析 JSON（bytes 或 str）"""
+    if orjson is not None:
+        return orjson.loads(data)
+    if isinstance(data, memoryview):
+        data = data.tobytes()
+    return json.loads(data)
+
+
+def dumps_bytes(obj: Any, indent: bool = False, sort_keys: bool = False) -> bytes:
+    """序列化为 UTF-8 字节"""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, option=option)
+    return dumps(obj, indent=indent, sort_keys=sort_keys).encode('utf-8')
+
+
+def dumps(obj: Any, indent: bool = False, sort_keys: bool = False) -> str:
+    """序列化为字符串"""
+    if orjson is not None:
+        return dumps_bytes(obj, indent=indent, sort_keys=sort_keys).decode('utf-8')
+    if indent:
+        return json.dumps(obj, ensure_ascii=False, indent=2, sort_keys=sort_keys)
+    return json.dumps(obj, sort_keys=sort_keys, **_COMPACT)
+
+
+def response_json(resp) -> Any:
+    """解析 requests 响应体（代替 resp.json()，直接解码原始字节）"""
+    return loads(resp.content)
+
+
+def read_file(path: Union[str, Path]) -> Any:
+    """读取 JSON 文件"""
+    return loads(Path(path).read_bytes())
+
+
+def write_file(path: Union[str, Path], obj: Any, indent: bool = True) -> None:
+    """写入 JSON 文件（默认缩进，便于人工查看）"""
+    Path(path).write_bytes(dumps_bytes(obj, indent=indent))
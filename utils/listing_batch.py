@@ -0,0 +1,248 @@
+"""在售列表的紧凑批量表示
+
+同一次抓取得到的商品共享 platform/item_name/url/timestamp，只有价格、磨损
+（以及可选的平台挂单 ID）逐条不同。`ListingBatch` 把它们存成 array 列，
+`Listing` 是指向某一行的轻量视图，支持 `listing['price']` / `listing.get('wear')`
+这类字典式访问，下游（数据库、结果文件、通知）无需逐条构造字典。
+"""
+from array import array
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from .listing_filter import top_k_cheapest
+
+
+class Listing:
+    """ListingBatch 中某一行的只读视图（不复制数据）"""
+
+    __slots__ = ('_batch', '_index')
+
+    _FIELDS = ('platform', 'item_name', 'price', 'wear', 'url', 'timestamp', 'id')
+
+    def __init__(self, batch: 'ListingBatch', index: int):
+        self._batch = batch
+        self._index = index
+
+    @property
+    def platform(self) -> str:
+        return self._batch.platform
+
+    @property
+    def item_name(self) -> str:
+        return self._batch.item_name
+
+    @property
+    def url(self) -> str:
+        return self._batch.url
+
+    @property
+    def timestamp(self) -> int:
+        return self._batch.timestamp
+
+    @property
+    def price(self) -> float:
+        return self._batch.prices[self._index]
+
+    @property
+    def wear(self) -> float:
+        return self._batch.wears[self._index]
+
+    @property
+    def id(self) -> Any:
+        ids = self._batch.ids
+        return ids[self._index] if ids is not None else None
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self._FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key not in self._FIELDS:
+            return default
+        value = getattr(self, key)
+        return default if value is None else value
+
+    def to_dict(self) -> Dict[str, Any]:
+        d = {
+            'platform': self.platform,
+            'item_name': self.item_name,
+            'price': self.price,
+            'wear': self.wear,
+            'url': self.url,
+            'timestamp': self.timestamp,
+        }
+        if self._batch.ids is not None:
+            d['id'] = self.id
+        return d
+
+    def __repr__(self) -> str:
+        return f"Listing({self.platform}, price={self.price}, wear={self.wear:.6f})"
+
+
+class ListingBatch:
+    """同一平台、同一商品一次抓取结果的列式存储"""
+
+    __slots__ = ('platform', 'item_name', 'url', 'timestamp', 'prices', 'wears', 'ids')
+
+    def __init__(self, platform: str, item_name: str, url: str = '', timestamp: Optional[int] = None):
+        """
+        初始化批次
+
+        Args:
+            platform: 平台名称
+            item_name: 商品名称
+            url: 商品链接（整批共享）
+            timestamp: 抓取时间戳（整批共享，默认当前时间）
+        """
+        self.platform = platform
+        self.item_name = item_name
+        self.url = url
+        self.timestamp = int(time.time()) if timestamp is None else int(timestamp)
+        self.prices = array('d')
+        self.wears = array('d')
+        self.ids: Optional[List[Any]] = None
+
+    @classmethod
+    def from_dicts(cls, price_list: Iterable[Dict[str, Any]], platform: str = 'unknown', item_name: str = '') -> 'ListingBatch':
+        """把旧式价格字典列表转为批次（兼容仍返回 list[dict] 的监控器）"""
+        batch: Optional[ListingBatch] = None
+        for p in price_list:
+            if batch is None:
+                batch = cls(
+                    p.get('platform', platform),
+                    p.get('item_name', item_name),
+                    p.get('url') or '',
+                    p.get('timestamp'),
+                )
+            batch.append(p.get('price', 0), p.get('wear', 0), p.get('id'))
+        return batch if batch is not None else cls(platform, item_name)
+
+    def append(self, price: float, wear: float, listing_id: Any = None) -> None:
+        if listing_id is not None and self.ids is None:
+            self.ids = [None] * len(self.prices)
+        self.prices.append(price)
+        self.wears.append(wear)
+        if self.ids is not None:
+            self.ids.append(listing_id)
+
+    def extend_columns(
+        self,
+        prices: Sequence[float],
+        wears: Sequence[float],
+        indices: Optional[Iterable[int]] = None,
+        ids: Optional[Sequence[Any]] = None,
+    ) -> None:
+        """从已解析的价格/磨损列批量追加（可只取 indices 指定的行）"""
+        if indices is None:
+            indices = range(len(prices))
+        if ids is not None and self.ids is None:
+            self.ids = [None] * len(self.prices)
+        for i in indices:
+            self.prices.append(prices[i])
+            self.wears.append(wears[i])
+            if self.ids is not None:
+                self.ids.append(ids[i] if ids is not None else None)
+
+    def __len__(self) -> int:
+        return len(self.prices)
+
+    def __iter__(self) -> Iterator[Listing]:
+        for i in range(len(self.prices)):
+            yield Listing(self, i)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Listing, 'ListingBatch']:
+        if isinstance(index, slice):
+            return self.take(range(*index.indices(len(self))))
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('ListingBatch index out of range')
+        return Listing(self, index)
+
+    def _empty_like(self) -> 'ListingBatch':
+        return ListingBatch(self.platform, self.item_name, self.url, self.timestamp)
+
+    def take(self, indices: Iterable[int]) -> 'ListingBatch':
+        """按下标挑选若干行组成新批次（共享元数据）"""
+        out = self._empty_like()
+        prices, wears, ids = self.prices, self.wears, self.ids
+        if ids is not None:
+            out.ids = []
+        for i in indices:
+            out.prices.append(prices[i])
+            out.wears.append(wears[i])
+            if ids is not None:
+                out.ids.append(ids[i])
+        return out
+
+    def sorted_by_price(self, limit: Optional[int] = None) -> 'ListingBatch':
+        """按 (价格, 磨损) 升序排列，可选只保留前 limit 个（部分选择，不做全量排序）"""
+        return self.take(top_k_cheapest(self.prices, self.wears, limit))
+
+    def price_at_most(self, target_price: float) -> 'ListingBatch':
+        """价格不高于 target_price 的子集"""
+        prices = self.prices
+        return self.take(i for i in range(len(prices)) if prices[i] <= target_price)
+
+    def min_price(self) -> Optional[float]:
+        return min(self.prices) if self.prices else None
+
+    def max_price(self) -> Optional[float]:
+        return max(self.prices) if self.prices else None
+
+    def rows(self) -> Iterator[Tuple[str, str, float, float, str, int]]:
+        """逐行产出 price_history 的插入元组，可直接交给 executemany"""
+        platform, item_name, url, ts = self.platform, self.item_name, self.url, self.timestamp
+        for price, wear in zip(self.prices, self.wears):
+            yield (platform, item_name, price, wear, url, ts)
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        return [listing.to_dict() for listing in self]
+
+    def __repr__(self) -> str:
+        return f"ListingBatch({self.platform}, {self.item_name!r}, n={len(self)})"
+
+
+PriceData = Union[ListingBatch, Sequence[Union[ListingBatch, Dict[str, Any], Listing]]]
+
+
+def iter_listings(price_data: Optional[PriceData]) -> Iterator[Any]:
+    """统一遍历：批次 / 批次列表 / 字典列表，逐条产出支持 .get() 的对象"""
+    if not price_data:
+        return
+    if isinstance(price_data, ListingBatch):
+        yield from price_data
+        return
+    for entry in price_data:
+        if isinstance(entry, ListingBatch):
+            yield from entry
+        else:
+            yield entry
+
+
+def iter_price_rows(price_data: Optional[PriceData]) -> Iterator[Tuple[Any, ...]]:
+    """统一产出 (platform, item_name, price, wear, url, timestamp) 元组"""
+    if not price_data:
+        return
+    batches = [price_data] if isinstance(price_data, ListingBatch) else price_data
+    for entry in batches:
+        if isinstance(entry, ListingBatch):
+            yield from entry.rows()
+        else:
+            yield (
+                entry.get('platform'),
+                entry.get('item_name'),
+                entry.get('price'),
+                entry.get('wear'),
+                entry.get('url'),
+                entry.get('timestamp'),
+            )
+
+
+def count_listings(price_data: Optional[PriceData]) -> int:
+    if not price_data:
+        return 0
+    if isinstance(price_data, ListingBatch):
+        return len(price_data)
+    return sum(len(e) if isinstance(e, ListingBatch) else 1 for e in price_data)
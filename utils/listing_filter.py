@@ -0,0 +1,179 @@
+"""在售列表的磨损区间筛选与最低价 Top-K 选择
+
+三个平台共用：每页先解析成 (wear, price) 两列，再做区间筛选和部分选择，
+而不是逐条 append 后整体 sort 再切片。安装了 NumPy 时对较大的列使用
+向量化掩码 / argpartition，否则退回纯 Python（bisect + heapq）。NumPy 在第一次
+遇到足够长的列时才导入，不拖慢程序启动。
+"""
+from array import array
+from bisect import bisect_left, bisect_right
+import heapq
+from typing import Any, Callable, Iterable, List, Optional, Sequence, Tuple
+
+# NumPy 为可选依赖，首次需要时才导入（见 _numpy）
+np = None
+_numpy_checked = False
+
+# 列长度低于该阈值时 NumPy 的转换开销大于收益，直接走纯 Python
+NUMPY_MIN_SIZE = 256
+
+Band = Tuple[float, float]
+
+
+def _numpy():
+    global np, _numpy_checked
+    if not _numpy_checked:
+        try:
+            import numpy
+        except ImportError:  # pragma: no cover - 取决于运行环境
+            numpy = None
+        np = numpy
+        _numpy_checked = True
+    return np
+
+
+def numpy_available() -> bool:
+    return _numpy() is not None
+
+
+def _use_numpy(n: int) -> bool:
+    return n >= NUMPY_MIN_SIZE and _numpy() is not None
+
+
+def _as_np(column: Sequence[float]):
+    if isinstance(column, array) and column.typecode == 'd':
+        return np.frombuffer(column, dtype=np.float64)
+    return np.asarray(column, dtype=np.float64)
+
+
+def parse_columns(
+    items: Iterable[Any],
+    parse: Callable[[Any], Optional[Tuple[float, float]]],
+) -> Tuple[array, array, List[int]]:
+    """把一页原始数据解析为磨损/价格两列
+
+    Args:
+        items: 原始条目（JSON 对象、HTML 行等）
+        parse: 单条解析函数，返回 (wear, price)；无法解析或需要跳过时返回 None
+
+    Returns:
+        (wears, prices, source_index)，source_index[i] 是第 i 行在 items 中的下标
+    """
+    wears = array('d')
+    prices = array('d')
+    source_index: List[int] = []
+    for idx, item in enumerate(items):
+        parsed = parse(item)
+        if parsed is None:
+            continue
+        wears.append(parsed[0])
+        prices.append(parsed[1])
+        source_index.append(idx)
+    return wears, prices, source_index
+
+
+def range_indices(wears: Sequence[float], wear_min: float, wear_max: float) -> List[int]:
+    """返回 wear_min <= wear <= wear_max 的行下标"""
+    if _use_numpy(len(wears)):
+        w = _as_np(wears)
+        return np.flatnonzero((w >= wear_min) & (w <= wear_max)).tolist()
+    return [i for i, w in enumerate(wears) if wear_min <= w <= wear_max]
+
+
+def top_k_cheapest(
+    prices: Sequence[float],
+    wears: Sequence[float],
+    k: Optional[int] = None,
+    indices: Optional[Sequence[int]] = None,
+) -> List[int]:
+    """按 (价格, 磨损) 升序选出最便宜的 k 行（k=None 表示全部排序）
+
+    Args:
+        prices: 价格列
+        wears: 磨损列
+        k: 需要的行数
+        indices: 只在这些下标中选择（默认全部行）
+
+    Returns:
+        有序的行下标列表
+    """
+    if indices is None:
+        indices = range(len(prices))
+    n = len(indices)
+    if n == 0 or (k is not None and k <= 0):
+        return []
+
+    if _use_numpy(n):
+        idx = np.asarray(indices, dtype=np.int64)
+        p = _as_np(prices)[idx]
+        w = _as_np(wears)[idx]
+        if k is not None and k < n:
+            # argpartition 找到第 k 小的价格，再把与之同价的行也纳入，保证并列时按磨损取舍一致
+            kth = p[np.argpartition(p, k - 1)[k - 1]]
+            keep = np.flatnonzero(p <= kth)
+            order = keep[np.lexsort((w[keep], p[keep]))][:k]
+        else:
+            order = np.lexsort((w, p))
+        return idx[order].tolist()
+
+    def key(i: int) -> Tuple[float, float]:
+        return (prices[i], wears[i])
+
+    if k is not None and k < n:
+        return heapq.nsmallest(k, indices, key=key)
+    return sorted(indices, key=key)
+
+
+def select_band(
+    wears: Sequence[float],
+    prices: Sequence[float],
+    wear_min: float,
+    wear_max: float,
+    k: Optional[int] = None,
+) -> List[int]:
+    """单个磨损区间：筛选后取最便宜的 k 行"""
+    return top_k_cheapest(prices, wears, k, range_indices(wears, wear_min, wear_max))
+
+
+def select_bands(
+    wears: Sequence[float],
+    prices: Sequence[float],
+    bands: Sequence[Band],
+    k: Optional[int] = None,
+) -> List[List[int]]:
+    """多个磨损区间一次评估：按磨损排序一次，每个区间用二分定位
+
+    Args:
+        wears: 磨损列
+        prices: 价格列
+        bands: [(wear_min, wear_max), ...]
+        k: 每个区间保留的最便宜行数
+
+    Returns:
+        与 bands 一一对应的有序行下标列表
+    """
+    n = len(wears)
+    if not bands:
+        return []
+    if len(bands) == 1:
+        return [select_band(wears, prices, bands[0][0], bands[0][1], k)]
+
+    if _use_numpy(n):
+        w = _as_np(wears)
+        by_wear = np.argsort(w, kind='stable')
+        sorted_w = w[by_wear]
+        out = []
+        for wear_min, wear_max in bands:
+            lo = int(np.searchsorted(sorted_w, wear_min, side='left'))
+            hi = int(np.searchsorted(sorted_w, wear_max, side='right'))
+            out.append(top_k_cheapest(prices, wears, k, by_wear[lo:hi].tolist()))
+        return out
+
+    by_wear = sorted(range(n), key=wears.__getitem__)
+    sorted_w = [wears[i] for i in by_wear]
+    out = []
+    for wear_min, wear_max in bands:
+        lo = bisect_left(sorted_w, wear_min)
+        hi = bisect_right(sorted_w, wear_max)
+        out.append(top_k_cheapest(prices, wears, k, by_wear[lo:hi]))
+    return out
@@ -0,0 +1,138 @@
+"""增量同步 - 按“最新上架”排序只拉取新挂单，本地维护每个商品的在售集合
+
+按价格排序的完整抓取每轮都要翻完整个窗口，而真正需要提醒的是新上架的便宜挂单。
+启用增量同步后，某个商品第一次（以及每隔 `full_resync_rounds` 轮）照常完整抓取，
+并以挂单 ID 建立本地在售集合；其余轮次按最新上架排序翻页，遇到已知 ID 即停止，
+通常 1~2 个请求就能发现全部新挂单。每隔 `recheck_rounds` 轮再拉一次价格最低的
+一页，比它最高价还便宜、却不在这一页上的已知挂单视为已售出/下架并移除。
+
+增量翻到 `max_pages` 页仍未遇到已知挂单（新挂单太多）、请求失败或挂单缺少 ID 时，
+调用方应退回完整抓取。
+"""
+from array import array
+import threading
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+
+class ListingSet:
+    """单个商品的本地在售集合"""
+
+    __slots__ = ('listings', 'since_full', 'since_recheck')
+
+    def __init__(self):
+        # 挂单 ID -> (价格, 磨损)
+        self.listings: Dict[Any, Tuple[float, float]] = {}
+        self.since_full = 0
+        self.since_recheck = 0
+
+
+class IncrementalListingSync:
+    """各商品在售集合的维护（线程安全）"""
+
+    def __init__(self, full_resync_rounds: int = 12, recheck_rounds: int = 3, max_listings: int = 5000):
+        """
+        初始化
+
+        Args:
+            full_resync_rounds: 每隔多少轮完整抓取一次（重建集合）
+            recheck_rounds: 每隔多少轮复查价格最低的一页以移除已售出的挂单
+            max_listings: 单个商品集合的上限，超过后下一轮完整抓取
+        """
+        self.full_resync_rounds = max(1, int(full_resync_rounds))
+        self.recheck_rounds = max(1, int(recheck_rounds))
+        self.max_listings = max(1, int(max_listings))
+        self._lock = threading.Lock()
+        self._sets: Dict[str, ListingSet] = {}
+
+    def configure(self, full_resync_rounds: int, recheck_rounds: int) -> None:
+        self.full_resync_rounds = max(1, int(full_resync_rounds))
+        self.recheck_rounds = max(1, int(recheck_rounds))
+
+    def needs_full(self, key: str) -> bool:
+        """本轮是否需要完整抓取（没有集合、到达完整同步周期或集合过大）"""
+        with self._lock:
+            listing_set = self._sets.get(key)
+            return (
+                listing_set is None
+                or listing_set.since_full + 1 >= self.full_resync_rounds
+                or len(listing_set.listings) > self.max_listings
+            )
+
+    def recheck_due(self, key: str) -> bool:
+        with self._lock:
+            listing_set = self._sets.get(key)
+            return listing_set is not None and listing_set.since_recheck + 1 >= self.recheck_rounds
+
+    def seed(self, key: str, ids: Optional[Sequence[Any]], prices: Sequence[float], wears: Sequence[float]) -> bool:
+        """用一次完整抓取的结果重建集合（挂单缺少 ID 时放弃，返回 False）"""
+        if ids is None or any(i is None for i in ids):
+            self.drop(key)
+            return False
+        listing_set = ListingSet()
+        listing_set.listings = {i: (p, w) for i, p, w in zip(ids, prices, wears)}
+        with self._lock:
+            self._sets[key] = listing_set
+        return True
+
+    def add_newest(
+        self, key: str, ids: Sequence[Any], prices: Sequence[float], wears: Sequence[float]
+    ) -> Tuple[int, bool]:
+        """
+        合并一页按最新上架排序的挂单
+
+        Returns:
+            (新增挂单数, 本页是否已遇到已知挂单)
+        """
+        with self._lock:
+            listings = self._sets[key].listings
+            reached_known = any(i in listings for i in ids)
+            added = 0
+            for i, p, w in zip(ids, prices, wears):
+                if i not in listings:
+                    listings[i] = (p, w)
+                    added += 1
+            return added, reached_known
+
+    def recheck(self, key: str, ids: Sequence[Any], prices: Sequence[float], wears: Sequence[float]) -> int:
+        """
+        用价格最低的一页校正集合：更新这一页上的挂单，移除比这一页最高价还便宜、
+        却不在这一页上的已知挂单
+
+        Returns:
+            移除的挂单数
+        """
+        if not ids:
+            return 0
+        ceiling = max(prices)
+        present = set(ids)
+        with self._lock:
+            listing_set = self._sets[key]
+            listings = listing_set.listings
+            gone = [i for i, (p, _) in listings.items() if p < ceiling and i not in present]
+            for i in gone:
+                del listings[i]
+            for i, p, w in zip(ids, prices, wears):
+                listings[i] = (p, w)
+            listing_set.since_recheck = -1
+            return len(gone)
+
+    def finish_round(self, key: str) -> None:
+        """一轮增量同步成功结束"""
+        with self._lock:
+            listing_set = self._sets.get(key)
+            if listing_set is not None:
+                listing_set.since_full += 1
+                listing_set.since_recheck += 1
+
+    def columns(self, key: str) -> Tuple[array, array, list]:
+        """集合中的全部挂单：(价格列, 磨损列, ID 列)"""
+        with self._lock:
+            listings = self._sets[key].listings
+            ids = list(listings)
+            prices = array('d', (listings[i][0] for i in ids))
+            wears = array('d', (listings[i][1] for i in ids))
+        return prices, wears, ids
+
+    def drop(self, key: str) -> None:
+        with self._lock:
+            self._sets.pop(key, None)
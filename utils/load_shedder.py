@@ -0,0 +1,81 @@
+"""过载保护 - 商品优先级与轮次负载看门狗
+
+商品配置可设置 `priority`（high / normal / low，默认 normal）。`OverloadWatchdog`
+每轮结束时用本轮实际抓取耗时（不含均匀分布时的等待）除以监控间隔得到负载，平滑后
+超过高水位就提升过载等级，低于低水位才逐级恢复（滞回，避免来回抖动）。
+各等级对不同优先级的处理见 `SHED_POLICY`：先缩减低优先级商品的翻页预算，再跳过
+低优先级商品并缩减普通商品；高优先级商品始终按原预算抓取并排在每轮最前面。
+"""
+from typing import Any, Dict, Mapping
+
+PRIORITIES = ('high', 'normal', 'low')
+DEFAULT_PRIORITY = 'normal'
+PRIORITY_RANK = {name: rank for rank, name in enumerate(PRIORITIES)}
+
+# 过载等级 -> {优先级: 翻页预算系数}；系数 0 表示本轮跳过，未列出的优先级不受影响
+SHED_POLICY: Dict[int, Dict[str, float]] = {
+    0: {},
+    1: {'low': 0.5},
+    2: {'low': 0.0, 'normal': 0.5},
+    3: {'low': 0.0, 'normal': 0.25},
+}
+MAX_LEVEL = max(SHED_POLICY)
+
+
+def item_priority(item_config: Mapping[str, Any]) -> str:
+    """商品优先级（未配置或无法识别时为 normal）"""
+    value = str(item_config.get('priority') or DEFAULT_PRIORITY).lower()
+    return value if value in PRIORITY_RANK else DEFAULT_PRIORITY
+
+
+class OverloadWatchdog:
+    """按轮次负载调整过载等级"""
+
+    def __init__(self, high_watermark: float = 1.0, low_watermark: float = 0.7, smoothing: float = 0.5):
+        """
+        初始化看门狗
+
+        Args:
+            high_watermark: 平滑负载超过该值时提升一级
+            low_watermark: 平滑负载低于该值时降低一级
+            smoothing: 新一轮负载的权重（指数平滑，0~1）
+        """
+        self.high_watermark = float(high_watermark)
+        self.low_watermark = min(float(low_watermark), self.high_watermark)
+        self.smoothing = min(max(float(smoothing), 0.0), 1.0)
+        self.level = 0
+        self.load = 0.0
+
+    def observe(self, busy_seconds: float, interval: float) -> int:
+        """
+        记录一轮的抓取耗时，返回调整后的过载等级
+
+        Args:
+            busy_seconds: 本轮实际抓取耗时（秒）
+            interval: 计划的监控间隔（秒）
+        """
+        if interval <= 0:
+            return self.level
+        ratio = busy_seconds / interval
+        self.load = ratio if self.load == 0.0 else self.smoothing * ratio + (1 - self.smoothing) * self.load
+        if self.load > self.high_watermark and self.level < MAX_LEVEL:
+            self.level += 1
+        elif self.load < self.low_watermark and self.level > 0:
+            self.level -= 1
+        return self.level
+
+    def budget_factor(self, priority: str) -> float:
+        """当前等级下该优先级的翻页预算系数（1 为不受影响，0 为跳过）"""
+        return SHED_POLICY[self.level].get(priority, 1.0)
+
+    def describe(self) -> str:
+        policy = SHED_POLICY[self.level]
+        if not policy:
+            return '正常'
+        parts = []
+        for priority in PRIORITIES:
+            factor = policy.get(priority)
+            if factor is None:
+                continue
+            parts.append(f"{priority} 跳过" if factor <= 0 else f"{priority} 翻页预算 x{factor:g}")
+        return '，'.join(parts)
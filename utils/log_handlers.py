@@ -0,0 +1,157 @@
+"""日志处理器 - 轮转文件处理器、热点日志采样与 JSON 格式化"""
+import logging
+import os
+import threading
+from logging.handlers import RotatingFileHandler
+
+from . import jsoncodec
+
+
+class LineBudgetRotatingFileHandler(RotatingFileHandler):
+    """按行数与字节数双重预算轮转的文件处理器。
+
+    行数在写入时增量累计，只在启动打开文件时统计一次已有行数，
+    之后每条记录的判断都是 O(1)。每条记录只格式化一次，行数、
+    字节数判断与写入共用结果。超出预算时整段轮转为 `.1`、`.2`…，
+    最旧的分段直接丢弃；`backup_count=0` 时当前分段被整体清空重写。
+    """
+
+    def __init__(
+        self,
+        filename: str,
+        max_lines: int = 0,
+        max_bytes: int = 0,
+        backup_count: int = 0,
+        encoding: str = 'utf-8',
+    ):
+        """
+        初始化处理器
+
+        Args:
+            filename: 日志文件路径
+            max_lines: 单个分段最大行数（<=0 表示不限制）
+            max_bytes: 单个分段最大字节数（<=0 表示不限制）
+            backup_count: 保留的历史分段数量
+            encoding: 文件编码
+        """
+        self.max_lines = max(0, int(max_lines or 0))
+        self._line_count = 0
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backup_count, encoding=encoding)
+        self._line_count = self._count_existing_lines()
+
+    def _count_existing_lines(self) -> int:
+        """启动时统计一次已有行数（按块读取字节，避免逐行解码）。"""
+        if self.max_lines <= 0 or not os.path.exists(self.baseFilename):
+            return 0
+        count = 0
+        try:
+            with open(self.baseFilename, 'rb') as f:
+                for chunk in iter(lambda: f.read(1 << 20), b''):
+                    count += chunk.count(b'\n')
+        except OSError:
+            return 0
+        return count
+
+    def _needs_rollover(self, msg: str, lines: int) -> bool:
+        # 多行记录（如异常堆栈）按实际行数计入预算
+        if self.max_lines > 0 and self._line_count > 0 and self._line_count + lines > self.max_lines:
+            return True
+        if self.maxBytes > 0:
+            if self.stream is None:
+                self.stream = self._open()
+            self.stream.seek(0, 2)
+            return self.stream.tell() + len(msg) + 1 >= self.maxBytes
+        return False
+
+    def shouldRollover(self, record: logging.LogRecord) -> int:
+        msg = self.format(record)
+        return int(self._needs_rollover(msg, msg.count('\n') + 1))
+
+    def doRollover(self) -> None:
+        if self.backupCount > 0:
+            super().doRollover()
+        else:
+            # 没有历史分段可轮转：整段丢弃，从空文件重新开始
+            if self.stream:
+                self.stream.close()
+                self.stream = None
+            self.mode, mode = 'w', self.mode
+            try:
+                self.stream = self._open()
+            finally:
+                self.mode = mode
+        self._line_count = 0
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            msg = self.format(record)
+            lines = msg.count('\n') + 1
+            if self._needs_rollover(msg, lines):
+                self.doRollover()
+            if self.stream is None:
+                self.stream = self._open()
+            self.stream.write(msg + self.terminator)
+            self.flush()
+            self._line_count += lines
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+
+class RateSampleFilter(logging.Filter):
+    """对热点日志按速率采样，其余日志原样放行。
+
+    只有消息中包含 `patterns` 任一子串的记录会被采样：每个 (logger, pattern)
+    每秒最多放行 `max_per_second` 条，被丢弃的条数会附在下一条放行记录末尾。
+    """
+
+    def __init__(self, patterns, max_per_second: float = 5.0):
+        super().__init__()
+        self.patterns = tuple(p for p in (patterns or []) if p)
+        self.max_per_second = float(max_per_second)
+        # key -> [当前窗口起点, 窗口内已放行条数, 累计丢弃条数]
+        self._windows = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not self.patterns or self.max_per_second <= 0:
+            return True
+        msg = record.msg if isinstance(record.msg, str) else str(record.msg)
+        pattern = next((p for p in self.patterns if p in msg), None)
+        if pattern is None:
+            return True
+
+        key = (record.name, pattern)
+        now = record.created
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None or now - window[0] >= 1.0:
+                dropped = window[2] if window else 0
+                window = [now, 0, dropped]
+                self._windows[key] = window
+            if window[1] >= self.max_per_second:
+                window[2] += 1
+                return False
+            window[1] += 1
+            dropped, window[2] = window[2], 0
+
+        if dropped:
+            record.msg = f"{msg} (已采样省略 {dropped} 条同类日志)"
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """每条记录输出一行 JSON，便于日志采集系统解析。"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            'time': self.formatTime(record, self.datefmt),
+            'level': record.levelname,
+            'logger': record.name,
+            'thread': record.threadName,
+            'message': record.getMessage(),
+        }
+        if record.exc_info:
+            payload['exc_info'] = self.formatException(record.exc_info)
+        return jsoncodec.dumps(payload)
@@ -0,0 +1,59 @@
+"""商品名称归一化与匹配
+
+平台返回的商品名称与配置中的名称常有中英文标点、空格、分隔符差异。这里的正则
+在导入时预编译，归一化结果按原始名称做有界 LRU 缓存（同一页、同一轮中大量
+挂单的名称完全相同）；`NameMatcher` 在归一化之前先直接比较原始名称。
+"""
+from functools import lru_cache
+import re
+from typing import Optional
+
+# 磨损括号（如 "(久经沙场)"）开始的位置
+_EXTERIOR_RE = re.compile(r'[\(（]')
+# 比较时忽略的空白与常见分隔符
+_SEPARATOR_RE = re.compile(r'[\s\|\-–—_\[\]【】\(\)（）]')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+NAME_CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=NAME_CACHE_SIZE)
+def _normalize(name: str) -> str:
+    s = name.strip().lower()
+    s = _EXTERIOR_RE.split(s, maxsplit=1)[0]
+    return _SEPARATOR_RE.sub('', s)
+
+
+def normalize_name(name: Optional[str]) -> str:
+    """归一化：去空白与常见分隔符，并去掉磨损括号部分，降低中英文标点差异影响"""
+    return _normalize(name or '')
+
+
+@lru_cache(maxsize=NAME_CACHE_SIZE)
+def _goods_name_key(name: str) -> str:
+    return _WHITESPACE_RE.sub(' ', name.strip()).casefold()
+
+
+def goods_name_key(name: Optional[str]) -> str:
+    """用作商品标识的名称：只统一大小写与空白，保留磨损括号（不同外观是不同商品）"""
+    return _goods_name_key(name or '')
+
+
+class NameMatcher:
+    """判断平台名称是否与期望名称一致：原始名称相同直接命中，否则比较归一化结果"""
+
+    __slots__ = ('raw', 'normalized')
+
+    def __init__(self, expected: Optional[str]):
+        self.raw = expected or ''
+        self.normalized = normalize_name(self.raw)
+
+    def matches(self, name: Optional[str]) -> bool:
+        if name == self.raw:
+            return True
+        return normalize_name(name) == self.normalized
+
+
+def cache_info():
+    """归一化缓存命中统计（调试用）"""
+    return _normalize.cache_info()
@@ -1,15 +1,14 @@
 """通知模块 - 支持邮件、钉钉、企业微信等通知方式"""
-import smtplib
 import requests
 import hmac
 import hashlib
 import base64
 import time
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
 from typing import Dict, Any, List
 import logging
 
+from .listing_batch import PriceData, iter_listings
+
 
 class Notifier:
     """通知管理类"""
@@ -24,14 +23,14 @@ class Notifier:
         self.config = config
         self.logger = logging.getLogger(self.__class__.__name__)
     
-    def send(self, title: str, content: str, price_list: List[Dict[str, Any]] = None):
+    def send(self, title: str, content: str, price_list: PriceData = None):
         """
         发送通知
         
         Args:
             title: 通知标题
             content: 通知内容
-            price_list: 价格列表
+            price_list: 价格列表（ListingBatch、ListingBatch 列表或字典列表）
         """
         # 构建完整消息
         message = self._build_message(title, content, price_list)
@@ -48,7 +47,7 @@ class Notifier:
         if self.config.get('wechat', {}).get('enabled'):
             self._send_wechat(title, message)
     
-    def _build_message(self, title: str, content: str, price_list: List[Dict[str, Any]] = None) -> str:
+    def _build_message(self, title: str, content: str, price_list: PriceData = None) -> str:
         """
         构建消息内容
         
@@ -64,7 +63,7 @@ class Notifier:
         
         if price_list:
             message += "价格详情：\n"
-            for item in price_list:
+            for item in iter_listings(price_list):
                 message += (
                     f"- 平台: {item.get('platform', '未知')}\n"
                     f"  商品: {item.get('item_name', '未知')}\n"
@@ -83,6 +82,11 @@ class Notifier:
             subject: 邮件主题
             content: 邮件内容
         """
+        # 邮件相关模块只在真正发送邮件时导入
+        import smtplib
+        from email.mime.text import MIMEText
+        from email.mime.multipart import MIMEMultipart
+
         try:
             email_config = self.config.get('email', {})
             
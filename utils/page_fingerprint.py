@@ -0,0 +1,90 @@
+"""第 1 页指纹缓存 - 最便宜的一页没有变化时沿用上次抓取的后续页
+
+在售列表按价格升序返回，两轮之间第 1 页（最便宜的一段）往往完全没变，但
+BUFF / ECOSteam 每轮仍要重新翻 10~20 页。`page_fingerprint` 对第 1 页的
+(磨损, 价格) 序列取摘要；`PageFingerprintCache` 按商品保存上一次完整抓取时
+第 1 页的指纹和后续页的结果。下一轮第 1 页指纹相同，就直接沿用缓存的后续页，
+只发 1 个请求；连续沿用 `revalidate_rounds - 1` 轮或缓存超过 `max_age` 秒后
+强制完整抓取一次，防止深处的变化长期不被发现。
+"""
+from array import array
+from dataclasses import dataclass
+import hashlib
+import threading
+import time
+from typing import Any, Dict, Optional, Sequence
+
+
+def page_fingerprint(wears: Sequence[float], prices: Sequence[float]) -> str:
+    """一页在售列表 (磨损, 价格) 序列的摘要"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(array('d', wears).tobytes())
+    digest.update(array('d', prices).tobytes())
+    return digest.hexdigest()
+
+
+@dataclass
+class _Entry:
+    fingerprint: str
+    payload: Any
+    stored_at: float
+    reuses: int = 0
+
+
+class PageFingerprintCache:
+    """按商品保存第 1 页指纹与后续页结果（线程安全）"""
+
+    def __init__(self, max_entries: int = 2000):
+        self.max_entries = max(1, int(max_entries))
+        self._lock = threading.Lock()
+        self._entries: Dict[str, _Entry] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(
+        self,
+        key: str,
+        fingerprint: str,
+        revalidate_rounds: int,
+        max_age: float,
+        now: Optional[float] = None,
+    ) -> Optional[Any]:
+        """
+        第 1 页指纹与上次相同且未到重新验证时间时，返回缓存的后续页结果
+
+        Args:
+            key: 商品标识（应包含影响翻页范围的参数）
+            fingerprint: 本轮第 1 页的指纹
+            revalidate_rounds: 每隔多少轮强制完整抓取一次（<=1 表示不使用缓存）
+            max_age: 缓存的最长沿用秒数
+
+        Returns:
+            缓存的后续页结果；需要完整抓取时返回 None
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            entry = self._entries.get(key)
+            if (
+                entry is None
+                or entry.fingerprint != fingerprint
+                or entry.reuses + 1 >= revalidate_rounds
+                or now - entry.stored_at > max_age
+            ):
+                self.misses += 1
+                return None
+            entry.reuses += 1
+            self.hits += 1
+            return entry.payload
+
+    def store(self, key: str, fingerprint: str, payload: Any, now: Optional[float] = None) -> None:
+        """登记一次完整抓取的结果（重新开始计数）"""
+        with self._lock:
+            self._entries.pop(key, None)
+            if len(self._entries) >= self.max_entries:
+                # 按插入顺序淘汰最早的条目
+                self._entries.pop(next(iter(self._entries)))
+            self._entries[key] = _Entry(fingerprint, payload, time.time() if now is None else now)
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
@@ -0,0 +1,174 @@
+"""平台健康状态 - 风控冷却期的持久化与自适应调整
+
+平台触发拦截/风控时记录冷却截止时间，主程序在每轮开始前据此跳过或推迟该平台的
+抓取任务。冷却结束后的第一次请求视为探测：探测成功则缩短下次冷却时长，探测时
+再次被拦截则加倍冷却时长（不超过基础值的 `MAX_BACKOFF_FACTOR` 倍）。状态写入
+JSON 文件，进程重启后仍然有效，不会一启动就再次撞上拦截。
+
+多进程运行时各抓取进程共用同一个文件：写入时持有文件锁，先读取磁盘上的状态再合并，
+本进程改动过的平台与磁盘上的版本比较（更晚的拦截优先，其次是更晚的改动），未改动的
+平台直接采用磁盘上的版本，一个进程不会覆盖另一个进程刚记录的冷却。
+"""
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Set
+
+from . import jsoncodec
+from .file_lock import file_lock, lock_path
+
+logger = logging.getLogger(__name__)
+
+# 冷却时长的调整范围（相对于配置的基础冷却时长）
+MIN_COOLDOWN_FACTOR = 0.25
+MAX_BACKOFF_FACTOR = 8.0
+
+
+def _newer(a: Dict[str, Any], b: Dict[str, Any]) -> bool:
+    """a 是否应覆盖 b：更晚的拦截优先，其次是更晚的改动"""
+    return (a.get('blocked_at', 0), a.get('updated_at', 0.0)) >= (b.get('blocked_at', 0), b.get('updated_at', 0.0))
+
+
+class PlatformHealth:
+    """各平台的冷却状态（线程安全，变化时落盘）"""
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        初始化健康状态
+
+        Args:
+            path: 持久化文件路径（为空时只保存在内存中）
+        """
+        self.path = Path(path).resolve() if path else None
+        self._lock = threading.Lock()
+        self._state: Dict[str, Dict[str, Any]] = self._load()
+        # 本进程改动过、尚未写入文件的平台
+        self._dirty: Set[str] = set()
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        if self.path is None or not self.path.exists():
+            return {}
+        try:
+            data = jsoncodec.read_file(self.path)
+        except (OSError, ValueError) as e:
+            logger.warning(f"读取平台健康状态失败，忽略: {e}")
+            return {}
+        platforms = data.get('platforms', {}) if isinstance(data, dict) else {}
+        return {k: dict(v) for k, v in platforms.items() if isinstance(v, dict)}
+
+    def _touch(self, platform: str) -> None:
+        self._state[platform]['updated_at'] = time.time()
+        self._dirty.add(platform)
+
+    def _save(self) -> None:
+        """与磁盘上的状态合并后写入（调用方持有 self._lock）"""
+        if self.path is None:
+            self._dirty.clear()
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with file_lock(lock_path(self.path)):
+                merged = self._load()
+                for platform in self._dirty:
+                    local = self._state.get(platform)
+                    if local is not None and _newer(local, merged.get(platform, {})):
+                        merged[platform] = local
+                # 每个进程使用自己的临时文件，避免互相替换写了一半的文件
+                tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+                jsoncodec.write_file(tmp_path, {'platforms': merged})
+                os.replace(tmp_path, self.path)
+            self._state = merged
+            self._dirty.clear()
+        except OSError as e:
+            logger.warning(f"保存平台健康状态失败: {e}")
+
+    def reload(self) -> None:
+        """重新读取持久化文件（多进程运行时获取其他进程记录的冷却）"""
+        if self.path is None:
+            return
+        state = self._load()
+        with self._lock:
+            # 尚未写入文件的本地改动保留
+            for platform in self._dirty:
+                if platform in self._state:
+                    state[platform] = self._state[platform]
+            self._state = state
+
+    def blocked_until(self, platform: str) -> float:
+        """冷却截止时间戳（未冷却时为 0）"""
+        with self._lock:
+            return float(self._state.get(platform, {}).get('blocked_until', 0.0))
+
+    def remaining(self, platform: str, now: Optional[float] = None) -> float:
+        """剩余冷却秒数"""
+        now = time.time() if now is None else now
+        return max(0.0, self.blocked_until(platform) - now)
+
+    def is_blocked(self, platform: str, now: Optional[float] = None) -> bool:
+        """
+        是否仍在冷却期
+
+        冷却期刚结束时把平台标记为探测状态：接下来的请求结果决定下次冷却时长。
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            st = self._state.get(platform)
+            if not st or not st.get('blocked_until'):
+                return False
+            if now < float(st['blocked_until']):
+                return True
+            if not st.get('probing'):
+                st['probing'] = True
+                self._touch(platform)
+                self._save()
+                # 合并时可能得知其他进程刚记录的冷却
+                return now < float(self._state.get(platform, {}).get('blocked_until', 0.0))
+            return False
+
+    def block(self, platform: str, base_cooldown: float, reason: str = '') -> float:
+        """
+        记录一次拦截并进入冷却
+
+        Args:
+            platform: 平台名
+            base_cooldown: 配置的基础冷却秒数（<=0 表示不冷却）
+            reason: 拦截原因
+
+        Returns:
+            冷却截止时间戳（只延长不缩短）
+        """
+        if base_cooldown <= 0:
+            return self.blocked_until(platform)
+        now = time.time()
+        with self._lock:
+            st = self._state.setdefault(platform, {})
+            cooldown = float(st.get('cooldown') or base_cooldown)
+            if st.get('probing'):
+                # 冷却结束后的探测再次被拦截：加倍冷却
+                cooldown = min(cooldown * 2, base_cooldown * MAX_BACKOFF_FACTOR)
+            st['cooldown'] = cooldown
+            st['blocked_until'] = max(float(st.get('blocked_until', 0.0)), now + cooldown)
+            st['probing'] = False
+            st['strikes'] = int(st.get('strikes', 0)) + 1
+            st['reason'] = reason
+            st['blocked_at'] = int(now)
+            self._touch(platform)
+            self._save()
+            return float(self._state.get(platform, {}).get('blocked_until', 0.0))
+
+    def record_success(self, platform: str, base_cooldown: Optional[float] = None) -> None:
+        """记录一次成功请求；若处于探测状态则缩短下次冷却时长"""
+        with self._lock:
+            st = self._state.get(platform)
+            if not st or not st.get('probing'):
+                return
+            cooldown = float(st.get('cooldown') or base_cooldown or 0.0)
+            floor = (base_cooldown or cooldown) * MIN_COOLDOWN_FACTOR
+            st['cooldown'] = max(floor, cooldown / 2)
+            st['probing'] = False
+            st['blocked_until'] = 0.0
+            st['strikes'] = 0
+            self._touch(platform)
+            self._save()
@@ -0,0 +1,365 @@
+"""流式价格统计 - 按 (商品, 磨损区间, 平台) 维护滚动分位数、EWMA 与波动率
+
+`get_price_statistics` 每次都要扫描 SQLite，且只有 min/max/avg。这里在内存中为
+每个 (商品配置项, 平台) 维护：
+
+- 按天分桶的分位数草图（`QuantileSketch`，对数分桶，相对误差约 `relative_accuracy`）：
+  每条挂单 O(1) 计入当天的桶，查询时合并最近 `window_days` 天的桶即可得到滚动中位数
+  与任意分位数；过去几天的合并结果按天缓存，查询只需再合并当天一个桶。
+- 每轮最低价的 EWMA，以及最低价对数收益率的指数加权标准差（波动率）。
+
+每条挂单只在第一次出现时计入分位数草图（按挂单 ID + 价格识别，没有 ID 时按价格 + 磨损），
+一直在架的挂单不会每轮重复计数，中位数因此是挂单价格的中位数，而不是按在架时长加权；
+改价后的挂单视为新的观测。`fresh_indices` 给出本轮新出现的挂单，低价提醒只针对它们。
+超过 `seen_ttl` 秒未再出现的挂单从记录中移除。
+
+状态定期写入 JSON 检查点（原子替换），重启后继续累积。低价提醒因此可以使用
+“低于 7 天中位数 X%”这类相对阈值，抓取路径上不需要任何历史查询。
+"""
+import logging
+import math
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from . import jsoncodec
+
+logger = logging.getLogger(__name__)
+
+DAY_SECONDS = 86400
+CHECKPOINT_VERSION = 1
+
+
+def listing_identities(
+    prices: Sequence[float], wears: Sequence[float], ids: Optional[Sequence[Any]] = None
+) -> List[str]:
+    """各挂单的标识（挂单 ID + 价格；没有 ID 时用价格 + 磨损）"""
+    if ids is None:
+        return [f"{p:.2f}|{w:.12g}" for p, w in zip(prices, wears)]
+    return [
+        f"{i}@{p:.2f}" if i is not None else f"{p:.2f}|{w:.12g}"
+        for i, p, w in zip(ids, prices, wears)
+    ]
+
+
+class QuantileSketch:
+    """对数分桶的分位数草图（可合并，分位数的相对误差不超过 relative_accuracy）"""
+
+    __slots__ = ('relative_accuracy', '_gamma_log', 'bins', 'zero_count', 'count')
+
+    def __init__(self, relative_accuracy: float = 0.01):
+        self.relative_accuracy = float(relative_accuracy)
+        gamma = (1 + self.relative_accuracy) / (1 - self.relative_accuracy)
+        self._gamma_log = math.log(gamma)
+        self.bins: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+
+    def add(self, value: float, count: int = 1) -> None:
+        if value <= 0:
+            self.zero_count += count
+        else:
+            index = math.ceil(math.log(value) / self._gamma_log)
+            self.bins[index] = self.bins.get(index, 0) + count
+        self.count += count
+
+    def merge(self, other: 'QuantileSketch') -> None:
+        bins = self.bins
+        for index, count in other.bins.items():
+            bins[index] = bins.get(index, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+
+    def copy(self) -> 'QuantileSketch':
+        sketch = QuantileSketch(self.relative_accuracy)
+        sketch.merge(self)
+        return sketch
+
+    def quantile(self, q: float) -> Optional[float]:
+        """第 q 分位数（0~1），没有数据时返回 None"""
+        if self.count == 0:
+            return None
+        rank = min(max(q, 0.0), 1.0) * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+        for index in sorted(self.bins):
+            seen += self.bins[index]
+            if rank < seen:
+                # 桶 (gamma^(i-1), gamma^i] 的代表值，相对误差不超过 relative_accuracy
+                return 2 * math.exp(index * self._gamma_log) / (1 + math.exp(self._gamma_log))
+        return 2 * math.exp(max(self.bins) * self._gamma_log) / (1 + math.exp(self._gamma_log))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'zero': self.zero_count, 'bins': {str(k): v for k, v in self.bins.items()}}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], relative_accuracy: float) -> 'QuantileSketch':
+        sketch = cls(relative_accuracy)
+        sketch.zero_count = int(data.get('zero', 0))
+        sketch.bins = {int(k): int(v) for k, v in (data.get('bins') or {}).items()}
+        sketch.count = sketch.zero_count + sum(sketch.bins.values())
+        return sketch
+
+
+class RollingPriceStats:
+    """单个 (商品配置项, 平台) 的滚动统计"""
+
+    def __init__(self, relative_accuracy: float = 0.01, window_days: int = 7, alpha: float = 0.2):
+        self.relative_accuracy = relative_accuracy
+        self.window_days = max(1, int(window_days))
+        self.alpha = alpha
+        self.days: Dict[int, QuantileSketch] = {}
+        # 过去几天（不含当天）的合并结果，按“当天编号”缓存
+        self._history: Optional[QuantileSketch] = None
+        self._history_day: Optional[int] = None
+        self.ewma: Optional[float] = None
+        self.last_floor: Optional[float] = None
+        self.return_var = 0.0
+        self.rounds = 0
+        self.updated_at = 0.0
+        # 挂单标识 -> 最后一次出现的时间戳
+        self.seen: Dict[str, float] = {}
+        self._pruned_at = 0.0
+
+    def fresh(self, identities: Sequence[str]) -> List[int]:
+        """尚未计入过的挂单下标"""
+        seen = self.seen
+        return [i for i, identity in enumerate(identities) if identity not in seen]
+
+    def mark_seen(self, identities: Sequence[str], now: float, ttl: float) -> None:
+        seen = self.seen
+        for identity in identities:
+            seen[identity] = now
+        if now - self._pruned_at >= min(ttl, 3600):
+            cutoff = now - ttl
+            for identity in [k for k, t in seen.items() if t < cutoff]:
+                del seen[identity]
+            self._pruned_at = now
+
+    def add_prices(self, prices: Iterable[float], now: float) -> None:
+        """计入一批挂单价格（每条 O(1)）"""
+        day = int(now // DAY_SECONDS)
+        sketch = self.days.get(day)
+        if sketch is None:
+            sketch = self.days[day] = QuantileSketch(self.relative_accuracy)
+            self._expire(day)
+        add = sketch.add
+        for price in prices:
+            add(price)
+        self.updated_at = now
+
+    def observe_floor(self, floor: float) -> None:
+        """记录本轮最低价，更新 EWMA 与对数收益率的指数加权方差"""
+        if floor <= 0:
+            return
+        if self.ewma is None:
+            self.ewma = floor
+        else:
+            self.ewma += self.alpha * (floor - self.ewma)
+        if self.last_floor:
+            r = math.log(floor / self.last_floor)
+            self.return_var = (1 - self.alpha) * (self.return_var + self.alpha * r * r)
+        self.last_floor = floor
+        self.rounds += 1
+
+    def _expire(self, today: int) -> None:
+        oldest = today - self.window_days + 1
+        for day in [d for d in self.days if d < oldest]:
+            del self.days[day]
+
+    def window(self, now: float) -> QuantileSketch:
+        """最近 window_days 天（含当天）的合并草图"""
+        today = int(now // DAY_SECONDS)
+        if self._history_day != today:
+            self._expire(today)
+            history = QuantileSketch(self.relative_accuracy)
+            for day, sketch in self.days.items():
+                if day < today:
+                    history.merge(sketch)
+            self._history, self._history_day = history, today
+        merged = self._history.copy()
+        current = self.days.get(today)
+        if current is not None:
+            merged.merge(current)
+        return merged
+
+    @property
+    def volatility(self) -> float:
+        """每轮最低价对数收益率的指数加权标准差"""
+        return math.sqrt(self.return_var)
+
+    def snapshot(self, now: float) -> Dict[str, Any]:
+        window = self.window(now)
+        return {
+            'samples': window.count,
+            'p10': window.quantile(0.1),
+            'median': window.quantile(0.5),
+            'p90': window.quantile(0.9),
+            'floor_ewma': self.ewma,
+            'floor_volatility': self.volatility,
+            'rounds': self.rounds,
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'days': {str(day): sketch.to_dict() for day, sketch in self.days.items()},
+            'ewma': self.ewma,
+            'last_floor': self.last_floor,
+            'return_var': self.return_var,
+            'rounds': self.rounds,
+            'updated_at': self.updated_at,
+            'seen': {k: int(t) for k, t in self.seen.items()},
+        }
+
+    def load_dict(self, data: Dict[str, Any]) -> None:
+        self.days = {
+            int(day): QuantileSketch.from_dict(sketch, self.relative_accuracy)
+            for day, sketch in (data.get('days') or {}).items()
+        }
+        self.ewma = data.get('ewma')
+        self.last_floor = data.get('last_floor')
+        self.return_var = float(data.get('return_var') or 0.0)
+        self.rounds = int(data.get('rounds') or 0)
+        self.updated_at = float(data.get('updated_at') or 0.0)
+        self.seen = {str(k): float(t) for k, t in (data.get('seen') or {}).items()}
+        self._history_day = None
+
+
+class PriceStatsEngine:
+    """所有 (商品配置项, 平台) 的滚动统计，以及检查点读写"""
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        window_days: int = 7,
+        relative_accuracy: float = 0.01,
+        ewma_alpha: float = 0.2,
+        checkpoint_interval: float = 300,
+        seen_ttl: float = 86400,
+    ):
+        """
+        初始化统计引擎
+
+        Args:
+            path: 检查点文件路径（为空时只保存在内存中）
+            window_days: 滚动窗口天数
+            relative_accuracy: 分位数草图的相对误差
+            ewma_alpha: 最低价 EWMA / 波动率的平滑系数（0~1）
+            checkpoint_interval: 两次写检查点的最小间隔（秒）
+            seen_ttl: 挂单多久未再出现后忘记（之后再出现时重新计入，秒）
+        """
+        self.path = Path(path) if path else None
+        self.window_days = max(1, int(window_days))
+        self.relative_accuracy = min(max(float(relative_accuracy), 0.001), 0.2)
+        self.ewma_alpha = min(max(float(ewma_alpha), 0.01), 1.0)
+        self.checkpoint_interval = float(checkpoint_interval)
+        self.seen_ttl = max(60.0, float(seen_ttl))
+        self._stats: Dict[str, RollingPriceStats] = {}
+        self._dirty = False
+        self._last_save = time.time()
+        self._load()
+
+    @staticmethod
+    def key(item_key: str, platform: str) -> str:
+        return f"{item_key}|{platform}"
+
+    def _get(self, key: str) -> RollingPriceStats:
+        stats = self._stats.get(key)
+        if stats is None:
+            stats = self._stats[key] = RollingPriceStats(self.relative_accuracy, self.window_days, self.ewma_alpha)
+        return stats
+
+    def fresh_indices(self, key: str, identities: Sequence[str]) -> List[int]:
+        """本次抓取中尚未计入过的挂单下标"""
+        stats = self._stats.get(key)
+        return list(range(len(identities))) if stats is None else stats.fresh(identities)
+
+    def update(
+        self,
+        key: str,
+        prices: Sequence[float],
+        now: Optional[float] = None,
+        identities: Optional[Sequence[str]] = None,
+    ) -> None:
+        """
+        计入一次抓取的挂单价格，并以其中最低价更新 EWMA / 波动率
+
+        Args:
+            key: 统计键
+            prices: 本次抓取的全部挂单价格
+            identities: 与 prices 对应的挂单标识（见 listing_identities）；给出时只计入新出现的挂单
+        """
+        if not len(prices):
+            return
+        now = time.time() if now is None else now
+        stats = self._get(key)
+        if identities is None:
+            stats.add_prices(prices, now)
+        else:
+            stats.add_prices((prices[i] for i in stats.fresh(identities)), now)
+            stats.mark_seen(identities, now, self.seen_ttl)
+        stats.observe_floor(min(prices))
+        self._dirty = True
+
+    def quantile(self, key: str, q: float, now: Optional[float] = None) -> Optional[float]:
+        stats = self._stats.get(key)
+        if stats is None:
+            return None
+        return stats.window(time.time() if now is None else now).quantile(q)
+
+    def samples(self, key: str, now: Optional[float] = None) -> int:
+        stats = self._stats.get(key)
+        return stats.window(time.time() if now is None else now).count if stats is not None else 0
+
+    def snapshot(self, key: str, now: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        stats = self._stats.get(key)
+        return stats.snapshot(time.time() if now is None else now) if stats is not None else None
+
+    def _load(self) -> None:
+        if self.path is None or not self.path.exists():
+            return
+        try:
+            data = jsoncodec.read_file(self.path)
+        except (OSError, ValueError) as e:
+            logger.warning(f"读取价格统计检查点失败，重新开始统计: {e}")
+            return
+        if not isinstance(data, dict) or data.get('version') != CHECKPOINT_VERSION:
+            return
+        if data.get('relative_accuracy') != self.relative_accuracy:
+            logger.info("分位数精度已修改，旧的价格统计检查点不再适用，重新开始统计")
+            return
+        for key, value in (data.get('keys') or {}).items():
+            if isinstance(value, dict):
+                self._get(key).load_dict(value)
+
+    def save(self, force: bool = False) -> bool:
+        """写检查点（距上次写入不足 checkpoint_interval 时跳过，除非 force）"""
+        if self.path is None or not self._dirty:
+            return False
+        now = time.time()
+        if not force and now - self._last_save < self.checkpoint_interval:
+            return False
+        # 整个窗口内都没有新数据的键（商品已移出配置等）不再保留
+        expired = now - self.window_days * DAY_SECONDS
+        for key in [k for k, stats in self._stats.items() if stats.updated_at < expired]:
+            del self._stats[key]
+        data = {
+            'version': CHECKPOINT_VERSION,
+            'relative_accuracy': self.relative_accuracy,
+            'window_days': self.window_days,
+            'saved_at': int(now),
+            'keys': {key: stats.to_dict() for key, stats in self._stats.items()},
+        }
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_name(self.path.name + '.tmp')
+            jsoncodec.write_file(tmp_path, data, indent=False)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning(f"保存价格统计检查点失败: {e}")
+            return False
+        self._dirty = False
+        self._last_save = now
+        return True
@@ -0,0 +1,259 @@
+"""性能剖析 - 按采样率对整轮监控或选定商品的抓取做 cProfile / tracemalloc 剖析
+
+一轮变慢时，很难判断时间花在网络等待、正则解析、JSON 解码、日志还是 SQLite 上。
+`RoundProfiler` 按 `sample_rate`（或每隔 `every_rounds` 轮）选中部分轮次，用 cProfile
+包住整轮监控；配置了 `items` 时只包住名称匹配的商品的抓取。被选中的轮次同时开启
+tracemalloc，结束时记录本轮新增且仍存活的内存分配与峰值。
+
+每次剖析在 `dir` 下写出三个文件（只保留最近 `keep` 次）：
+
+    20240131-120000-12345-round42.prof        # pstats 格式，可用 snakeviz 等查看
+    20240131-120000-12345-round42.tracemalloc # tracemalloc 快照（Snapshot.load 读取）
+    20240131-120000-12345-round42.txt         # 与日志相同的文本摘要
+
+并在日志中输出按类别汇总的自身耗时和前 `top_n` 个热点函数。未被选中的轮次只有一次随机数
+判断的开销，可以在生产环境以较低采样率长期开启。
+
+注意：cProfile 只记录调用它的线程；后台预取线程中的网络耗时表现为主线程上的锁等待。
+"""
+from contextlib import contextmanager
+import cProfile
+from dataclasses import dataclass, field
+import io
+import logging
+import os
+import pstats
+import random
+import re
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .names import goods_name_key
+
+logger = logging.getLogger(__name__)
+
+SORT_KEYS = ('cumulative', 'tottime', 'calls')
+# 按函数所在文件 / 名称把自身耗时归类（按顺序匹配第一个类别）
+_CATEGORIES: Tuple[Tuple[str, Tuple[str, ...]], ...] = (
+    ('休眠/等待', ('time.sleep', '_thread.lock', '/threading.py', '/queue.py')),
+    ('网络', ('socket', 'ssl', 'selectors', '/http/client', '/urllib3/', '/requests/', 'playwright')),
+    ('正则', ("'re.pattern'", '_sre', '/re/', '/sre_')),
+    ('JSON', ('json',)),
+    ('日志', ('/logging/', 'log_handlers')),
+    ('SQLite', ('sqlite3', '/database.py')),
+)
+_UNSAFE_RE = re.compile(r'[^\w.-]+')
+_EXTENSIONS = ('.prof', '.tracemalloc', '.txt')
+
+
+def _func_label(func: Tuple[str, int, str]) -> str:
+    filename, line, name = func
+    if filename == '~':
+        return name
+    return f"{os.path.basename(filename)}:{line}({name})"
+
+
+def _category(func: Tuple[str, int, str]) -> str:
+    filename, _, name = func
+    text = f"{filename.replace(os.sep, '/')}:{name}".lower()
+    for category, needles in _CATEGORIES:
+        if any(needle in text for needle in needles):
+            return category
+    return '其他'
+
+
+@dataclass
+class ProfileReport:
+    """一次剖析的结果摘要"""
+
+    label: str
+    seconds: float
+    total_tt: float
+    categories: List[Tuple[str, float]]
+    hot_functions: List[Tuple[str, int, float, float]]
+    memory_current: int = 0
+    memory_peak: int = 0
+    memory_top: List[Tuple[str, int, int]] = field(default_factory=list)
+    files: List[str] = field(default_factory=list)
+
+    def format(self) -> str:
+        lines = [f"性能剖析 [{self.label}] 耗时 {self.seconds:.2f} 秒（被剖析线程的自身耗时合计 {self.total_tt:.2f} 秒）"]
+        if self.total_tt > 0:
+            lines.append('  按类别: ' + ' | '.join(
+                f"{name} {seconds:.2f}s ({seconds / self.total_tt:.0%})" for name, seconds in self.categories
+            ))
+        lines.append(f"  {'调用次数':>10} {'自身(s)':>9} {'累计(s)':>9}  函数")
+        for label, calls, tottime, cumtime in self.hot_functions:
+            lines.append(f"  {calls:>10} {tottime:>9.3f} {cumtime:>9.3f}  {label}")
+        if self.memory_peak:
+            lines.append(
+                f"  内存: 本轮新增仍存活 {self.memory_current / 1024:.0f} KiB，峰值 {self.memory_peak / 1024:.0f} KiB"
+            )
+            for where, size, count in self.memory_top:
+                lines.append(f"  {size / 1024:>10.1f} KiB {count:>8} 个对象  {where}")
+        return '\n'.join(lines)
+
+
+class RoundProfiler:
+    """按采样率剖析监控轮次 / 选定商品的抓取"""
+
+    def __init__(
+        self,
+        directory: str = 'data/profiles',
+        sample_rate: float = 0.05,
+        every_rounds: int = 0,
+        items: Optional[Sequence[str]] = None,
+        top_n: int = 15,
+        sort: str = 'cumulative',
+        keep: int = 50,
+        trace_memory: bool = True,
+        memory_frames: int = 1,
+    ):
+        """
+        初始化剖析器
+
+        Args:
+            directory: 剖析文件输出目录
+            sample_rate: 每轮被选中剖析的概率（0~1）
+            every_rounds: 大于 0 时改为每隔这么多轮剖析一次（忽略 sample_rate）
+            items: 只剖析名称包含这些关键字的商品的抓取（为空时剖析整轮）
+            top_n: 日志中输出的热点函数 / 内存分配位置个数
+            sort: 热点函数排序方式 cumulative / tottime / calls
+            keep: 最多保留最近多少次剖析的文件
+            trace_memory: 是否同时用 tracemalloc 记录内存分配
+            memory_frames: tracemalloc 为每次分配保存的栈帧数
+        """
+        if sort not in SORT_KEYS:
+            raise ValueError(f"不支持的排序方式: {sort}（可选 {' / '.join(SORT_KEYS)}）")
+        self.directory = Path(directory)
+        self.sample_rate = min(max(float(sample_rate), 0.0), 1.0)
+        self.every_rounds = max(0, int(every_rounds))
+        self.items = [goods_name_key(name) for name in items or [] if name]
+        self.top_n = max(1, int(top_n))
+        self.sort = sort
+        self.keep = max(1, int(keep))
+        self.trace_memory = bool(trace_memory)
+        self.memory_frames = max(1, int(memory_frames))
+        self._active = False
+        self._round_selected = False
+
+    def begin_round(self, round_no: int) -> bool:
+        """决定本轮是否剖析（每轮开始时调用一次）"""
+        if self.every_rounds > 0:
+            selected = round_no % self.every_rounds == 0
+        else:
+            selected = self.sample_rate > 0 and random.random() < self.sample_rate
+        self._round_selected = selected
+        return selected
+
+    @property
+    def per_item(self) -> bool:
+        return bool(self.items)
+
+    def item_selected(self, item_name: Optional[str]) -> bool:
+        """本轮已选中、且该商品在剖析名单中"""
+        key = goods_name_key(item_name)
+        return self._round_selected and any(name in key for name in self.items)
+
+    @contextmanager
+    def session(self, label: str) -> Iterator[None]:
+        """剖析 with 块内的代码（已有剖析进行中时不嵌套，直接执行）"""
+        if self._active:
+            yield
+            return
+        self._active = True
+        started_tracing = False
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(self.memory_frames)
+                started_tracing = True
+            tracemalloc.reset_peak()
+        profile = cProfile.Profile()
+        started = time.perf_counter()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            seconds = time.perf_counter() - started
+            snapshot = None
+            memory = (0, 0)
+            if self.trace_memory:
+                snapshot = tracemalloc.take_snapshot()
+                memory = tracemalloc.get_traced_memory()
+                if started_tracing:
+                    tracemalloc.stop()
+            self._active = False
+            try:
+                report = self._report(label, seconds, profile, snapshot, memory)
+                self._write(report, profile, snapshot)
+                self._rotate()
+                logger.info(report.format())
+            except Exception as e:
+                logger.warning(f"写出性能剖析结果失败: {e}")
+
+    def _report(
+        self,
+        label: str,
+        seconds: float,
+        profile: cProfile.Profile,
+        snapshot: Optional[tracemalloc.Snapshot],
+        memory: Tuple[int, int],
+    ) -> ProfileReport:
+        stats = pstats.Stats(profile, stream=io.StringIO())
+        categories: Dict[str, float] = {}
+        for func, (_, _, tottime, _, _) in stats.stats.items():
+            name = _category(func)
+            categories[name] = categories.get(name, 0.0) + tottime
+        stats.sort_stats(self.sort)
+        hot = []
+        for func in stats.fcn_list[:self.top_n]:
+            _, calls, tottime, cumtime, _ = stats.stats[func]
+            hot.append((_func_label(func), calls, tottime, cumtime))
+
+        report = ProfileReport(
+            label=label,
+            seconds=seconds,
+            total_tt=stats.total_tt,
+            categories=sorted(categories.items(), key=lambda kv: kv[1], reverse=True),
+            hot_functions=hot,
+        )
+        if snapshot is not None:
+            report.memory_current, report.memory_peak = memory
+            snapshot = snapshot.filter_traces((
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, '<frozen importlib._bootstrap*>'),
+            ))
+            for stat in snapshot.statistics('lineno')[:self.top_n]:
+                frame = stat.traceback[0]
+                where = f"{os.path.basename(frame.filename)}:{frame.lineno}"
+                report.memory_top.append((where, stat.size, stat.count))
+        return report
+
+    def _write(
+        self, report: ProfileReport, profile: cProfile.Profile, snapshot: Optional[tracemalloc.Snapshot]
+    ) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        stem = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{_UNSAFE_RE.sub('_', report.label)[:80]}"
+        base = self.directory / stem
+        profile.dump_stats(str(base) + '.prof')
+        report.files.append(str(base) + '.prof')
+        if snapshot is not None:
+            snapshot.dump(str(base) + '.tracemalloc')
+            report.files.append(str(base) + '.tracemalloc')
+        Path(str(base) + '.txt').write_text(report.format() + '\n', encoding='utf-8')
+        report.files.append(str(base) + '.txt')
+
+    def _rotate(self) -> None:
+        """只保留最近 keep 次剖析的文件（文件名以时间开头，按名称排序即按时间排序）"""
+        stems = sorted({p.name[:-len('.txt')] for p in self.directory.glob('*.txt')})
+        for stem in stems[:-self.keep]:
+            for ext in _EXTENSIONS:
+                try:
+                    (self.directory / (stem + ext)).unlink()
+                except FileNotFoundError:
+                    pass
+                except OSError as e:
+                    logger.warning(f"删除旧的性能剖析文件失败 {stem}{ext}: {e}")
@@ -0,0 +1,187 @@
+"""本地只读 API - 从进程内状态提供最新价格、轮次状态与历史摘要
+
+可选的内嵌 HTTP 服务（标准库 `ThreadingHTTPServer`，后台线程运行）。所有响应在
+数据变化时预先序列化为 JSON 字节：商品结果写入时更新该商品的响应，每轮结束时
+重建汇总响应；请求线程只做字典查找与发送，不访问数据库、不阻塞抓取线程，
+仪表盘等工具可以高频轮询。
+
+接口（均为 GET）：
+- `/health`：存活检查
+- `/status`：最近一轮的状态（开始/结束时间、耗时、商品数、平台熔断状态等）
+- `/items`：所有商品的最新摘要（各平台数量、最低价、最高价）
+- `/item?key=...` 或 `/item?name=...`：单个配置项（或同名所有配置项）的完整最新结果
+- `/history`：各商品最近若干轮最低价的汇总；`/history?key=...`：单个配置项的逐轮最低价
+"""
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import logging
+import threading
+from typing import Any, Deque, Dict, Iterable, List, Optional
+from urllib.parse import parse_qs, urlsplit
+
+from .jsoncodec import dumps_bytes as _encode
+
+logger = logging.getLogger(__name__)
+
+
+class ReadApiState:
+    """API 数据：最新结果、逐轮历史，以及预先序列化的响应"""
+
+    def __init__(self, history_rounds: int = 100):
+        """
+        初始化状态
+
+        Args:
+            history_rounds: 每个配置项在内存中保留的历史轮数
+        """
+        self.history_rounds = max(1, int(history_rounds))
+        self._lock = threading.Lock()
+        self._records: Dict[str, Dict[str, Any]] = {}
+        self._history: Dict[str, Deque[Dict[str, Any]]] = {}
+        self._platforms: Dict[str, Any] = {}
+        self._round: Dict[str, Any] = {}
+        # 预先序列化的响应：路径 -> 字节；按配置项 / 名称查询的响应单独保存
+        self._responses: Dict[str, bytes] = {'/health': _encode({'ok': True})}
+        self._item_bytes: Dict[str, bytes] = {}
+        self._history_bytes: Dict[str, bytes] = {}
+        self._keys_by_name: Dict[str, List[str]] = {}
+
+    def seed(self, records: Dict[str, Dict[str, Any]]) -> None:
+        """用启动时读取的最新结果索引填充数据（不计入历史）"""
+        with self._lock:
+            for key, record in records.items():
+                self._records[key] = record
+                self._item_bytes[key] = _encode(record)
+        self.publish()
+
+    def update_item(self, key: str, record: Dict[str, Any]) -> None:
+        """登记一个配置项的新结果，并追加一轮历史"""
+        point = {
+            't': record.get('timestamp'),
+            'min': {p: s.get('min_price') for p, s in record.get('summary', {}).items()},
+            'count': {p: s.get('count') for p, s in record.get('summary', {}).items()},
+        }
+        with self._lock:
+            self._records[key] = record
+            self._item_bytes[key] = _encode(record)
+            history = self._history.get(key)
+            if history is None:
+                history = self._history[key] = deque(maxlen=self.history_rounds)
+            history.append(point)
+            self._history_bytes[key] = _encode({'key': key, 'rounds': list(history)})
+
+    def remove_items(self, keys: Iterable[str]) -> None:
+        """移除已不在配置中的配置项（下次 publish 后从汇总响应中消失）"""
+        with self._lock:
+            for key in keys:
+                self._records.pop(key, None)
+                self._item_bytes.pop(key, None)
+                self._history.pop(key, None)
+                self._history_bytes.pop(key, None)
+
+    def set_platforms(self, status: Dict[str, Any]) -> None:
+        with self._lock:
+            self._platforms = dict(status)
+
+    def set_round(self, status: Dict[str, Any]) -> None:
+        with self._lock:
+            self._round = dict(status)
+
+    def publish(self) -> None:
+        """重建汇总响应（每轮结束时调用）"""
+        with self._lock:
+            keys_by_name: Dict[str, List[str]] = {}
+            items = {}
+            for key, record in self._records.items():
+                keys_by_name.setdefault(record.get('item_name'), []).append(key)
+                items[key] = {
+                    'item_name': record.get('item_name'),
+                    'wear_range': record.get('wear_range'),
+                    'timestamp': record.get('timestamp'),
+                    'summary': record.get('summary'),
+                }
+            history = {key: self._history_summary(points) for key, points in self._history.items()}
+            responses = dict(self._responses)
+            responses['/items'] = _encode({'count': len(items), 'items': items})
+            responses['/status'] = _encode({'round': self._round, 'platforms': self._platforms})
+            responses['/history'] = _encode({'rounds_kept': self.history_rounds, 'items': history})
+            # 整体替换引用，请求线程读取时无需加锁
+            self._responses = responses
+            self._keys_by_name = keys_by_name
+
+    @staticmethod
+    def _history_summary(points: Deque[Dict[str, Any]]) -> Dict[str, Any]:
+        low: Dict[str, float] = {}
+        high: Dict[str, float] = {}
+        for point in points:
+            for platform, price in point['min'].items():
+                if price is None:
+                    continue
+                low[platform] = min(price, low.get(platform, price))
+                high[platform] = max(price, high.get(platform, price))
+        return {
+            'rounds': len(points),
+            'latest': points[-1]['min'] if points else {},
+            'lowest_min_price': low,
+            'highest_min_price': high,
+        }
+
+    def response(self, path: str, query: Dict[str, List[str]]) -> Optional[bytes]:
+        """查找预先序列化的响应（不存在时返回 None）"""
+        if path == '/item':
+            keys = query.get('key') or self._keys_by_name.get((query.get('name') or [''])[0], [])
+            parts = [self._item_bytes[k] for k in keys if k in self._item_bytes]
+            if not parts:
+                return None
+            return parts[0] if 'key' in query else b'[' + b','.join(parts) + b']'
+        if path == '/history' and 'key' in query:
+            return self._history_bytes.get(query['key'][0])
+        return self._responses.get(path)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    state: ReadApiState
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        body = self.state.response(url.path.rstrip('/') or '/', parse_qs(url.query))
+        status = 200
+        if body is None:
+            status, body = 404, _encode({'error': 'not found'})
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug(f"read api {self.address_string()} {format % args}")
+
+
+class ReadApiServer:
+    """在后台线程运行只读 HTTP 服务"""
+
+    def __init__(self, state: ReadApiState, host: str = '127.0.0.1', port: int = 8765):
+        self.state = state
+        self.host = host
+        self.port = int(port)
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        handler = type('ReadApiHandler', (_Handler,), {'state': self.state})
+        self._server = ThreadingHTTPServer((self.host, self.port), handler)
+        self._server.daemon_threads = True
+        # 端口为 0 时使用系统分配的端口
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name='read-api', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._server is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        self._server = None
+        self._thread = None
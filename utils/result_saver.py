@@ -1,39 +1,51 @@
 """汇总所有平台的监控结果并输出到文件
 
-这个脚本会在每轮监控完成后，把所有平台的结果汇总到一个文件中
+每个商品监控完成后生成一条紧凑记录，按轮次批量追加到按天分段的压缩 JSONL
+（`data/results/monitoring_results_YYYYMMDD.jsonl.gz`），同时原子替换一份覆盖
+全部商品的最新结果索引 `data/latest_monitoring_result.json`（同时带上各平台的
+熔断器状态）。已从配置中移除的商品在写索引时一并剔除（见 `RoundResultWriter.retain`）。
 """
-import json
+import gzip
+import os
+import time
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import Iterable, List, Dict, Any, Optional
 from datetime import datetime
 
+from . import jsoncodec
+from .listing_batch import ListingBatch, PriceData
+
+
+def build_result_record(all_prices: PriceData, item_name: str, wear_min: float, wear_max: float) -> Optional[Dict[str, Any]]:
+    """构造单个商品的监控结果记录
 
-def save_monitoring_results(all_prices: List[Dict[str, Any]], item_name: str, wear_min: float, wear_max: float) -> None:
-    """保存监控结果到汇总文件
-    
     Args:
-        all_prices: 所有平台的价格列表
+        all_prices: 所有平台的价格（ListingBatch 列表，或兼容旧式的字典列表）
         item_name: 商品名称
         wear_min: 最小磨损
         wear_max: 最大磨损
+
+    Returns:
+        结果记录；没有任何价格时返回 None
     """
     if not all_prices:
-        return
-    
-    # 按平台分组
+        return None
+
+    # 按平台分组（批次本身就是按平台划分的）
     by_platform: Dict[str, List[Dict[str, Any]]] = {}
-    for price in all_prices:
-        platform = price.get('platform', 'unknown')
-        if platform not in by_platform:
-            by_platform[platform] = []
-        by_platform[platform].append(price)
-    
+    entries = [all_prices] if isinstance(all_prices, ListingBatch) else all_prices
+    for entry in entries:
+        if isinstance(entry, ListingBatch):
+            if entry:
+                by_platform.setdefault(entry.platform, []).extend(entry.to_dicts())
+        else:
+            by_platform.setdefault(entry.get('platform', 'unknown'), []).append(entry)
+
     # 对每个平台的结果按价格排序
     for platform in by_platform:
         by_platform[platform].sort(key=lambda x: (x['price'], x['wear']))
-    
-    # 构造输出数据
-    output = {
+
+    return {
         'item_name': item_name,
         'wear_range': {'min': wear_min, 'max': wear_max},
         'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
@@ -47,18 +59,137 @@ def save_monitoring_results(all_prices: List[Dict[str, Any]], item_name: str, we
         },
         'details': by_platform
     }
-    
-    # 保存到文件
-    output_dir = Path('data')
-    output_dir.mkdir(parents=True, exist_ok=True)
-    output_path = output_dir / 'latest_monitoring_result.json'
-    
-    output_path.write_text(json.dumps(output, ensure_ascii=False, indent=2), encoding='utf-8')
-    
-    # 同时保存一份带时间戳的备份
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    backup_path = output_dir / f'monitoring_result_{timestamp}.json'
-    backup_path.write_text(json.dumps(output, ensure_ascii=False, indent=2), encoding='utf-8')
-    
-    print(f"监控结果已保存到: {output_path}")
-    print(f"备份文件: {backup_path}")
+
+
+def result_key(item_name: str, wear_min: float, wear_max: float) -> str:
+    """最新结果索引中区分配置项的键（同名商品不同磨损区间分开保存）"""
+    return f"{item_name}|{wear_min}-{wear_max}"
+
+
+class RoundResultWriter:
+    """按轮次写入监控结果：压缩 JSONL 分段 + 原子替换的最新结果索引"""
+
+    SEGMENT_PREFIX = 'monitoring_results_'
+    SEGMENT_SUFFIX = '.jsonl.gz'
+
+    def __init__(self, output_dir: str = 'data', keep_days: int = 14, compress_level: int = 6):
+        """
+        初始化写入器
+
+        Args:
+            output_dir: 输出目录（分段写入其下的 results/ 子目录）
+            keep_days: 保留的分段天数（<=0 表示不清理）
+            compress_level: gzip 压缩级别
+        """
+        self.output_dir = Path(output_dir)
+        self.segment_dir = self.output_dir / 'results'
+        self.latest_path = self.output_dir / 'latest_monitoring_result.json'
+        self.keep_days = int(keep_days)
+        self.compress_level = int(compress_level)
+        self._pending: List[Dict[str, Any]] = []
+        self._latest: Dict[str, Dict[str, Any]] = self._load_latest()
+        self._platform_status: Dict[str, Any] = {}
+        # 最新结果索引有尚未写盘的变化（平台状态更新、剔除已移除的商品）
+        self._index_dirty = False
+
+    def _load_latest(self) -> Dict[str, Dict[str, Any]]:
+        """启动时读取已有的最新结果索引（旧版单商品格式直接忽略）"""
+        try:
+            data = jsoncodec.read_file(self.latest_path)
+        except (OSError, ValueError):
+            return {}
+        items = data.get('items') if isinstance(data, dict) else None
+        return dict(items) if isinstance(items, dict) else {}
+
+    def add(self, all_prices: PriceData, item_name: str, wear_min: float, wear_max: float) -> Optional[Dict[str, Any]]:
+        """登记一个商品本轮的结果（在 flush 时统一写盘）"""
+        record = build_result_record(all_prices, item_name, wear_min, wear_max)
+        if record is not None:
+            self._pending.append(record)
+            self._latest[result_key(item_name, wear_min, wear_max)] = record
+        return record
+
+    def retain(self, keys: Iterable[str]) -> List[str]:
+        """
+        最新结果索引只保留 keys 中的配置项（其余随下一次 flush 从文件中移除）
+
+        Args:
+            keys: 当前配置中全部商品的 result_key
+
+        Returns:
+            被移除的键
+        """
+        keep = set(keys)
+        removed = [key for key in self._latest if key not in keep]
+        for key in removed:
+            del self._latest[key]
+        if removed:
+            self._index_dirty = True
+        return removed
+
+    def latest_records(self) -> Dict[str, Dict[str, Any]]:
+        """最新结果索引中的全部记录（键为 result_key）"""
+        return dict(self._latest)
+
+    def set_platform_status(self, status: Dict[str, Any]) -> None:
+        """登记各平台状态（熔断器等），随下一次 flush 写入最新结果索引"""
+        if status != self._platform_status:
+            self._platform_status = dict(status)
+            self._index_dirty = True
+
+    def flush(self) -> Optional[Path]:
+        """
+        把本轮登记的记录追加到当天的分段，并原子替换最新结果索引
+
+        Returns:
+            写入的分段路径；本轮没有记录时返回 None
+        """
+        if not self._pending:
+            if self._index_dirty:
+                self._write_latest()
+            return None
+        records, self._pending = self._pending, []
+
+        self.segment_dir.mkdir(parents=True, exist_ok=True)
+        segment = self.segment_dir / f"{self.SEGMENT_PREFIX}{datetime.now().strftime('%Y%m%d')}{self.SEGMENT_SUFFIX}"
+        payload = b''.join(jsoncodec.dumps_bytes(r) + b'\n' for r in records)
+        # 每轮追加一个独立的 gzip member，gzip/zcat 会按顺序连续解压
+        with open(segment, 'ab') as f:
+            f.write(gzip.compress(payload, compresslevel=self.compress_level))
+
+        self._write_latest()
+        self._cleanup_segments()
+        return segment
+
+    def _write_latest(self) -> None:
+        index = {
+            'updated_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'items': self._latest,
+        }
+        if self._platform_status:
+            index['platforms'] = self._platform_status
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.latest_path.with_name(self.latest_path.name + '.tmp')
+        jsoncodec.write_file(tmp_path, index, indent=False)
+        os.replace(tmp_path, self.latest_path)
+        self._index_dirty = False
+
+    def _cleanup_segments(self) -> None:
+        if self.keep_days <= 0:
+            return
+        cutoff = time.time() - self.keep_days * 86400
+        for path in self.segment_dir.glob(f"{self.SEGMENT_PREFIX}*{self.SEGMENT_SUFFIX}"):
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+            except OSError:
+                continue
+
+
+def iter_result_records(path: str):
+    """逐条读取一个分段中的结果记录"""
+    with gzip.open(path, 'rb') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield jsoncodec.loads(line)
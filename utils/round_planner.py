@@ -0,0 +1,69 @@
+"""监控轮次规划 - 按平台商品标识合并抓取任务
+
+配置里同一件商品常以不同磨损区间 / 目标价出现多次，或多个配置项指向同一个
+buff_goods_id / youpin_template_id / eco_goods_url。一轮监控中，同一平台、同一
+商品标识只抓取一次在售列表，所有磨损区间都基于这份列表评估。
+"""
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Mapping, Sequence, Tuple
+
+Band = Tuple[float, float]
+
+
+@dataclass
+class CrawlJob:
+    """一次平台抓取（同一平台、同一商品标识的所有配置项共享）"""
+
+    platform: str
+    goods_key: str
+    item_name: str
+    # 共享本次抓取的配置项在 items 中的下标，以及各自对应 bands 中的下标
+    item_indices: List[int] = field(default_factory=list)
+    band_indices: List[int] = field(default_factory=list)
+    # 去重后的磨损区间
+    bands: List[Band] = field(default_factory=list)
+    # 合并后的抓取配置（抓取范围参数取各配置项的最大值）
+    crawl_config: Dict[str, Any] = field(default_factory=dict)
+
+
+def item_band(item_config: Mapping[str, Any]) -> Band:
+    """配置项的磨损区间 (wear_min, wear_max)"""
+    wear_range = item_config.get('wear_range', {})
+    return (wear_range.get('min', 0), wear_range.get('max', 1))
+
+
+def plan_crawl_jobs(items: Sequence[Dict[str, Any]], monitors: Mapping[str, Any]) -> List[CrawlJob]:
+    """
+    把一轮的监控项按 (平台, 商品标识) 分组
+
+    Args:
+        items: 商品配置列表
+        monitors: 平台名 -> 监控器（未启用的平台会被跳过）
+
+    Returns:
+        抓取任务列表，按首次出现的顺序排列
+    """
+    jobs: Dict[Tuple[str, str], CrawlJob] = {}
+    members: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+
+    for index, item_config in enumerate(items):
+        item_name = item_config.get('name')
+        band = item_band(item_config)
+        for platform in item_config.get('platforms', []):
+            monitor = monitors.get(platform)
+            if monitor is None:
+                continue
+            key = (platform, monitor.get_goods_key(item_name, item_config))
+            job = jobs.get(key)
+            if job is None:
+                job = jobs[key] = CrawlJob(platform, key[1], item_name)
+                members[key] = []
+            if band not in job.bands:
+                job.bands.append(band)
+            job.item_indices.append(index)
+            job.band_indices.append(job.bands.index(band))
+            members[key].append(item_config)
+
+    for key, job in jobs.items():
+        job.crawl_config = monitors[job.platform].merge_crawl_configs(members[key])
+    return list(jobs.values())
@@ -0,0 +1,74 @@
+"""轮内调度 - 把抓取任务均匀分布在监控间隔内，并统计各商品的实际间隔
+
+旧的做法是每轮开始时连续发出所有请求、然后空闲整个间隔，突发流量最容易触发 429、
+Youpin 85100 和 ECOSteam 挑战页。`SpreadScheduler.plan` 把 n 个任务排在间隔的 n 个
+等宽时间槽里，每个任务在槽内随机偏移（`jitter` 为槽宽的比例），峰值请求速率因此降到
+原来的几分之一，覆盖频率不变。`record_start` 记录每个商品的实际开始时间，用于对比
+计划间隔与实际间隔。
+"""
+import random
+from typing import Dict, List, Optional
+
+
+class SpreadScheduler:
+    """均匀分布 + 抖动的轮内调度器"""
+
+    def __init__(self, jitter: float = 0.3, fill: float = 0.9, rng: Optional[random.Random] = None):
+        """
+        初始化调度器
+
+        Args:
+            jitter: 槽内随机偏移占槽宽的比例（0~1）
+            fill: 任务分布占用间隔的比例，留出末尾余量让最后一个任务在下一轮前完成
+            rng: 随机数生成器（测试时可固定种子）
+        """
+        self.jitter = min(max(float(jitter), 0.0), 1.0)
+        self.fill = min(max(float(fill), 0.1), 1.0)
+        self._rng = rng or random.Random()
+        self._last_start: Dict[str, float] = {}
+        self._periods: Dict[str, float] = {}
+
+    def plan(self, count: int, start: float, window: float) -> List[float]:
+        """
+        计算各任务的计划开始时间
+
+        Args:
+            count: 任务数
+            start: 本轮开始时间戳
+            window: 可用时长（秒，通常为监控间隔）
+
+        Returns:
+            单调递增的计划开始时间戳列表
+        """
+        if count <= 0:
+            return []
+        slot = max(0.0, window) * self.fill / count
+        return [start + (i + self._rng.uniform(0.0, self.jitter)) * slot for i in range(count)]
+
+    def record_start(self, key: str, at: float) -> Optional[float]:
+        """记录商品本轮的实际开始时间，返回与上一轮的间隔（首次为 None）"""
+        last = self._last_start.get(key)
+        self._last_start[key] = at
+        if last is None:
+            return None
+        period = at - last
+        self._periods[key] = period
+        return period
+
+    def forget(self, keys) -> None:
+        """移除已不在配置中的商品"""
+        for key in set(self._last_start) - set(keys):
+            self._last_start.pop(key, None)
+            self._periods.pop(key, None)
+
+    def period_report(self, keys) -> Optional[Dict[str, float]]:
+        """指定商品最近一次实际间隔的统计（没有数据时返回 None）"""
+        periods = [self._periods[k] for k in keys if k in self._periods]
+        if not periods:
+            return None
+        return {
+            'count': len(periods),
+            'mean': sum(periods) / len(periods),
+            'min': min(periods),
+            'max': max(periods),
+        }
@@ -0,0 +1,58 @@
+"""多进程分片 - 把商品配置划分给多个抓取进程
+
+会在分片内合并为一次抓取的配置项必须落在同一分片：同名商品（可能只是磨损区间不同），
+以及在任一平台上商品标识相同的配置项（同一 buff_goods_id / youpin_template_id /
+eco_goods_url，名称可以不同）。共享任一标识的配置项用并查集归为一组；分组后按配置项数量
+从多到少，依次分给当前负载最小的分片，使各进程的工作量大致均衡。
+"""
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+from .names import goods_name_key
+
+
+def partition_items(
+    items: Sequence[Dict[str, Any]],
+    shards: int,
+    goods_keys: Optional[Callable[[Dict[str, Any]], Iterable[str]]] = None,
+) -> List[List[int]]:
+    """
+    把商品配置划分为若干分片
+
+    Args:
+        items: 商品配置列表
+        shards: 分片数
+        goods_keys: 返回配置项在各平台上的商品标识（如 "buff|goods:123"），与
+            plan_crawl_jobs 的合并依据一致；为空时只按商品名称分组
+
+    Returns:
+        每个分片包含的 items 下标（保持原有顺序；分片可能为空）
+    """
+    shards = max(1, int(shards))
+    parent = list(range(len(items)))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    owner: Dict[str, int] = {}
+    for index, item in enumerate(items):
+        keys = [f"name:{goods_name_key(item.get('name'))}"]
+        if goods_keys is not None:
+            keys.extend(goods_keys(item))
+        for key in keys:
+            root, other = find(index), find(owner.setdefault(key, index))
+            if root != other:
+                parent[max(root, other)] = min(root, other)
+
+    groups: Dict[int, List[int]] = {}
+    for index in range(len(items)):
+        groups.setdefault(find(index), []).append(index)
+
+    partitions: List[List[int]] = [[] for _ in range(shards)]
+    # 大组优先，同样大小按首次出现顺序，保证划分结果稳定
+    for indices in sorted(groups.values(), key=lambda g: (-len(g), g[0])):
+        target = min(range(shards), key=lambda s: (len(partitions[s]), s))
+        partitions[target].extend(indices)
+    return [sorted(p) for p in partitions]